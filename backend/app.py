@@ -1,12 +1,19 @@
 # app.py
+import logging
 import os
 from dotenv import load_dotenv
 load_dotenv()
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from routes import scholarships, profile, auth
+from services.firestore import db
+from services.timing import TimingMiddleware, firestore_observer
+from services.metrics import MetricsMiddleware, metrics, firestore_observer as metrics_firestore_observer
+from services.warmup import readiness
 
 app = FastAPI()
+logger = logging.getLogger(__name__)
 
 # Server configuration
 PORT = int(os.getenv("PORT", 8000))
@@ -27,8 +34,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Per-request stage timing (Server-Timing header, TIMING_SAMPLE_RATE)
+app.add_middleware(TimingMiddleware)
+db.add_observer(firestore_observer)
+
+# Prometheus-style metrics at /metrics (METRICS_DIR to aggregate workers)
+app.add_middleware(MetricsMiddleware)
+db.add_observer(metrics_firestore_observer)
+
+# Per-request Firestore call tracing with N+1 warnings (staging: FIRESTORE_TRACE=1)
+if os.getenv("FIRESTORE_TRACE", "0") == "1":
+    from services.firestore_tracer import FirestoreTraceMiddleware
+    app.add_middleware(FirestoreTraceMiddleware)
+
 # API Routers
 app.include_router(scholarships.router)
 app.include_router(profile.router)
@@ -36,6 +57,26 @@ app.include_router(auth.router)
 from routes import reminders
 app.include_router(reminders.router)
 
+from services.outbox import outbox
+
+@app.on_event("startup")
+def start_outbox():
+    outbox.start()
+
+@app.on_event("startup")
+def start_metrics_flusher():
+    metrics.start_flusher()
+
+@app.on_event("startup")
+def start_warmup():
+    # Storage client + catalog cache load in the background; /health/ready reports when done
+    logger.info(f"🚀 FundMyStudy API starting (port {PORT})")
+    readiness.start()
+
+@app.on_event("shutdown")
+def stop_outbox():
+    outbox.stop()
+
 @app.get("/")
 def read_root():
     return {
@@ -45,6 +86,8 @@ def read_root():
         "endpoints": [
             "/", 
             "/health", 
+            "/health/live",
+            "/health/ready",
             "/scholarships/eligible",
             "/profiles/me",
             "/auth/test"
@@ -55,6 +98,21 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/live")
+def liveness_check():
+    """Process is up and serving (restart only if this fails)"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+def readiness_check():
+    """503 until the storage client is built and the catalog cache is loaded"""
+    snapshot = readiness.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["status"] == "ready" else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/test")
 def test_endpoint():
     return {"status": "success", "message": "API is operational"}
@@ -62,6 +120,4 @@ def test_endpoint():
 if __name__ == "__main__":
     import uvicorn
     # Host must be 0.0.0.0 for Render compatibility
-    uvicorn.run(app, host="0.0.0.0", port=PORT)
-else:
-    print(f"Server initialized on port {PORT}")
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=PORT)
\ No newline at end of file
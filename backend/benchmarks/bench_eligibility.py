@@ -0,0 +1,250 @@
+"""
+Eligibility engine benchmark on a synthetic catalog.
+
+Measures, for a seeded synthetic catalog (benchmarks/synthetic.py):
+  - engine:   evaluate_conditions µs per profile x scholarship, at each profile scale
+  - eligible: GET /scholarships/eligible handler latency (p50/p95/p99) against
+              the in-memory Firestore, catalog cache warm
+  - memory:   bytes per cached catalog entry (Scholarship + conditions), and
+              for a shared catalog snapshot the per-worker bytes per entry
+              next to the (shared, mapped) file bytes per entry
+
+Results are written as JSON; --compare flags metrics that got slower/bigger
+than a previous run by more than --tolerance and exits non-zero.
+
+Run with: python benchmarks/bench_eligibility.py [--scales 100,1000,10000,100000]
+          [--catalog 1000] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.catalog import catalog, load_active_scholarships  # noqa: E402
+from services.catalog_snapshot import CatalogSnapshot, write_snapshot  # noqa: E402
+from services.eligibility_engine import evaluate_conditions  # noqa: E402
+from services.firestore import db  # noqa: E402
+from services.memory_firestore import MemoryFirestore  # noqa: E402
+from routes.scholarships import get_eligible_scholarships  # noqa: E402
+from synthetic import make_profiles, make_scholarships, seed_store  # noqa: E402
+
+# Lower is better for all of these; compared against a baseline with --compare
+COMPARED = {
+    "engine": ("us_per_eval",),
+    "eligible": ("p50_ms", "p95_ms", "p99_ms"),
+    "memory": ("bytes_per_entry", "snapshot_bytes_per_entry"),
+}
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def bench_engine(scholarships, profiles, max_evals):
+    """evaluate_conditions over profiles x catalog, capped at max_evals evaluations"""
+    rulesets = [s.conditions for s in scholarships if s.conditions]
+    per_profile = len(rulesets)
+    profiles = profiles[:max(1, max_evals // per_profile)] if per_profile * len(profiles) > max_evals else profiles
+
+    evaluate_conditions(profiles[0], rulesets[0])  # warm-up
+    eligible = 0
+    started = time.perf_counter()
+    for profile in profiles:
+        for conditions in rulesets:
+            if evaluate_conditions(profile, conditions)["eligible"]:
+                eligible += 1
+    seconds = time.perf_counter() - started
+    evaluations = len(profiles) * per_profile
+    return {
+        "profiles": len(profiles),
+        "evaluations": evaluations,
+        "seconds": round(seconds, 3),
+        "us_per_eval": round(seconds / evaluations * 1e6, 3),
+        "eligible_rate": round(eligible / evaluations, 4),
+    }
+
+
+def bench_eligible(profiles, requests):
+    """Handler latency for `requests` calls spread over the seeded profiles"""
+    async def run():
+        # First call loads the catalog cache; not measured
+        await get_eligible_scholarships(uid=profiles[0]["userId"], limit=None, offset=0)
+        latencies, returned = [], 0
+        for i in range(requests):
+            uid = profiles[i % len(profiles)]["userId"]
+            started = time.perf_counter()
+            response = await get_eligible_scholarships(uid=uid, limit=None, offset=0)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if "error" in response:
+                raise RuntimeError(f"/eligible failed: {response}")
+            returned += response["count"]
+        return latencies, returned
+
+    latencies, returned = asyncio.run(run())
+    latencies.sort()
+    return {
+        "requests": requests,
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_results": round(returned / requests, 1),
+    }
+
+
+def bench_memory():
+    """Bytes allocated per cached scholarship by load_active_scholarships()"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    scholarships = load_active_scholarships()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.snapshot")
+        write_snapshot(scholarships, path)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        snapshot = CatalogSnapshot(path)
+        gc.collect()
+        snapshot_held = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        file_bytes = os.path.getsize(path)
+        del snapshot
+
+    entries = max(1, len(scholarships))
+    return {
+        "entries": len(scholarships),
+        "conditions": sum(len(s.conditions) for s in scholarships),
+        "bytes_per_entry": round(held / entries, 1),
+        "snapshot_bytes_per_entry": round(snapshot_held / entries, 1),
+        "snapshot_file_bytes_per_entry": round(file_bytes / entries, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """[(metric, old, new, change), ...] for metrics worse than baseline by more than tolerance"""
+    regressions = []
+    for section, keys in COMPARED.items():
+        new_section, old_section = results.get(section, {}), baseline.get(section, {})
+        # engine results are keyed by scale; the others are flat
+        pairs = (
+            [(f"{section}[{scale}]", new_section[scale], old_section[scale]) for scale in new_section if scale in old_section]
+            if section == "engine" else [(section, new_section, old_section)]
+        )
+        for label, new, old in pairs:
+            for key in keys:
+                if key in new and old.get(key):
+                    change = new[key] / old[key] - 1
+                    if change > tolerance:
+                        regressions.append((f"{label}.{key}", old[key], new[key], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the eligibility engine on a synthetic catalog")
+    parser.add_argument("--scales", default="100,1000,10000,100000", help="Profile counts for the engine benchmark")
+    parser.add_argument("--catalog", type=int, default=1000, help="Synthetic scholarships")
+    parser.add_argument("--requests", type=int, default=200, help="/eligible calls to time")
+    parser.add_argument("--max-evals", type=int, default=2_000_000, help="Cap on engine evaluations per scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results JSON here (default: benchmarks/results/eligibility-<time>.json)")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before flagging (fraction)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    scales = [int(s) for s in args.scales.split(",") if s]
+
+    raw = make_scholarships(args.catalog, seed=args.seed)
+    profiles = make_profiles(max(scales), seed=args.seed + 1)
+
+    store = MemoryFirestore()
+    seed_store(store, raw, profiles[:1000])
+    db.use_client(store)
+    catalog.invalidate()
+    scholarships = load_active_scholarships()
+    print(f"Catalog: {len(scholarships)} scholarships, {sum(len(s.conditions) for s in scholarships)} conditions")
+
+    results = {"engine": {}}
+    print(f"{'profiles':>9} {'evaluations':>12} {'µs/eval':>8} {'eligible':>9}")
+    for scale in scales:
+        row = bench_engine(scholarships, profiles[:scale], args.max_evals)
+        results["engine"][str(scale)] = row
+        capped = "*" if row["profiles"] < scale else ""
+        print(f"{scale:>9} {row['evaluations']:>11}{capped:1} {row['us_per_eval']:>8.2f} {row['eligible_rate']:>8.1%}")
+
+    results["eligible"] = bench_eligible(profiles[:1000], args.requests)
+    row = results["eligible"]
+    print(f"/eligible: p50 {row['p50_ms']:.1f}ms  p95 {row['p95_ms']:.1f}ms  p99 {row['p99_ms']:.1f}ms  ({row['mean_results']} results/request)")
+
+    results["memory"] = bench_memory()
+    row = results["memory"]
+    print(
+        f"Memory: {row['bytes_per_entry']:.0f} bytes per catalog entry; with a snapshot "
+        f"{row['snapshot_bytes_per_entry']:.0f} per worker + {row['snapshot_file_bytes_per_entry']:.0f} shared"
+    )
+
+    report = {
+        "params": {"catalog": args.catalog, "scales": scales, "requests": args.requests, "seed": args.seed, "max_evals": args.max_evals},
+        "run": {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "results",
+        f"eligibility-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("params") != report["params"]:
+            print("⚠️  Baseline was run with different parameters; comparison may not be meaningful")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for metric, old, new, change in regressions:
+            print(f"❌ {metric}: {old} -> {new} (+{change:.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} vs {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Cold-start benchmark.
+
+Measures, each in a fresh interpreter:
+  - import:  wall time of `import <module>` (minus bare interpreter startup),
+             with the slowest imports from `python -X importtime`
+  - serve:   time from launching uvicorn on app:app until /health/live
+             answers (accepting traffic) and until /health/ready does
+             (storage client built, catalog cache loaded)
+
+Run with: python benchmarks/bench_startup.py [--runs 5] [--modules app,services.firestore]
+          [--memory] [--output results.json]
+--memory runs the server on the in-memory Firestore (FIRESTORE_BACKEND=memory)
+so no credentials or network are needed.
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code, env, extra_args=()):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *extra_args, "-c", code], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise SystemExit(f"`{code}` failed:\n{result.stderr[-2000:]}")
+    return elapsed, result.stderr
+
+
+def slowest_imports(importtime_output, top):
+    """[(cumulative ms, module), ...] from -X importtime output, slowest first"""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Only top-level entries of each import chain (indentation = nesting)
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1:
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def bench_import(module, runs, env, top):
+    baseline = statistics.median(run_python("pass", env)[0] for _ in range(runs))
+    times = [run_python(f"import {module}", env)[0] - baseline for _ in range(runs)]
+    _, importtime = run_python(f"import {module}", env, ("-X", "importtime"))
+    return {
+        "median_ms": round(statistics.median(times) * 1000, 1),
+        "min_ms": round(min(times) * 1000, 1),
+        "max_ms": round(max(times) * 1000, 1),
+        "slowest": [{"module": name, "cumulative_ms": round(ms, 1)} for ms, name in slowest_imports(importtime, top)],
+    }
+
+
+def _status(port, path):
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+        conn.request("GET", path)
+        return conn.getresponse().status
+    except OSError:
+        return None
+
+
+def bench_serve(port, env, timeout):
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    live = ready = None
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise SystemExit(f"Server exited with code {process.returncode}")
+            if live is None and _status(port, "/health/live") == 200:
+                live = time.perf_counter() - started
+            if live is not None and _status(port, "/health/ready") == 200:
+                ready = time.perf_counter() - started
+                break
+            time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return {
+        "live_ms": round(live * 1000, 1) if live is not None else None,
+        "ready_ms": round(ready * 1000, 1) if ready is not None else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API import time and time to ready")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--modules", default="app,services.firestore,routes.scholarships", help="Modules to time the import of")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list")
+    parser.add_argument("--memory", action="store_true", help="Use the in-memory Firestore (offline)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for readiness")
+    parser.add_argument("--no-serve", action="store_true", help="Only measure imports")
+    parser.add_argument("--output", help="Write results JSON here")
+    args = parser.parse_args()
+
+    env = dict(os.environ, OUTBOX_PATH=os.path.join(BACKEND_DIR, "benchmarks", ".startup-outbox.db"))
+    if args.memory:
+        env["FIRESTORE_BACKEND"] = "memory"
+
+    results = {"imports": {}}
+    for module in [m for m in args.modules.split(",") if m]:
+        row = bench_import(module, args.runs, env, args.top)
+        results["imports"][module] = row
+        print(f"import {module:<24} median {row['median_ms']:>7.1f}ms  (min {row['min_ms']:.1f}, max {row['max_ms']:.1f})")
+        for item in row["slowest"]:
+            print(f"    {item['cumulative_ms']:>8.1f}ms  {item['module']}")
+
+    if not args.no_serve:
+        runs = [bench_serve(args.port, env, args.timeout) for _ in range(args.runs)]
+        live = [r["live_ms"] for r in runs if r["live_ms"] is not None]
+        ready = [r["ready_ms"] for r in runs if r["ready_ms"] is not None]
+        results["serve"] = {
+            "runs": runs,
+            "live_median_ms": statistics.median(live) if live else None,
+            "ready_median_ms": statistics.median(ready) if ready else None,
+        }
+        print(f"uvicorn app:app  live after {results['serve']['live_median_ms']}ms, ready after {results['serve']['ready_median_ms']}ms (median of {args.runs})")
+
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(env["OUTBOX_PATH"] + suffix)
+        except OSError:
+            pass
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
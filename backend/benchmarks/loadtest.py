@@ -0,0 +1,291 @@
+"""
+End-to-end load test of the API, fully offline.
+
+Boots app.py under uvicorn in a child process with:
+  - the in-memory Firestore (services/memory_firestore.py) seeded with
+    synthetic scholarships, profiles and reminders (benchmarks/synthetic.py)
+  - a stub token verifier: "Bearer loadtest:<uid>" authenticates as <uid>
+  - the email outbox in a temporary SQLite file
+then drives mixed traffic at a fixed request rate (open loop: latency is
+measured from when a request was due, so a slow server can't hide queueing)
+and reports p50/p95/p99 latency and throughput per route.
+
+Firestore round-trip cost and failures can be simulated with --firestore-latency
+(FIRESTORE_MEMORY_LATENCY_MS syntax) and FIRESTORE_MEMORY_FAILURE_RATE.
+
+Run with: python benchmarks/loadtest.py [--rps 50] [--duration 30] [--mix profile=30,eligible=25,reminders=25,save=20]
+The server can also be started on its own (--serve) and targeted with --url.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import queue
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TOKEN_PREFIX = "loadtest:"
+
+# name -> (method, path); bodies for POSTs are built per request
+ROUTES = {
+    "profile": ("GET", "/profiles/me"),
+    "eligible": ("GET", "/scholarships/eligible?limit=20"),
+    "reminders": ("GET", "/reminders/"),
+    "save": ("POST", "/profiles"),
+}
+DEFAULT_MIX = "profile=30,eligible=25,reminders=25,save=20"
+
+
+async def stub_verifier(token):
+    """Accept "loadtest:<uid>" tokens without calling Firebase"""
+    if not token.startswith(TOKEN_PREFIX):
+        return None
+    uid = token[len(TOKEN_PREFIX):]
+    return {"uid": uid, "email": f"{uid}@example.com", "email_verified": True}
+
+
+def serve(args):
+    """Child process: seeded in-memory store + stub auth, then uvicorn on app.app"""
+    os.environ.setdefault("OUTBOX_PATH", os.path.join(tempfile.mkdtemp(prefix="fms-loadtest-"), "outbox.db"))
+    logging.basicConfig(level=logging.WARNING)
+
+    import uvicorn
+    from services.auth_dependency import set_token_verifier
+    from services.firestore import db
+    from services.memory_firestore import MemoryFirestore
+    from synthetic import make_profiles, make_reminders, make_scholarships, seed_store
+
+    scholarships = make_scholarships(args.scholarships, seed=args.seed)
+    profiles = make_profiles(args.profiles, seed=args.seed + 1)
+    store = MemoryFirestore.from_env()
+    seed_store(store, scholarships, profiles, make_reminders(profiles, scholarships, args.reminders_per_user, seed=args.seed + 2))
+    db.use_client(store)
+    set_token_verifier(stub_verifier)
+
+    import app
+    uvicorn.run(app.app, host=args.host, port=args.port, log_level="warning")
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.statuses = {}
+
+    def record(self, seconds, status):
+        self.latencies.append(seconds * 1000)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed):
+        latencies = sorted(self.latencies)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items(), key=str)},
+        }
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ROUTES:
+            raise SystemExit(f"Unknown route in --mix: {name} (choose from {', '.join(ROUTES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def save_body(rng, uid):
+    return {
+        "name": f"Student {uid}",
+        "state": rng.choice(["Maharashtra", "Delhi", "Karnataka", "Kerala"]),
+        "course": rng.choice(["B.Tech", "B.Sc", "MBBS", "BA"]),
+        "gender": rng.choice(["Male", "Female"]),
+        "income": rng.choice([90000, 180000, 400000]),
+        "caste": rng.choice(["General", "OBC", "SC", "ST"]),
+        "category": "Not Minority",
+        "marks": rng.randint(40, 99),
+    }
+
+
+def worker(host, port, jobs, stats, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        due, route, uid, body = job
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        method, path = ROUTES[route]
+        headers = {"Authorization": f"Bearer {TOKEN_PREFIX}{uid}"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException) as e:
+            status = type(e).__name__
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+        finished = time.perf_counter()
+        with lock:
+            stats[route].record(finished - due, status)
+    conn.close()
+
+
+def run_load(host, port, args):
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    rng = random.Random(args.seed)
+    stats = {name: RouteStats() for name in names}
+    lock = threading.Lock()
+    jobs = queue.Queue()
+
+    threads = [threading.Thread(target=worker, args=(host, port, jobs, stats, lock), daemon=True) for _ in range(args.connections)]
+    for thread in threads:
+        thread.start()
+
+    # Open loop: request i is due at start + i / rps regardless of how earlier ones went
+    started = time.perf_counter()
+    total = int(args.rps * args.duration)
+    for i in range(total):
+        due = started + i / args.rps
+        route = rng.choices(names, weights)[0]
+        uid = f"user_{rng.randrange(args.profiles)}"
+        jobs.put((due, route, uid, save_body(rng, uid) if route == "save" else None))
+        # Keep the queue short so scheduling stays close to real time
+        while jobs.qsize() > args.connections * 4 and time.perf_counter() < due:
+            time.sleep(0.001)
+
+    for _ in threads:
+        jobs.put(None)
+    for thread in threads:
+        thread.join(timeout=args.duration + 60)
+    elapsed = time.perf_counter() - started
+    return {name: s.summary(elapsed) for name, s in stats.items()}, elapsed
+
+
+def wait_ready(host, port, process=None, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f"Server exited with code {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise SystemExit(f"Server did not come up on {host}:{port} within {timeout}s")
+
+
+def warm_up(host, port):
+    """Load the catalog cache before measuring"""
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    conn.request("GET", ROUTES["eligible"][1], headers={"Authorization": f"Bearer {TOKEN_PREFIX}user_0"})
+    conn.getresponse().read()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end load test of the API")
+    parser.add_argument("--rps", type=float, default=50, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of traffic")
+    parser.add_argument("--connections", type=int, default=16, help="Concurrent keep-alive connections")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Route weights, e.g. profile=30,eligible=25")
+    parser.add_argument("--scholarships", type=int, default=1000)
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--reminders-per-user", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--firestore-latency", help="Simulated Firestore latency in ms, e.g. 20 or read=15,query=40")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", action="store_true", help="Only run the seeded server")
+    parser.add_argument("--url", help="Target an already running --serve server instead of starting one")
+    parser.add_argument("--output", help="Write results JSON here")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    process = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        host, port = args.host, args.port
+        command = [sys.executable, os.path.abspath(__file__), "--serve"] + [
+            f"--{name}={getattr(args, name.replace('-', '_'))}"
+            for name in ("scholarships", "profiles", "reminders-per-user", "seed", "host", "port")
+        ]
+        env = dict(os.environ)
+        if args.firestore_latency:
+            env["FIRESTORE_MEMORY_LATENCY_MS"] = args.firestore_latency
+        process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+    try:
+        wait_ready(host, port, process)
+        warm_up(host, port)
+        print(f"Load: {args.rps:g} rps for {args.duration:g}s over {args.connections} connections ({args.mix})")
+        results, elapsed = run_load(host, port, args)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    print(f"{'route':<10} {'requests':>8} {'errors':>6} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, row in results.items():
+        print(
+            f"{name:<10} {row['requests']:>8} {row['errors']:>6} {row['throughput_rps']:>7.1f} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+        )
+    achieved = sum(row["requests"] for row in results.values()) / elapsed
+    print(f"Total: {achieved:.1f} rps achieved (target {args.rps:g})")
+
+    if args.output:
+        report = {
+            "params": {k: v for k, v in vars(args).items() if k not in ("serve", "url", "output")},
+            "elapsed_s": round(elapsed, 2),
+            "achieved_rps": round(achieved, 2),
+            "routes": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Synthetic scholarship and profile generators for benchmarks and load tests.
+
+Scholarships are raw scraper dicts shaped like scrapers/mock_scraper.py
+output (state/caste/category/gender/course/income/marks condition mixes);
+profiles look like what routes/profile.py saves. Both are deterministic for
+a given seed.
+"""
+import random
+from datetime import datetime, timedelta
+
+from utils.normalizer import normalize, rules_to_firestore, to_firestore
+
+STATES = [
+    "Maharashtra", "Uttar Pradesh", "Delhi", "Karnataka", "Tamil Nadu", "Kerala",
+    "West Bengal", "Gujarat", "Rajasthan", "Bihar", "Punjab", "Telangana",
+]
+CASTES = ["General", "OBC", "SC", "ST"]
+CATEGORIES = ["Minority", "Not Minority"]
+GENDERS = ["Male", "Female", "Other"]
+COURSES = ["B.Tech", "B.E.", "MBBS", "B.Sc", "B.Com", "BA", "M.Tech", "Diploma", "Polytechnic", "MBA"]
+INCOME_LIMITS = [80000, 150000, 200000, 250000, 300000, 450000, 600000, 800000]
+MARKS_CUTOFFS = [50, 55, 60, 65, 70, 75, 80, 85]
+ICONS = ["🎓", "🏛️", "⚙️", "👧", "🕌", "🏙️"]
+
+
+def _state_scholarship(rng, i):
+    state = rng.choice(STATES)
+    conditions = [
+        {"field": "state", "operator": "==", "value": state},
+        {"field": "income", "operator": "<=", "value": rng.choice(INCOME_LIMITS)},
+    ]
+    if rng.random() < 0.6:
+        conditions.append({"field": "caste", "operator": "IN", "value": rng.sample(CASTES[1:], rng.randint(1, 3))})
+    return f"{state} Government Scholarship #{i}", f"Government of {state}", "State-specific", True, state, conditions
+
+
+def _central_scholarship(rng, i):
+    conditions = [
+        {"field": "income", "operator": "<=", "value": rng.choice(INCOME_LIMITS)},
+        {"field": "marks", "operator": ">=", "value": rng.choice(MARKS_CUTOFFS)},
+    ]
+    category = "Merit-based"
+    if rng.random() < 0.3:
+        conditions.append({"field": "gender", "operator": "==", "value": "Female"})
+        category = "Gender-based"
+    elif rng.random() < 0.3:
+        conditions.append({"field": "category", "operator": "==", "value": "Minority"})
+        category = "Minority"
+    return f"Central Merit Scholarship #{i}", "Ministry of Education", category, False, "", conditions
+
+
+def _course_scholarship(rng, i):
+    conditions = [
+        {"field": "course", "operator": "IN", "value": rng.sample(COURSES, rng.randint(2, 5))},
+        {"field": "income", "operator": "<=", "value": rng.choice(INCOME_LIMITS)},
+        {"field": "marks", "operator": ">=", "value": rng.choice(MARKS_CUTOFFS)},
+    ]
+    return f"Technical Education Scholarship #{i}", "All India Council for Technical Education (AICTE)", "Technical", False, "", conditions
+
+
+TEMPLATES = [(_state_scholarship, 0.5), (_central_scholarship, 0.3), (_course_scholarship, 0.2)]
+
+
+def make_scholarships(n, seed=42):
+    """n raw scholarship dicts, like a scraper run"""
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1)
+    builders, weights = zip(*TEMPLATES)
+    scholarships = []
+    for i in range(n):
+        name, provider, category, state_specific, state, conditions = rng.choices(builders, weights)[0](rng, i)
+        scholarships.append({
+            "name": name,
+            "provider": provider,
+            "description": f"{name} supports eligible students with tuition and maintenance costs. " * 3,
+            "amount": f"₹{rng.choice([5, 10, 15, 25, 30, 50])},000 per annum",
+            "deadline": (now + timedelta(days=rng.randint(10, 200))).strftime("%Y-%m-%d"),
+            "eligibility_conditions": conditions,
+            "source_url": f"https://example.gov.in/scholarships/{i}",
+            "application_link": f"https://example.gov.in/scholarships/{i}/apply",
+            "official_only": True,
+            "category": category,
+            "state_specific": state_specific,
+            "state": state,
+            "source": "synthetic",
+            "icon": rng.choice(ICONS),
+        })
+    return scholarships
+
+
+def make_profiles(n, seed=7):
+    """n profile dicts as saved by POST /profiles"""
+    rng = random.Random(seed)
+    profiles = []
+    for i in range(n):
+        profiles.append({
+            "name": f"Student {i}",
+            "state": rng.choice(STATES),
+            "course": rng.choice(COURSES),
+            "phone": "",
+            "gender": rng.choice(GENDERS),
+            "income": float(rng.choice([50000, 90000, 120000, 180000, 250000, 400000, 700000, 1200000])),
+            "caste": rng.choices(CASTES, [0.4, 0.3, 0.2, 0.1])[0],
+            "category": rng.choices(CATEGORIES, [0.2, 0.8])[0],
+            "marks": float(rng.randint(40, 99)),
+            "userId": f"user_{i}",
+        })
+    return profiles
+
+
+def make_reminders(profiles, scholarships, per_user=5, seed=11):
+    """Reminder docs ({doc_id: data}) for per_user scholarships of each profile"""
+    from routes.reminders import build_reminder
+
+    rng = random.Random(seed)
+    reminders = {}
+    for profile in profiles:
+        uid = profile["userId"]
+        for raw in rng.sample(scholarships, min(per_user, len(scholarships))):
+            scholarship = normalize(raw)
+            reminders[f"{uid}_{scholarship.id}"] = build_reminder(
+                uid, f"{uid}@example.com", scholarship.id, {"name": scholarship.name, "deadline": scholarship.deadline},
+            )
+    return reminders
+
+
+def seed_store(client, scholarships=(), profiles=(), reminders=None):
+    """Write raw scholarships (+ rules), profiles and reminder docs into a Firestore-like client"""
+    created_at = datetime(2026, 1, 1).isoformat()
+    for raw in scholarships:
+        scholarship = normalize(raw)
+        data = to_firestore(scholarship)
+        data["created_at"] = created_at
+        client.collection("scholarships").document(scholarship.id).set(data)
+        client.collection("eligibility_rules").document(f"{scholarship.id}_rules").set(rules_to_firestore(scholarship))
+    for profile in profiles:
+        client.collection("profiles").document(profile["userId"]).set(profile)
+    for doc_id, reminder in (reminders or {}).items():
+        client.collection("reminders").document(doc_id).set(reminder)
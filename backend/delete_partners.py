@@ -1,19 +1,6 @@
-
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
-
-# Initialize Firestore mostly same way as checking env
-# Assuming standard google credentials logic
-if os.getenv("FIREBASE_CREDENTIALS"):
-    import json
-    cred = credentials.Certificate(json.loads(os.getenv("FIREBASE_CREDENTIALS")))
-    firebase_admin.initialize_app(cred)
-else:
-    # Try default
-    firebase_admin.initialize_app()
-
-db = firestore.client()
+# Shared client: same credential lookup as the app (FIREBASE_CREDENTIALS,
+# GOOGLE_APPLICATION_CREDENTIALS, default credentials), or FIRESTORE_BACKEND=memory
+from services.firestore import db
 
 def delete_scholarships():
     print("🔍 Searching for scholarships with provider 'Buddy4Study Partner'...")
@@ -59,8 +46,10 @@ def delete_scholarships():
     batch = db.batch()
     batch_size = 0
     
-    for sch_id in deleted_ids:
-        rules = db.collection("eligibility_rules").where("scholarshipId", "==", sch_id).stream()
+    # One query per 30 ids (Firestore 'in' limit) instead of one per scholarship
+    for i in range(0, len(deleted_ids), 30):
+        chunk = deleted_ids[i:i + 30]
+        rules = db.collection("eligibility_rules").where("scholarshipId", "in", chunk).select([]).stream()
         for rule in rules:
             batch.delete(rule.reference)
             rules_count += 1
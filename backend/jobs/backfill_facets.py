@@ -0,0 +1,58 @@
+"""
+Backfill the eligibility facets on scholarship documents.
+
+The pushdown query in services.catalog.CatalogCache.candidates filters on
+states/max_income/min_marks (and the caste/gender/course arrays), and
+Firestore leaves documents without those fields out of the result. Documents
+written before facets existed, or with facets from an older rule, are
+rewritten here from their eligibility rules (utils.normalizer.facets).
+Only documents whose facets differ are updated, so re-running is cheap.
+
+Run from backend/: python -m jobs.backfill_facets [--dry-run]
+"""
+import argparse
+import json
+import logging
+import time
+
+from repositories import store
+from utils.normalizer import FACET_KEYS, Condition, facets
+
+logger = logging.getLogger(__name__)
+
+
+def backfill(dry_run=False):
+    started = time.perf_counter()
+    rules = store.rules.all()
+    documents = store.scholarships.active(fields=list(FACET_KEYS))
+
+    updates = {}
+    for sch_id, data in documents:
+        expected = facets(tuple(Condition.from_dict(c) for c in rules.get(sch_id) or ()))
+        if any(data.get(key) != value for key, value in expected.items()):
+            updates[sch_id] = expected
+
+    if updates and not dry_run:
+        store.scholarships.update_facets(updates)
+
+    logger.info(f"🧭 Facets: {len(updates)} of {len(documents)} active scholarships {'need' if dry_run else 'got'} new facets")
+    return {
+        "scholarships": len(documents),
+        "updated": 0 if dry_run else len(updates),
+        "stale": len(updates),
+        "dry_run": dry_run,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite scholarship eligibility facets from their rules")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the documents that would change")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    print(json.dumps(backfill(dry_run=args.dry_run), indent=2))
+
+
+if __name__ == "__main__":
+    main()
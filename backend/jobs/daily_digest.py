@@ -0,0 +1,155 @@
+"""
+Daily digest for users with profiles.reminder_mode == "digest".
+
+Each digest user gets at most one email per day that combines all of their
+due deadline reminders (deadlines already past are marked expired, not
+listed) with scholarships added since their last digest that
+they are eligible for. The email is rendered once per user, sent through the
+pooled mailer, and the reminders/profiles are updated in batched writes.
+profiles.last_digest_on makes a second run on the same day a no-op.
+
+Run daily from backend/: python -m jobs.daily_digest [--dry-run]
+"""
+import argparse
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+
+from repositories import store
+from services.email_service import mailer
+from services.catalog import catalog
+from services.eligibility_engine import evaluate_conditions
+from services.metrics import metrics
+from jobs.reminder_dispatcher import fetch_due, group_by_user
+from utils.normalizer import parse_deadline
+
+logger = logging.getLogger(__name__)
+
+MAX_NEW_MATCHES = 10
+
+
+def load_digest_profiles(today):
+    """Digest-mode profiles that haven't had today's digest yet"""
+    return {
+        uid: data for uid, data in store.profiles.with_reminder_mode("digest")
+        if data.get("last_digest_on") != today and data.get("email")
+    }
+
+
+def new_matches(profile, new_scholarships, since, exclude_ids):
+    """Eligible scholarships created after `since`, best score first"""
+    matches, evaluated = [], 0
+    for sch in new_scholarships:
+        if sch.created_at <= since or sch.id in exclude_ids or not sch.conditions:
+            continue
+        evaluation = evaluate_conditions(profile, sch.conditions)
+        evaluated += 1
+        if evaluation["eligible"]:
+            matches.append((evaluation["score"], sch))
+    metrics.evaluations(evaluated)
+    matches.sort(key=lambda m: m[0], reverse=True)
+    return matches[:MAX_NEW_MATCHES]
+
+
+def render_digest_email(profile, reminders, matches, today):
+    name = profile.get("name") or "there"
+    subject = f"📰 Your FundMyStudy digest for {today.strftime('%d %b %Y')}"
+
+    sections = []
+    if reminders:
+        lines = []
+        for item in sorted(reminders, key=lambda r: r.get("deadline") or ""):
+            deadline = parse_deadline(item.get("deadline"))
+            when = f"{(deadline.date() - today).days} days left" if deadline else "check the portal"
+            lines.append(f"  ⏰ {item.get('scholarshipName', 'Scholarship')} - {item.get('deadline')} ({when})")
+        sections.append("Upcoming deadlines:\n" + "\n".join(lines))
+    if matches:
+        lines = [
+            f"  🎓 {sch.name} ({sch.provider}) - {round(score * 100)}% match, deadline {sch.deadline or 'Not specified'}"
+            for score, sch in matches
+        ]
+        sections.append("New scholarships you may be eligible for:\n" + "\n".join(lines))
+
+    body = f"Hello {name},\n\n" + "\n\n".join(sections) + "\n\nBest,\nFundMyStudy Team"
+    return subject, body
+
+
+def run_digest(now=None, dry_run=False):
+    started = time.perf_counter()
+    now = now or datetime.utcnow()
+    today = now.date()
+
+    profiles = load_digest_profiles(today.isoformat())
+    if not profiles:
+        logger.info("📰 No digest users due today")
+        return {"status": "success", "users": 0, "emails_sent": 0}
+
+    due = [(reminder_id, data) for reminder_id, data in fetch_due(now.isoformat()) if data.get("userId") in profiles]
+    # Deadlines that already passed are closed without being listed, like in the dispatcher
+    expired, current = [], []
+    for reminder_id, data in due:
+        deadline = parse_deadline(data.get("deadline"))
+        (expired if deadline and deadline.date() < today else current).append((reminder_id, data))
+    reminders_by_user = group_by_user(current)
+
+    # Only scholarships newer than the oldest "since" among these users need evaluating
+    default_since = (now - timedelta(days=1)).isoformat()
+    oldest_since = min(p.get("last_digest_at") or default_since for p in profiles.values())
+    new_scholarships = [s for s in catalog.get() if s.created_at and s.created_at > oldest_since]
+
+    users, messages = [], []
+    for uid, profile in profiles.items():
+        reminders = reminders_by_user.get(uid, {}).get("items", [])
+        since = profile.get("last_digest_at") or default_since
+        matches = new_matches(profile, new_scholarships, since, {r.get("scholarshipId") for r in reminders})
+        if not reminders and not matches:
+            continue
+        users.append((uid, reminders))
+        messages.append((profile["email"], *render_digest_email(profile, reminders, matches, today)))
+
+    logger.info(
+        f"📰 {len(messages)} digests to send ({len(profiles)} digest users, {len(current)} due reminders, {len(expired)} expired)"
+    )
+    if dry_run:
+        return {"status": "dry_run", "users": len(profiles), "digests": len(messages), "expired": len(expired)}
+
+    results = mailer.send_many(messages)
+
+    sent_users, reminder_ids, failed = [], [], 0
+    for (uid, reminders), result in zip(users, results):
+        if result.get("status") == "error":
+            failed += 1
+            continue
+        sent_users.append(uid)
+        reminder_ids.extend(item["id"] for item in reminders)
+
+    now_iso = datetime.utcnow().isoformat()
+    store.reminders.update_many(reminder_ids, {"status": "notified", "notifiedAt": now_iso})
+    store.reminders.update_many([reminder_id for reminder_id, _ in expired], {"status": "expired"})
+    store.profiles.update_many(sent_users, {"last_digest_on": today.isoformat(), "last_digest_at": now_iso})
+
+    summary = {
+        "status": "success",
+        "users": len(profiles),
+        "emails_sent": len(sent_users),
+        "emails_failed": failed,
+        "reminders_marked": len(reminder_ids),
+        "expired": len(expired),
+        "duration_s": round(time.perf_counter() - started, 2),
+    }
+    logger.info(f"✅ Digest run complete: {summary}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send daily digest emails")
+    parser.add_argument("--dry-run", action="store_true", help="Count digests without sending")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    print(json.dumps(run_digest(dry_run=args.dry_run), indent=2))
+
+
+if __name__ == "__main__":
+    main()
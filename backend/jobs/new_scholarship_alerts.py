@@ -0,0 +1,143 @@
+"""
+New-scholarship alert fan-out.
+
+Reverse-matches new (or explicitly named, e.g. re-scraped with changed rules)
+scholarships against every profile using a columnar snapshot
+(services.profile_matrix), so no per-user evaluate_conditions loop runs, and
+queues one email per matched user in the outbox. Users in digest mode are
+skipped - jobs.daily_digest already includes their new matches - as are
+profiles without an email and scholarships without any conditions.
+
+Outbox dedup keys are per (user, set of scholarships), so re-running the same
+window doesn't email anyone twice. The job drains the outbox before it exits,
+as there are no outbox workers in a one-shot process.
+
+Run from backend/: python -m jobs.new_scholarship_alerts [--since ISO] [--ids a,b] [--dry-run]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from repositories import store
+from services.catalog import CATALOG_FIELDS
+from services.outbox import outbox, dedup_key
+from services.profile_matrix import ProfileMatrix
+from utils.normalizer import from_firestore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_HOURS = 24
+PROFILE_FIELDS = ["email", "reminder_mode"]
+
+
+def load_scholarships(since=None, ids=()):
+    """Active scholarships created after `since` plus the given ids, with their rules"""
+    docs = {}
+    if since:
+        docs.update(store.scholarships.created_after(since, fields=CATALOG_FIELDS))
+    if ids:
+        docs.update(store.scholarships.get_many(list(ids), fields=CATALOG_FIELDS))
+    docs = {sch_id: data for sch_id, data in docs.items() if data.get("active", True)}
+    if not docs:
+        return []
+
+    rules = store.rules.for_scholarships(list(docs))
+    return [from_firestore(sch_id, data, rules.get(sch_id)) for sch_id, data in docs.items()]
+
+
+def match_users(matrix, scholarships):
+    """{profile index: [(score, Scholarship), ...]} for notifiable users"""
+    email = matrix.column("email")
+    mode = matrix.column("reminder_mode")
+    notifiable = email.truthy & ~mode.match(lambda v: v == "digest")
+
+    matches = {}
+    for sch in scholarships:
+        eligible, scores = matrix.evaluate(sch.conditions)
+        hits = np.flatnonzero(eligible & notifiable)
+        logger.info(f"🎯 {sch.name[:50]}: {int(eligible.sum())} eligible profiles, {len(hits)} to notify")
+        for i, score in zip(hits.tolist(), scores[hits].tolist()):
+            matches.setdefault(i, []).append((round(score, 2), sch))
+    return matches
+
+
+def render_alert_email(profile, matches):
+    name = profile.get("name") or "there"
+    matches = sorted(matches, key=lambda m: m[0], reverse=True)
+    if len(matches) == 1:
+        subject = f"🎓 New scholarship for you: {matches[0][1].name}"
+    else:
+        subject = f"🎓 {len(matches)} new scholarships you may be eligible for"
+    lines = [
+        f"🎓 {sch.name} ({sch.provider}) - {round(score * 100)}% match\n📅 Deadline: {sch.deadline or 'Not specified'}"
+        for score, sch in matches
+    ]
+    body = f"Hello {name},\n\nNew scholarships matching your profile were just added:\n\n" \
+        + "\n\n".join(lines) \
+        + "\n\nLog in to FundMyStudy to see the details and set reminders.\n\nBest,\nFundMyStudy Team"
+    return subject, body
+
+
+def run_alerts(since=None, ids=(), dry_run=False):
+    started = time.perf_counter()
+    scholarships = [s for s in load_scholarships(since, ids) if s.conditions]
+    if not scholarships:
+        logger.info("🎓 No new scholarships to announce")
+        return {"status": "success", "scholarships": 0, "users": 0, "queued": 0}
+
+    fields = {c.field for s in scholarships for c in s.conditions if c.field}
+    matrix = ProfileMatrix.load(fields | set(PROFILE_FIELDS))
+    matched_at = time.perf_counter()
+    matches = match_users(matrix, scholarships)
+    match_ms = (time.perf_counter() - matched_at) * 1000
+
+    messages = []
+    for i, user_matches in matches.items():
+        uid, profile = matrix.uids[i], matrix.rows[i]
+        batch_key = hashlib.sha1(",".join(sorted(sch.id for _, sch in user_matches)).encode()).hexdigest()[:16]
+        subject, body = render_alert_email(profile, user_matches)
+        messages.append((profile["email"], subject, body, dedup_key(uid, batch_key, "new_match")))
+
+    logger.info(f"🎯 {len(scholarships)} scholarships matched against {len(matrix)} profiles in {match_ms:.0f}ms")
+    if dry_run:
+        return {"status": "dry_run", "scholarships": len(scholarships), "profiles": len(matrix), "users": len(messages)}
+
+    queued = outbox.enqueue_many(messages)
+    summary = {
+        "status": "success",
+        "scholarships": len(scholarships),
+        "profiles": len(matrix),
+        "users": len(messages),
+        "queued": queued,
+        "match_ms": round(match_ms),
+        "duration_s": round(time.perf_counter() - started, 2),
+    }
+    logger.info(f"✅ New scholarship alerts queued: {summary}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Email users who are eligible for newly added scholarships")
+    parser.add_argument("--since", help="ISO timestamp; scholarships created after it (default: last 24h)")
+    parser.add_argument("--ids", default="", help="Comma-separated scholarship ids to announce (e.g. changed rules)")
+    parser.add_argument("--dry-run", action="store_true", help="Count matches without queueing emails")
+    args = parser.parse_args()
+
+    ids = [i for i in args.ids.split(",") if i]
+    since = args.since or (None if ids else (datetime.utcnow() - timedelta(hours=DEFAULT_WINDOW_HOURS)).isoformat())
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    summary = run_alerts(since=since, ids=ids, dry_run=args.dry_run)
+    if not args.dry_run:
+        # No outbox workers in a one-shot job: deliver before exiting
+        summary["outbox"] = outbox.drain()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Nightly full recompute of every user's eligible scholarships.
+
+Loads all profiles and the full active catalog once, splits the profiles into
+chunks sized so scoring a chunk stays under RECOMPUTE_CHUNK_MB, and scores the
+chunks on a process pool (a few chunks in flight per worker) with
+services.profile_matrix (same results as evaluate_conditions). Each user's
+top RECOMPUTE_TOP_K matches are written to matches/{uid} one chunk at a time
+(store.matches; a BulkWriter on Firestore).
+Scholarships without conditions are skipped, like in /scholarships/eligible.
+
+Run from backend/: python -m jobs.recompute_matches [--workers N] [--chunk-mb M] [--dry-run]
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+import numpy as np
+
+from repositories import store
+from services.catalog import load_active_scholarships
+from services.profile_matrix import ProfileMatrix, round_scores
+
+logger = logging.getLogger(__name__)
+
+RECOMPUTE_WORKERS = int(os.getenv("RECOMPUTE_WORKERS", os.cpu_count() or 1))
+RECOMPUTE_CHUNK_MB = int(os.getenv("RECOMPUTE_CHUNK_MB", 256))
+RECOMPUTE_TOP_K = int(os.getenv("RECOMPUTE_TOP_K", 100))
+MIN_CHUNK_ROWS = 100
+
+# Peak bytes per profile and scholarship while scoring a chunk (score_chunk):
+# the float64 scores (8) plus round_scores' np.unique temporaries - flattened
+# copy, int64 argsort permutation, sorted copy, int64 inverse and cumsum (40)
+# and its bool mask (1). The rounded copy, -scores and the int64 argsort
+# output are allocated after those are freed. Measured with tracemalloc at
+# ~49 (tests/test_recompute_matches.py); rounded up for headroom.
+CELL_BYTES = 56
+# Per profile and field: code, number and truthy flag
+COLUMN_BYTES = 17
+# Chunks submitted ahead of the results being written, per worker
+CHUNKS_IN_FLIGHT = 2
+
+_rulesets = None
+
+
+def chunk_rows(n_scholarships, n_fields, chunk_mb=RECOMPUTE_CHUNK_MB):
+    """How many profiles fit in one chunk under the memory cap"""
+    per_row = CELL_BYTES * n_scholarships + COLUMN_BYTES * n_fields
+    return max(MIN_CHUNK_ROWS, (chunk_mb * 1024 * 1024) // max(per_row, 1))
+
+
+def _init_worker(rulesets):
+    global _rulesets
+    _rulesets = rulesets
+
+
+def score_chunk(uids, rows, rulesets=None, top_k=RECOMPUTE_TOP_K):
+    """
+    (top scholarship indexes, their rounded scores, eligible counts) for one
+    chunk of profiles; row i of each array belongs to uids[i], best match first
+    and -1 scores past the eligible count
+    """
+    rulesets = rulesets if rulesets is not None else _rulesets
+    matrix = ProfileMatrix(uids, rows)
+    scores = np.full((len(uids), len(rulesets)), -1.0)
+    for j, conditions in enumerate(rulesets):
+        eligible, values = matrix.evaluate(conditions)
+        scores[eligible, j] = values[eligible]
+
+    counts = (scores >= 0).sum(axis=1)
+    scores = round_scores(scores)
+    top = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    return top.astype(np.int32), top_scores, counts
+
+
+def _score_chunk(chunk):
+    start, uids, rows = chunk
+    return start, score_chunk(uids, rows)
+
+
+def _imap_unordered(pool, fn, items, window):
+    """
+    pool.map over an iterable, submitting at most `window` items ahead of the
+    results consumed (Executor.map submits everything up front), yielding
+    results as they complete
+    """
+    pending = set()
+    for item in items:
+        pending.add(pool.submit(fn, item))
+        if len(pending) >= window:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+def recompute(workers=RECOMPUTE_WORKERS, chunk_mb=RECOMPUTE_CHUNK_MB, dry_run=False):
+    started = time.perf_counter()
+    scholarships = [s for s in load_active_scholarships() if s.conditions]
+    if not scholarships:
+        logger.info("📚 No scholarships with rules; nothing to recompute")
+        return {"status": "success", "profiles": 0, "scholarships": 0}
+
+    fields = {c.field for s in scholarships for c in s.conditions if c.field}
+    matrix = ProfileMatrix.load(fields)
+    rulesets = [[c.to_dict() for c in s.conditions] for s in scholarships]
+    size = chunk_rows(len(scholarships), len(fields), chunk_mb)
+    n_chunks = -(-len(matrix) // size)
+    chunks = (
+        (start, matrix.uids[start:start + size], matrix.rows[start:start + size])
+        for start in range(0, len(matrix), size)
+    )
+    logger.info(
+        f"🧮 Scoring {len(matrix)} profiles x {len(scholarships)} scholarships "
+        f"in {n_chunks} chunks of {size} on {workers} workers"
+    )
+
+    computed_at = datetime.utcnow().isoformat()
+    done = written = eligible_pairs = 0
+
+    def write(start, result):
+        nonlocal written, eligible_pairs
+        top, top_scores, counts = result
+        eligible_pairs += int(counts.sum())
+        if dry_run:
+            return
+        matches = {}
+        for i, (indexes, values, count) in enumerate(zip(top.tolist(), top_scores.tolist(), counts.tolist())):
+            n = min(count, len(indexes))
+            matches[matrix.uids[start + i]] = {
+                "userId": matrix.uids[start + i],
+                "scholarships": [{"id": scholarships[j].id, "score": score} for j, score in zip(indexes[:n], values[:n])],
+                "eligible_count": count,
+                "computed_at": computed_at,
+            }
+        store.matches.save_many(matches)
+        written += len(matches)
+
+    def report(n):
+        nonlocal done
+        done += n
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed else 0
+        eta = (len(matrix) - done) / rate if rate else 0
+        logger.info(f"📈 {done}/{len(matrix)} profiles ({done * 100 // max(len(matrix), 1)}%), {rate:.0f}/s, ETA {eta:.0f}s")
+
+    if workers <= 1 or n_chunks == 1:
+        for start, uids, rows in chunks:
+            write(start, score_chunk(uids, rows, rulesets))
+            report(len(uids))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rulesets,)) as pool:
+            for start, result in _imap_unordered(pool, _score_chunk, chunks, workers * CHUNKS_IN_FLIGHT):
+                write(start, result)
+                report(len(result[2]))
+
+    summary = {
+        "status": "dry_run" if dry_run else "success",
+        "profiles": len(matrix),
+        "scholarships": len(scholarships),
+        "eligible_pairs": eligible_pairs,
+        "written": written,
+        "chunks": n_chunks,
+        "duration_s": round(time.perf_counter() - started, 2),
+    }
+    logger.info(f"✅ Match recompute complete: {summary}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute every user's eligible scholarships")
+    parser.add_argument("--workers", type=int, default=RECOMPUTE_WORKERS)
+    parser.add_argument("--chunk-mb", type=int, default=RECOMPUTE_CHUNK_MB, help="Memory cap per chunk's score matrix")
+    parser.add_argument("--dry-run", action="store_true", help="Score everything without writing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    print(json.dumps(recompute(workers=args.workers, chunk_mb=args.chunk_mb, dry_run=args.dry_run), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Deadline reminder dispatcher.
+
+Finds reminders whose notify_at has passed with one indexed range query
+(store.reminders.due: status == active, notify_at <= now, see
+infra/firestore.indexes.json), paginated by a (notify_at, id) cursor, sends
+one email per user through the pooled mailer and marks the reminders in
+batched writes. Works on either STORAGE_BACKEND. Only 'active' reminders are
+picked up, so re-running the job never sends the same reminder twice;
+reminders without an email address are marked 'skipped' rather than fetched
+again on every run. Users who chose the daily digest
+(profiles.reminder_mode) are left to jobs.daily_digest.
+
+Run from backend/: python -m jobs.reminder_dispatcher [--dry-run]
+"""
+import argparse
+import json
+import logging
+import time
+from datetime import datetime
+
+from repositories import store
+from services.email_service import mailer
+from utils.normalizer import parse_deadline
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+REMINDER_FIELDS = ["userId", "email", "scholarshipId", "scholarshipName", "deadline", "notify_at"]
+
+
+def fetch_due(now_iso, page_size=PAGE_SIZE):
+    """[(id, data), ...] for all active reminders with notify_at <= now, one page at a time"""
+    due = []
+    after = None
+    while True:
+        page = store.reminders.due(now_iso, page_size, after=after, fields=REMINDER_FIELDS)
+        due.extend(page)
+        logger.info(f"📥 Fetched {len(due)} due reminders so far")
+        if len(page) < page_size:
+            return due
+        last_id, last = page[-1]
+        after = (last.get("notify_at"), last_id)
+
+
+def group_by_user(reminders):
+    """{userId: {"email": str, "items": [reminder dict with its "id", ...]}}"""
+    groups = {}
+    for reminder_id, data in reminders:
+        data = {**data, "id": reminder_id}
+        group = groups.setdefault(data.get("userId"), {"email": data.get("email"), "items": []})
+        group["items"].append(data)
+    return groups
+
+
+def load_reminder_modes(uids):
+    """{userId: "instant" | "digest"} from the users' profiles, in one multi-get"""
+    profiles = store.profiles.get_many(uids, fields=["reminder_mode"])
+    return {uid: data.get("reminder_mode", "instant") for uid, data in profiles.items()}
+
+
+def render_reminder_email(items, today):
+    items = sorted(items, key=lambda r: r.get("deadline") or "")
+    if len(items) == 1:
+        subject = f"⏰ Deadline approaching: {items[0].get('scholarshipName', 'Scholarship')}"
+    else:
+        subject = f"⏰ {len(items)} scholarship deadlines are approaching"
+
+    lines = []
+    for item in items:
+        deadline = parse_deadline(item.get("deadline"))
+        days_left = (deadline.date() - today).days if deadline else None
+        when = f"{days_left} days left" if days_left is not None else "check the portal"
+        lines.append(f"🎓 {item.get('scholarshipName', 'Scholarship')}\n📅 Deadline: {item.get('deadline')} ({when})")
+
+    body = "Hello,\n\nThis is your reminder for the following scholarship deadlines:\n\n" \
+        + "\n\n".join(lines) \
+        + "\n\nDon't miss out - apply soon!\n\nBest,\nFundMyStudy Team"
+    return subject, body
+
+
+def dispatch(now=None, dry_run=False, page_size=PAGE_SIZE):
+    started = time.perf_counter()
+    now = now or datetime.utcnow()
+    today = now.date()
+
+    due = fetch_due(now.isoformat(), page_size)
+
+    # Deadlines that already passed are closed without an email
+    expired, pending = [], []
+    for reminder_id, data in due:
+        deadline = parse_deadline(data.get("deadline"))
+        (expired if deadline and deadline.date() < today else pending).append((reminder_id, data))
+
+    groups = group_by_user(pending)
+    modes = load_reminder_modes(list(groups))
+    instant = [(uid, g) for uid, g in groups.items() if modes.get(uid) != "digest"]
+    users = [(uid, g) for uid, g in instant if g["email"]]
+    # No address to send to: close them, or every sweep would fetch them again
+    skipped_ids = [item["id"] for _, g in instant if not g["email"] for item in g["items"]]
+    digest_users = sum(1 for uid in groups if modes.get(uid) == "digest")
+    messages = [(g["email"], *render_reminder_email(g["items"], today)) for _, g in users]
+    logger.info(
+        f"📬 {len(pending)} due reminders for {len(users)} users "
+        f"({digest_users} digest users deferred, {len(skipped_ids)} without an email, {len(expired)} expired)"
+    )
+
+    if dry_run:
+        return {
+            "status": "dry_run", "due": len(pending), "users": len(users),
+            "skipped": len(skipped_ids), "expired": len(expired),
+        }
+
+    results = mailer.send_many(messages)
+
+    sent_ids, failed = [], 0
+    for (uid, group), result in zip(users, results):
+        if result.get("status") == "error":
+            failed += 1
+            continue
+        sent_ids.extend(item["id"] for item in group["items"])
+
+    notified_at = datetime.utcnow().isoformat()
+    store.reminders.update_many(sent_ids, {"status": "notified", "notifiedAt": notified_at})
+    store.reminders.update_many([reminder_id for reminder_id, _ in expired], {"status": "expired"})
+    store.reminders.update_many(skipped_ids, {"status": "skipped", "skippedReason": "no email"})
+
+    summary = {
+        "status": "success",
+        "due": len(pending),
+        "users": len(users),
+        "digest_users_deferred": digest_users,
+        "emails_sent": len(users) - failed,
+        "emails_failed": failed,
+        "reminders_marked": len(sent_ids),
+        "skipped": len(skipped_ids),
+        "expired": len(expired),
+        "duration_s": round(time.perf_counter() - started, 2),
+    }
+    logger.info(f"✅ Reminder dispatch complete: {summary}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send due scholarship deadline reminders")
+    parser.add_argument("--dry-run", action="store_true", help="Count due reminders without sending")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    print(json.dumps(dispatch(dry_run=args.dry_run, page_size=args.page_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Storage for scholarships, eligibility rules, profiles, reminders and matches.
+
+Routes and services use `store` instead of reaching into the Firestore client:
+
+    from repositories import store
+    profile = store.profiles.get(uid)
+
+STORAGE_BACKEND picks the implementation:
+- firestore (default): repositories/firestore.py, over services.firestore.db
+- sqlite: repositories/sqlite.py, an embedded database at SQLITE_PATH
+
+Both return plain dicts (or (id, dict) pairs for listings) with the same
+document shapes, so callers don't know which one they talk to.
+"""
+import os
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "firestore")
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fundmystudy.db"))
+
+
+def create_store(backend=STORAGE_BACKEND, path=SQLITE_PATH):
+    if backend == "sqlite":
+        from repositories.sqlite import SQLiteStore
+        return SQLiteStore(path)
+    if backend == "firestore":
+        from repositories.firestore import FirestoreStore
+        return FirestoreStore()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend} (expected 'firestore' or 'sqlite')")
+
+
+store = create_store()
@@ -0,0 +1,296 @@
+"""
+Repositories backed by Cloud Firestore, through the shared (instrumented) `db`.
+
+Query shapes are the ones the routes used before the repository layer, so
+they keep using the composite indexes in infra/firestore.indexes.json.
+"""
+from datetime import datetime
+
+from services.firestore import db
+try:
+    from utils.normalizer import ANY_VALUE, reminder_deadline_updates, rules_to_firestore, to_firestore
+except ModuleNotFoundError:
+    # Loaded by the scraper, whose own `utils` package shadows backend/utils
+    from backend.utils.normalizer import ANY_VALUE, reminder_deadline_updates, rules_to_firestore, to_firestore
+
+WRITE_BATCH_SIZE = 400  # Firestore batch limit is 500
+IN_QUERY_LIMIT = 30  # Firestore 'in' filter accepts at most 30 values
+
+
+def _docs(stream):
+    return [(doc.id, doc.to_dict()) for doc in stream]
+
+
+class _Batches:
+    """db.batch() that commits every WRITE_BATCH_SIZE writes"""
+
+    def __init__(self):
+        self.batch = db.batch()
+        self.pending = 0
+
+    def __getattr__(self, name):
+        write = getattr(self.batch, name)
+
+        def queue(*args, **kwargs):
+            write(*args, **kwargs)
+            self.pending += 1
+            if self.pending >= WRITE_BATCH_SIZE:
+                self.commit()
+        return queue
+
+    def commit(self):
+        if self.pending:
+            self.batch.commit()
+        self.batch = db.batch()
+        self.pending = 0
+
+
+class FirestoreScholarships:
+    def _ref(self, sch_id):
+        return db.collection("scholarships").document(sch_id)
+
+    def get(self, sch_id, fields=None):
+        doc = self._ref(sch_id).get(field_paths=fields)
+        return doc.to_dict() if doc.exists else None
+
+    def get_many(self, sch_ids, fields=None):
+        """{id: data} for the scholarships that exist, in one multi-get"""
+        if not sch_ids:
+            return {}
+        refs = [self._ref(sch_id) for sch_id in sch_ids]
+        return {doc.id: doc.to_dict() or {} for doc in db.get_all(refs, field_paths=fields) if doc.exists}
+
+    def count_active(self):
+        return db.collection("scholarships").where("active", "==", True).count().get()[0][0].value
+
+    def active(self, fields=None, limit=None):
+        """[(id, data), ...] for active scholarships"""
+        query = db.collection("scholarships").where("active", "==", True)
+        if limit is not None:
+            query = query.limit(limit)
+        if fields is not None:
+            query = query.select(fields)
+        return _docs(query.stream())
+
+    def created_after(self, since, fields=None):
+        """[(id, data), ...] for scholarships created after the ISO timestamp `since`"""
+        query = db.collection("scholarships").where("created_at", ">", since)
+        if fields is not None:
+            query = query.select(fields)
+        return _docs(query.stream())
+
+    def candidates(self, state, income, marks, fields=None):
+        """
+        Active scholarships whose state/income/marks facets admit a profile
+        (state already passed through facet_value)
+        """
+        query = db.collection("scholarships") \
+            .where("active", "==", True) \
+            .where("states", "array_contains_any", [state, ANY_VALUE]) \
+            .where("max_income", ">=", income) \
+            .where("min_marks", "<=", marks)
+        if fields is not None:
+            query = query.select(fields)
+        return _docs(query.stream())
+
+    def save_many(self, scholarships):
+        """
+        Upsert Scholarship records and their rules in batched writes.
+        Returns {"saved": n, "updated": n, "deadline_changes": {id: new deadline}}
+        """
+        existing = self.get_many([s.id for s in scholarships], fields=["deadline"])
+        created_at = datetime.utcnow().isoformat()
+        batches = _Batches()
+        saved = updated = 0
+        deadline_changes = {}
+
+        for scholarship in scholarships:
+            data = to_firestore(scholarship)
+            if scholarship.id in existing:
+                if existing[scholarship.id].get("deadline") != data.get("deadline"):
+                    deadline_changes[scholarship.id] = data.get("deadline", "")
+                batches.set(self._ref(scholarship.id), data, merge=True)
+                updated += 1
+            else:
+                data["created_at"] = created_at
+                batches.set(self._ref(scholarship.id), data)
+                saved += 1
+            if scholarship.conditions:
+                batches.set(db.collection("eligibility_rules").document(f"{scholarship.id}_rules"),
+                            rules_to_firestore(scholarship), merge=True)
+        batches.commit()
+        return {"saved": saved, "updated": updated, "deadline_changes": deadline_changes}
+
+    def update_facets(self, facets_by_id):
+        """Overwrite the eligibility facets ({id: facets(...)}) of existing scholarships"""
+        batches = _Batches()
+        for sch_id, facets in facets_by_id.items():
+            batches.update(self._ref(sch_id), facets)
+        batches.commit()
+
+
+class FirestoreRules:
+    FIELDS = ["scholarshipId", "conditions"]
+
+    def all(self):
+        """{scholarshipId: [condition dict, ...]} for every ruleset"""
+        rules = {}
+        for doc in db.collection("eligibility_rules").select(self.FIELDS).stream():
+            data = doc.to_dict()
+            if data.get("scholarshipId"):
+                rules[data["scholarshipId"]] = data.get("conditions", [])
+        return rules
+
+    def for_scholarships(self, sch_ids):
+        """{scholarshipId: conditions} for the given scholarships, in one multi-get"""
+        if not sch_ids:
+            return {}
+        refs = [db.collection("eligibility_rules").document(f"{sch_id}_rules") for sch_id in sch_ids]
+        rules = {}
+        for doc in db.get_all(refs, field_paths=self.FIELDS):
+            if doc.exists:
+                data = doc.to_dict()
+                rules[data.get("scholarshipId")] = data.get("conditions", [])
+        return rules
+
+
+class FirestoreProfiles:
+    def get(self, uid, fields=None):
+        doc = db.collection("profiles").document(uid).get(field_paths=fields)
+        return doc.to_dict() if doc.exists else None
+
+    def get_many(self, uids, fields=None):
+        if not uids:
+            return {}
+        refs = [db.collection("profiles").document(uid) for uid in uids]
+        return {doc.id: doc.to_dict() or {} for doc in db.get_all(refs, field_paths=fields) if doc.exists}
+
+    def all(self, fields=None):
+        """[(uid, data), ...] for every profile"""
+        query = db.collection("profiles")
+        if fields is not None:
+            query = query.select(fields)
+        return _docs(query.stream())
+
+    def with_reminder_mode(self, mode, fields=None):
+        """[(uid, data), ...] for profiles with reminder_mode == mode"""
+        query = db.collection("profiles").where("reminder_mode", "==", mode)
+        if fields is not None:
+            query = query.select(fields)
+        return _docs(query.stream())
+
+    def save(self, uid, data, merge=True):
+        db.collection("profiles").document(uid).set(data, merge=merge)
+
+    def update_many(self, uids, updates):
+        """Apply the same field updates to many existing profiles in batched writes"""
+        batches = _Batches()
+        for uid in uids:
+            batches.update(db.collection("profiles").document(uid), updates)
+        batches.commit()
+
+
+class FirestoreReminders:
+    def get(self, reminder_id):
+        doc = db.collection("reminders").document(reminder_id).get()
+        return doc.to_dict() if doc.exists else None
+
+    def get_many(self, reminder_ids, fields=None):
+        """{id: data} for the reminders that exist, in one multi-get"""
+        if not reminder_ids:
+            return {}
+        refs = [db.collection("reminders").document(reminder_id) for reminder_id in reminder_ids]
+        return {doc.id: doc.to_dict() or {} for doc in db.get_all(refs, field_paths=fields) if doc.exists}
+
+    def save(self, reminder_id, data):
+        db.collection("reminders").document(reminder_id).set(data)
+
+    def save_many(self, reminders):
+        """{reminder_id: data} in batched writes"""
+        batches = _Batches()
+        for reminder_id, data in reminders.items():
+            batches.set(db.collection("reminders").document(reminder_id), data)
+        batches.commit()
+
+    def list_for_user(self, uid, limit, after=None, active_only=False, fields=None):
+        """
+        [(id, data), ...] soonest deadline first, ordered by (notify_at, id)
+        since deadline strings come in mixed formats, starting after the
+        (notify_at, id) position `after`. Backed by the (userId, status,
+        notify_at) / (userId, notify_at) indexes.
+        """
+        query = db.collection("reminders").where("userId", "==", uid)
+        if active_only:
+            query = query.where("status", "==", "active")
+        query = query.order_by("notify_at").order_by("__name__")
+        if fields is not None:
+            query = query.select(fields)
+        if after is not None:
+            query = query.start_after({"notify_at": after[0], "__name__": after[1]})
+        return _docs(query.limit(limit).stream())
+
+    def due(self, now_iso, limit, after=None, fields=None):
+        """
+        [(id, data), ...] for active reminders with notify_at <= now_iso, by
+        (notify_at, id), starting after the (notify_at, id) position `after`.
+        Backed by the (status, notify_at) index.
+        """
+        query = db.collection("reminders") \
+            .where("status", "==", "active") \
+            .where("notify_at", "<=", now_iso) \
+            .order_by("notify_at").order_by("__name__")
+        if fields is not None:
+            query = query.select(fields)
+        if after is not None:
+            query = query.start_after({"notify_at": after[0], "__name__": after[1]})
+        return _docs(query.limit(limit).stream())
+
+    def update_many(self, reminder_ids, updates):
+        """Apply the same field updates to many existing reminders in batched writes"""
+        batches = _Batches()
+        for reminder_id in reminder_ids:
+            batches.update(db.collection("reminders").document(reminder_id), updates)
+        batches.commit()
+
+    def update_deadlines(self, deadline_changes):
+        """
+        Copy changed scholarship deadlines ({scholarship id: deadline}) onto the
+        reminders that denormalize them. Returns the number of reminders updated.
+        """
+        now_iso = datetime.utcnow().isoformat()
+        ids = list(deadline_changes)
+        batches = _Batches()
+        total = 0
+        for i in range(0, len(ids), IN_QUERY_LIMIT):
+            query = db.collection("reminders") \
+                .where("scholarshipId", "in", ids[i:i + IN_QUERY_LIMIT]) \
+                .select(["scholarshipId", "status"])
+            for doc in query.stream():
+                data = doc.to_dict()
+                updates = reminder_deadline_updates(deadline_changes[data.get("scholarshipId")], data.get("status"), now_iso)
+                batches.update(doc.reference, updates)
+                total += 1
+        batches.commit()
+        return total
+
+
+class FirestoreMatches:
+    def get(self, uid):
+        doc = db.collection("matches").document(uid).get()
+        return doc.to_dict() if doc.exists else None
+
+    def save_many(self, matches):
+        """{uid: data} through a BulkWriter (parallel, retried, not atomic)"""
+        writer = db.bulk_writer()
+        for uid, data in matches.items():
+            writer.set(db.collection("matches").document(uid), data)
+        writer.close()
+
+
+class FirestoreStore:
+    def __init__(self):
+        self.scholarships = FirestoreScholarships()
+        self.rules = FirestoreRules()
+        self.profiles = FirestoreProfiles()
+        self.reminders = FirestoreReminders()
+        self.matches = FirestoreMatches()
@@ -0,0 +1,380 @@
+"""
+Repositories backed by an embedded SQLite database (STORAGE_BACKEND=sqlite).
+
+For small self-hosted deployments and offline evaluation. Documents are kept
+as JSON in a `data` column, next to the few fields queries filter or sort on
+(state facets, deadline, userId, status, notify_at), which are indexed. WAL mode lets
+readers run while the scraper writes; each connection is per thread.
+Bulk writes (save_many) run in one transaction.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+
+try:
+    from utils.normalizer import ANY_VALUE, reminder_deadline_updates, rules_to_firestore, to_firestore
+except ModuleNotFoundError:
+    # Loaded by the scraper, whose own `utils` package shadows backend/utils
+    from backend.utils.normalizer import ANY_VALUE, reminder_deadline_updates, rules_to_firestore, to_firestore
+
+logger = logging.getLogger(__name__)
+
+# Host parameters per statement stay under SQLite's default limit
+CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scholarships (
+    id TEXT PRIMARY KEY,
+    active INTEGER NOT NULL DEFAULT 1,
+    deadline TEXT,
+    max_income REAL,
+    min_marks REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scholarships_active_deadline ON scholarships (active, deadline);
+CREATE TABLE IF NOT EXISTS scholarship_states (
+    state TEXT NOT NULL,
+    scholarship_id TEXT NOT NULL,
+    PRIMARY KEY (state, scholarship_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_scholarship_states_id ON scholarship_states (scholarship_id);
+CREATE TABLE IF NOT EXISTS eligibility_rules (
+    scholarship_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reminders (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    scholarship_id TEXT,
+    status TEXT,
+    deadline TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_user_notify ON reminders (user_id, coalesce(json_extract(data, '$.notify_at'), ''), id);
+CREATE INDEX IF NOT EXISTS idx_reminders_user_status_notify ON reminders (user_id, status, coalesce(json_extract(data, '$.notify_at'), ''), id);
+CREATE INDEX IF NOT EXISTS idx_reminders_scholarship ON reminders (scholarship_id);
+CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders (status, json_extract(data, '$.notify_at'), id);
+CREATE TABLE IF NOT EXISTS matches (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+def _dumps(data):
+    return json.dumps(data, default=str)
+
+
+def _project(data, fields):
+    data = json.loads(data)
+    if fields is not None:
+        data = {k: v for k, v in data.items() if k in fields}
+    return data
+
+
+def _chunks(items):
+    items = list(items)
+    for i in range(0, len(items), CHUNK_SIZE):
+        yield items[i:i + CHUNK_SIZE]
+
+
+def _placeholders(items):
+    return ",".join("?" * len(items))
+
+
+class SQLiteDatabase:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self.connect().executescript(SCHEMA)
+
+    def connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def transaction(self):
+        conn = self.connect()
+        conn.execute("BEGIN IMMEDIATE")
+        return _Transaction(conn)
+
+
+class _Transaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, *exc):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+class _Documents:
+    """get/get_many/save for a table keyed by one id column with a JSON `data` column"""
+    table = ""
+    key = ""
+
+    def __init__(self, database):
+        self.db = database
+
+    def get(self, doc_id, fields=None):
+        row = self.db.connect().execute(f"SELECT data FROM {self.table} WHERE {self.key} = ?", (doc_id,)).fetchone()
+        return _project(row[0], fields) if row else None
+
+    def get_many(self, doc_ids, fields=None):
+        result = {}
+        conn = self.db.connect()
+        for chunk in _chunks(doc_ids):
+            rows = conn.execute(
+                f"SELECT {self.key}, data FROM {self.table} WHERE {self.key} IN ({_placeholders(chunk)})", chunk,
+            )
+            result.update((doc_id, _project(data, fields)) for doc_id, data in rows)
+        return result
+
+
+class SQLiteScholarships(_Documents):
+    table = "scholarships"
+    key = "id"
+
+    def count_active(self):
+        return self.db.connect().execute("SELECT COUNT(*) FROM scholarships WHERE active = 1").fetchone()[0]
+
+    def active(self, fields=None, limit=None):
+        sql = "SELECT id, data FROM scholarships WHERE active = 1 ORDER BY id"
+        params = ()
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (limit,)
+        return [(doc_id, _project(data, fields)) for doc_id, data in self.db.connect().execute(sql, params)]
+
+    def created_after(self, since, fields=None):
+        rows = self.db.connect().execute(
+            "SELECT id, data FROM scholarships WHERE json_extract(data, '$.created_at') > ? ORDER BY id", (since,),
+        )
+        return [(doc_id, _project(data, fields)) for doc_id, data in rows]
+
+    def candidates(self, state, income, marks, fields=None):
+        rows = self.db.connect().execute(
+            "SELECT id, data FROM scholarships WHERE active = 1 AND max_income >= ? AND min_marks <= ? "
+            "AND id IN (SELECT scholarship_id FROM scholarship_states WHERE state IN (?, ?)) ORDER BY id",
+            (income, marks, state, ANY_VALUE),
+        )
+        return [(doc_id, _project(data, fields)) for doc_id, data in rows]
+
+    def save_many(self, scholarships):
+        """Upsert Scholarship records and their rules in one transaction"""
+        created_at = datetime.utcnow().isoformat()
+        saved = updated = 0
+        deadline_changes = {}
+
+        with self.db.transaction() as conn:
+            existing = {}
+            for chunk in _chunks([s.id for s in scholarships]):
+                existing.update(conn.execute(
+                    f"SELECT id, deadline FROM scholarships WHERE id IN ({_placeholders(chunk)})", chunk,
+                ))
+
+            rows, states, rules = [], [], []
+            for scholarship in scholarships:
+                data = to_firestore(scholarship)
+                if scholarship.id in existing:
+                    if existing[scholarship.id] != data.get("deadline"):
+                        deadline_changes[scholarship.id] = data.get("deadline", "")
+                    updated += 1
+                else:
+                    data["created_at"] = created_at
+                    saved += 1
+                rows.append((
+                    scholarship.id, 1 if data.get("active", True) else 0, data.get("deadline"),
+                    data.get("max_income"), data.get("min_marks"), _dumps(data),
+                ))
+                states.extend((state, scholarship.id) for state in data.get("states", [ANY_VALUE]))
+                if scholarship.conditions:
+                    rules.append((scholarship.id, _dumps(rules_to_firestore(scholarship))))
+
+            # Existing documents are merged (like set(merge=True)), so created_at survives
+            conn.executemany(
+                "INSERT INTO scholarships (id, active, deadline, max_income, min_marks, data) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET active = excluded.active, deadline = excluded.deadline, "
+                "max_income = excluded.max_income, min_marks = excluded.min_marks, "
+                "data = json_patch(scholarships.data, excluded.data)",
+                rows,
+            )
+            for chunk in _chunks([s.id for s in scholarships]):
+                conn.execute(f"DELETE FROM scholarship_states WHERE scholarship_id IN ({_placeholders(chunk)})", chunk)
+            conn.executemany("INSERT OR IGNORE INTO scholarship_states (state, scholarship_id) VALUES (?, ?)", states)
+            conn.executemany(
+                "INSERT INTO eligibility_rules (scholarship_id, data) VALUES (?, ?) "
+                "ON CONFLICT (scholarship_id) DO UPDATE SET data = json_patch(eligibility_rules.data, excluded.data)",
+                rules,
+            )
+
+        logger.info(f"💾 SQLite: {saved} new, {updated} updated scholarships in one transaction")
+        return {"saved": saved, "updated": updated, "deadline_changes": deadline_changes}
+
+    def update_facets(self, facets_by_id):
+        """Overwrite the eligibility facets ({id: facets(...)}) of existing scholarships"""
+        with self.db.transaction() as conn:
+            for sch_id, facets in facets_by_id.items():
+                conn.execute(
+                    "UPDATE scholarships SET max_income = ?, min_marks = ?, data = json_patch(data, ?) WHERE id = ?",
+                    (facets["max_income"], facets["min_marks"], _dumps(facets), sch_id),
+                )
+                conn.execute("DELETE FROM scholarship_states WHERE scholarship_id = ?", (sch_id,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO scholarship_states (state, scholarship_id) VALUES (?, ?)",
+                    [(state, sch_id) for state in facets["states"]],
+                )
+
+
+class SQLiteRules:
+    def __init__(self, database):
+        self.db = database
+
+    def all(self):
+        rows = self.db.connect().execute("SELECT scholarship_id, json_extract(data, '$.conditions') FROM eligibility_rules")
+        return {sch_id: json.loads(conditions or "[]") for sch_id, conditions in rows}
+
+    def for_scholarships(self, sch_ids):
+        rules = {}
+        conn = self.db.connect()
+        for chunk in _chunks(sch_ids):
+            rows = conn.execute(
+                f"SELECT scholarship_id, json_extract(data, '$.conditions') FROM eligibility_rules "
+                f"WHERE scholarship_id IN ({_placeholders(chunk)})", chunk,
+            )
+            rules.update((sch_id, json.loads(conditions or "[]")) for sch_id, conditions in rows)
+        return rules
+
+
+class SQLiteProfiles(_Documents):
+    table = "profiles"
+    key = "user_id"
+
+    def all(self, fields=None):
+        rows = self.db.connect().execute("SELECT user_id, data FROM profiles ORDER BY user_id")
+        return [(uid, _project(data, fields)) for uid, data in rows]
+
+    def with_reminder_mode(self, mode, fields=None):
+        rows = self.db.connect().execute(
+            "SELECT user_id, data FROM profiles WHERE json_extract(data, '$.reminder_mode') = ? ORDER BY user_id", (mode,),
+        )
+        return [(uid, _project(data, fields)) for uid, data in rows]
+
+    def save(self, uid, data, merge=True):
+        update = "json_patch(profiles.data, excluded.data)" if merge else "excluded.data"
+        self.db.connect().execute(
+            f"INSERT INTO profiles (user_id, data) VALUES (?, ?) ON CONFLICT (user_id) DO UPDATE SET data = {update}",
+            (uid, _dumps(data)),
+        )
+
+    def update_many(self, uids, updates):
+        with self.db.transaction() as conn:
+            for chunk in _chunks(uids):
+                conn.execute(
+                    f"UPDATE profiles SET data = json_patch(data, ?) WHERE user_id IN ({_placeholders(chunk)})",
+                    [_dumps(updates), *chunk],
+                )
+
+
+class SQLiteReminders(_Documents):
+    table = "reminders"
+    key = "id"
+
+    def save(self, reminder_id, data):
+        self.save_many({reminder_id: data})
+
+    def save_many(self, reminders):
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO reminders (id, user_id, scholarship_id, status, deadline, data) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (reminder_id, data.get("userId"), data.get("scholarshipId"), data.get("status"), data.get("deadline"), _dumps(data))
+                    for reminder_id, data in reminders.items()
+                ],
+            )
+
+    def list_for_user(self, uid, limit, after=None, active_only=False, fields=None):
+        # Unparseable deadlines have no notify_at; they sort first, as nulls do in Firestore
+        notify_at = "coalesce(json_extract(data, '$.notify_at'), '')"
+        sql = "SELECT id, data FROM reminders WHERE user_id = ?"
+        params = [uid]
+        if active_only:
+            sql += " AND status = 'active'"
+        if after is not None:
+            sql += f" AND ({notify_at} > ? OR ({notify_at} = ? AND id > ?))"
+            params += [after[0] or "", after[0] or "", after[1]]
+        sql += f" ORDER BY {notify_at}, id LIMIT ?"
+        params.append(limit)
+        return [(doc_id, _project(data, fields)) for doc_id, data in self.db.connect().execute(sql, params)]
+
+    def due(self, now_iso, limit, after=None, fields=None):
+        sql = "SELECT id, data FROM reminders WHERE status = 'active' AND json_extract(data, '$.notify_at') <= ?"
+        params = [now_iso]
+        if after is not None:
+            sql += " AND (json_extract(data, '$.notify_at') > ? OR (json_extract(data, '$.notify_at') = ? AND id > ?))"
+            params += [after[0], after[0], after[1]]
+        sql += " ORDER BY json_extract(data, '$.notify_at'), id LIMIT ?"
+        params.append(limit)
+        return [(doc_id, _project(data, fields)) for doc_id, data in self.db.connect().execute(sql, params)]
+
+    def update_many(self, reminder_ids, updates):
+        with self.db.transaction() as conn:
+            for chunk in _chunks(reminder_ids):
+                conn.execute(
+                    "UPDATE reminders SET status = coalesce(?, status), deadline = coalesce(?, deadline), "
+                    f"data = json_patch(data, ?) WHERE id IN ({_placeholders(chunk)})",
+                    [updates.get("status"), updates.get("deadline"), _dumps(updates), *chunk],
+                )
+
+    def update_deadlines(self, deadline_changes):
+        now_iso = datetime.utcnow().isoformat()
+        total = 0
+        with self.db.transaction() as conn:
+            for chunk in _chunks(deadline_changes):
+                rows = conn.execute(
+                    f"SELECT id, scholarship_id, status FROM reminders WHERE scholarship_id IN ({_placeholders(chunk)})", chunk,
+                ).fetchall()
+                for reminder_id, sch_id, status in rows:
+                    updates = reminder_deadline_updates(deadline_changes[sch_id], status, now_iso)
+                    conn.execute(
+                        "UPDATE reminders SET deadline = ?, status = ?, data = json_patch(data, ?) WHERE id = ?",
+                        (updates["deadline"], updates.get("status", status), _dumps(updates), reminder_id),
+                    )
+                    total += 1
+        return total
+
+
+class SQLiteMatches(_Documents):
+    table = "matches"
+    key = "user_id"
+
+    def save_many(self, matches):
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO matches (user_id, data) VALUES (?, ?)",
+                [(uid, _dumps(data)) for uid, data in matches.items()],
+            )
+
+
+class SQLiteStore:
+    def __init__(self, path):
+        database = SQLiteDatabase(path)
+        self.scholarships = SQLiteScholarships(database)
+        self.rules = SQLiteRules(database)
+        self.profiles = SQLiteProfiles(database)
+        self.reminders = SQLiteReminders(database)
+        self.matches = SQLiteMatches(database)
+        logger.info(f"🗄️ SQLite store at {path}")
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from services.firestore import db
+from repositories import store
 from services.auth_dependency import get_current_user
 from datetime import datetime
 import logging
@@ -14,9 +14,8 @@ async def get_profile(uid: str = Depends(get_current_user)):
     logger.info(f"📋 Getting profile for user: {uid}")
     
     try:
-        doc = db.collection("profiles").document(uid).get()
-        if doc.exists:
-            profile_data = doc.to_dict()
+        profile_data = store.profiles.get(uid)
+        if profile_data is not None:
             logger.info(f"✅ Found profile for user: {uid}")
             return profile_data
         else:
@@ -71,12 +70,11 @@ async def create_or_update_profile(
         }
         
         # Add createdAt if not exists
-        existing_doc = db.collection("profiles").document(uid).get()
-        if not existing_doc.exists:
+        if store.profiles.get(uid, fields=["createdAt"]) is None:
             profile_data["createdAt"] = datetime.utcnow().isoformat()
         
-        # Save to Firestore
-        db.collection("profiles").document(uid).set(profile_data, merge=True)
+        # Save (merged into the existing profile)
+        store.profiles.save(uid, profile_data, merge=True)
         
         logger.info(f"✅ Profile saved successfully for user: {uid}")
         
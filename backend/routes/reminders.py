@@ -1,17 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from services.firestore import db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from repositories import store
 from services.auth_dependency import get_current_user, get_current_user_details
-from services.email_service import send_email
+from services.outbox import outbox, dedup_key
+from utils.normalizer import notify_at_for
 from datetime import datetime
+from typing import Optional
+import base64
+import hashlib
+import json
 import logging
 
 router = APIRouter(prefix="/reminders", tags=["reminders"])
 logger = logging.getLogger(__name__)
 
+REMINDER_MODES = ("instant", "digest")
+MAX_BATCH_SUBSCRIBE = 100
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+# What the reminders list in the UI shows (no createdAt/type/userId)
+REMINDER_LIST_FIELDS = ["scholarshipId", "scholarshipName", "deadline", "notify_at", "email", "status"]
+
+def keep_subscription(reminder, existing):
+    """
+    Re-subscribing to a reminder that is still active keeps its createdAt, so
+    the confirmation (deduplicated per createdAt) is not sent twice; a new or
+    finished reminder starts a new subscription and is confirmed again.
+    """
+    if existing and existing.get("status") == "active" and existing.get("createdAt"):
+        reminder["createdAt"] = existing["createdAt"]
+    return reminder
+
+def build_reminder(uid, email, scholarship_id, sch_data):
+    """Reminder document for one (user, scholarship) pair"""
+    deadline = sch_data.get("deadline", "Unknown Date")
+    return {
+        "userId": uid,
+        "scholarshipId": scholarship_id,
+        "scholarshipName": sch_data.get("name", "Scholarship"),
+        "deadline": deadline,
+        "notify_at": notify_at_for(deadline),
+        "email": email,
+        "status": "active",
+        "createdAt": datetime.utcnow().isoformat(),
+        "type": "email"
+    }
+
 @router.post("/subscribe")
 def subscribe_reminder(
     data: dict,
-    background_tasks: BackgroundTasks,
     user: dict = Depends(get_current_user_details)
 ):
     """
@@ -32,35 +68,24 @@ def subscribe_reminder(
         )
     
     # 1. Fetch Scholarship Details (for the Email body)
-    sch_doc = db.collection("scholarships").document(scholarship_id).get()
-    if not sch_doc.exists:
+    sch_data = store.scholarships.get(scholarship_id, fields=["name", "deadline"])
+    if sch_data is None:
         raise HTTPException(status_code=404, detail="Scholarship not found")
         
-    sch_data = sch_doc.to_dict()
-    sch_name = sch_data.get("name", "Scholarship")
-    deadline = sch_data.get("deadline", "Unknown Date")
-    
     # 2. Save Reminder
     reminder_id = f"{uid}_{scholarship_id}"
-    reminder_data = {
-        "userId": uid,
-        "scholarshipId": scholarship_id,
-        "scholarshipName": sch_name,
-        "deadline": deadline,
-        "email": email,
-        "status": "active",
-        "createdAt": datetime.utcnow().isoformat(),
-        "type": "email"
-    }
+    existing = store.reminders.get(reminder_id)
+    reminder_data = keep_subscription(build_reminder(uid, email, scholarship_id, sch_data), existing)
+    sch_name = reminder_data["scholarshipName"]
+    deadline = reminder_data["deadline"]
     
-    db.collection("reminders").document(reminder_id).set(reminder_data)
+    store.reminders.save(reminder_id, reminder_data)
     
-    # 3. Send Confirmation Email (Async)
+    # 3. Queue Confirmation Email (durable outbox, sent by background workers)
     subject = f"🔔 Reminder Set: {sch_name}"
     body = f"Hello,\n\nYou have successfully subscribed to deadline reminders for:\n\n🎓 {sch_name}\n📅 Deadline: {deadline}\n\nWe will notify you 7 days before the deadline.\n\nBest,\nFundMyStudy Team"
     
-    # Offload to background task
-    background_tasks.add_task(send_email, email, subject, body)
+    outbox.enqueue(email, subject, body, dedup_key=dedup_key(uid, scholarship_id, "subscribe", reminder_data["createdAt"]))
     
     logger.info(f"🔔 Email Reminder queued for user {email} on scholarship {scholarship_id}.")
     
@@ -70,28 +95,134 @@ def subscribe_reminder(
         "email_status": "queued"
     }
 
+@router.post("/subscribe/batch")
+def subscribe_reminders_batch(
+    data: dict,
+    user: dict = Depends(get_current_user_details)
+):
+    """
+    Subscribe to deadline reminders for many scholarships at once:
+    one multi-get for the scholarships, one batched write, one confirmation email.
+    """
+    uid = user["uid"]
+    email = user.get("email")
+    
+    scholarship_ids = data.get("scholarshipIds")
+    if not isinstance(scholarship_ids, list) or not scholarship_ids:
+        raise HTTPException(status_code=400, detail="scholarshipIds must be a non-empty list")
+    
+    # Keep order, drop duplicates/blanks
+    scholarship_ids = list(dict.fromkeys(str(s) for s in scholarship_ids if s))
+    if len(scholarship_ids) > MAX_BATCH_SUBSCRIBE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SUBSCRIBE} scholarships per request")
+    
+    if not email:
+        raise HTTPException(
+            status_code=400, 
+            detail="Valid email required to subscribe."
+        )
+    
+    # 1. Fetch all scholarships in one round trip
+    found = store.scholarships.get_many(scholarship_ids, fields=["name", "deadline"])
+    not_found = [sch_id for sch_id in scholarship_ids if sch_id not in found]
+    if not found:
+        raise HTTPException(status_code=404, detail="Scholarships not found")
+    
+    # 2. Save all reminders in one batched write
+    reminder_ids = {sch_id: f"{uid}_{sch_id}" for sch_id in scholarship_ids if sch_id in found}
+    existing = store.reminders.get_many(list(reminder_ids.values()), fields=["status", "createdAt"])
+    reminders = {
+        reminder_id: keep_subscription(build_reminder(uid, email, sch_id, found[sch_id]), existing.get(reminder_id))
+        for sch_id, reminder_id in reminder_ids.items()
+    }
+    store.reminders.save_many(reminders)
+    subscribed = list(reminders.values())
+    
+    # 3. One confirmation email for the whole batch
+    lines = "\n".join(f"🎓 {r['scholarshipName']}\n📅 Deadline: {r['deadline']}" for r in subscribed)
+    subject = f"🔔 Reminders Set for {len(subscribed)} scholarships"
+    body = f"Hello,\n\nYou have successfully subscribed to deadline reminders for:\n\n{lines}\n\nWe will notify you 7 days before each deadline.\n\nBest,\nFundMyStudy Team"
+    batch_key = hashlib.sha1(",".join(sorted(r["scholarshipId"] for r in subscribed)).encode()).hexdigest()[:16]
+    subscribed_at = max(r["createdAt"] for r in subscribed)
+    outbox.enqueue(email, subject, body, dedup_key=dedup_key(uid, batch_key, "subscribe_batch", subscribed_at))
+    
+    logger.info(f"🔔 {len(subscribed)} Email Reminders set for user {email} ({len(not_found)} not found).")
+    
+    return {
+        "status": "success",
+        "message": f"{len(subscribed)} reminders set successfully (Email queued)",
+        "subscribed": [r["scholarshipId"] for r in subscribed],
+        "not_found": not_found,
+        "email_status": "queued"
+    }
+
 @router.get("/")
-def get_my_reminders(uid: str = Depends(get_current_user)):
-    """Get list of active reminders for the user"""
-    try:
-        reminders = []
-        docs = db.collection("reminders").where("userId", "==", uid).stream()
-        
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
-            reminders.append(data)
-            
-        return {"count": len(reminders), "reminders": reminders}
+def get_my_reminders(
+    uid: str = Depends(get_current_user),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    active_only: bool = False
+):
+    """
+    Get the user's reminders, soonest deadline first, one page at a time.
+    Pass next_cursor from the previous page as ?cursor= to continue.
+    Sorted by notify_at (deadline strings come in mixed formats), backed by
+    the (userId, status, notify_at) / (userId, notify_at) indexes.
+    """
+    after = None
+    if cursor:
+        try:
+            notify_at, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = (notify_at, doc_id)
     
+    try:
+        # One extra document tells us whether another page exists
+        docs = store.reminders.list_for_user(uid, limit + 1, after=after, active_only=active_only, fields=REMINDER_LIST_FIELDS)
     except Exception as e:
         logger.error(f"Error fetching reminders: {e}")
-        return {"count": 0, "reminders": []}
+        return {"count": 0, "reminders": [], "next_cursor": None}
+    
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    
+    reminders = []
+    for doc_id, data in docs:
+        data["id"] = doc_id
+        reminders.append(data)
+    
+    next_cursor = None
+    if has_more:
+        last = reminders[-1]
+        next_cursor = base64.urlsafe_b64encode(json.dumps([last.get("notify_at"), last["id"]]).encode()).decode()
+    
+    return {"count": len(reminders), "reminders": reminders, "next_cursor": next_cursor}
+
+@router.put("/preferences")
+def set_reminder_preferences(
+    data: dict,
+    user: dict = Depends(get_current_user_details)
+):
+    """
+    Choose how reminders are delivered:
+    "instant" (one email when deadlines come due) or "digest" (one email per day).
+    """
+    mode = data.get("mode")
+    if mode not in REMINDER_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(REMINDER_MODES)}")
+    
+    preferences = {"reminder_mode": mode}
+    if user.get("email"):
+        # Digests also cover new matches for users without reminders, so keep the address on the profile
+        preferences["email"] = user["email"]
+    
+    store.profiles.save(user["uid"], preferences, merge=True)
+    return {"status": "success", "reminder_mode": mode}
 
 @router.post("/test-email")
 def test_email_send(
     data: dict,
-    background_tasks: BackgroundTasks,
     user: dict = Depends(get_current_user_details)
 ):
     """Debug endpoint to force send an Email to the user"""
@@ -102,6 +233,6 @@ def test_email_send(
     message = data.get("message", "This is a test email from FundMyStudy.")
     subject = "🛠 FundMyStudy Test Email"
     
-    background_tasks.add_task(send_email, email, subject, message)
+    outbox.enqueue(email, subject, message)
     
     return {"result": "queued", "email": email}
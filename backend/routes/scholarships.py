@@ -1,38 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException
-from services.firestore import db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from repositories import store
 from services.auth_dependency import get_current_user
 from services.eligibility_engine import evaluate_conditions
+from services.catalog import catalog
+from services.metrics import metrics
+from services.timing import elapsed_ms, stage
+from utils.normalizer import DOC_FIELDS
 from datetime import datetime
+import json
 import logging
 import asyncio
-from typing import List
+import os
+import threading
+from typing import List, Optional
 
 router = APIRouter(prefix="/scholarships", tags=["scholarships"])
 logger = logging.getLogger(__name__)
 
+PROJECTABLE_FIELDS = set(DOC_FIELDS) | {"created_at", "last_updated"}
+
+# Limits for POST /eligible/batch
+BATCH_MAX_PROFILES = int(os.getenv("ELIGIBLE_BATCH_MAX_PROFILES", 500))
+BATCH_CONCURRENCY = int(os.getenv("ELIGIBLE_BATCH_CONCURRENCY", 2))
+BATCH_CHUNK_SIZE = 50
+_batch_slots = threading.BoundedSemaphore(BATCH_CONCURRENCY)
+
+
+class _BatchSlot:
+    """A held _batch_slots slot; release() may be called more than once"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._held = True
+
+    def release(self):
+        with self._lock:
+            if not self._held:
+                return
+            self._held = False
+        _batch_slots.release()
+
+
 @router.get("/eligible")
-async def get_eligible_scholarships(uid: str = Depends(get_current_user)):
+async def get_eligible_scholarships(
+    uid: str = Depends(get_current_user),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    offset: int = Query(0, ge=0)
+):
     """
     Get scholarships eligible for current user.
+    Scoring runs on the projected catalog; descriptions are fetched only for
+    the returned page (all results when no limit is given).
     """
     try:
         logger.info(f"🎯 Getting eligible scholarships for user: {uid}")
         
         # Get user profile
-        profile_doc = db.collection("profiles").document(uid).get()
-        if not profile_doc.exists:
+        profile = store.profiles.get(uid)
+        if profile is None:
             logger.warning(f"⚠️ Profile not found for user: {uid}")
             return {
                 "error": "Profile not found. Please complete your profile first.",
                 "count": 0,
                 "scholarships": []
             }
-
-        profile = profile_doc.to_dict()
         
-        # Get active scholarships (increased limit to ensure we find matches)
-        scholarships_ref = db.collection("scholarships").where("active", "==", True).limit(200)
-        scholarships = list(scholarships_ref.stream())
+        # Active scholarships + rules from the in-process catalog cache
+        # (or facet-matched candidates when the catalog is too large to cache)
+        with stage("catalog"):
+            scholarships = catalog.for_profile(profile)
         
         if not scholarships:
             logger.warning("⚠️ No scholarships found in database")
@@ -43,95 +81,56 @@ async def get_eligible_scholarships(uid: str = Depends(get_current_user)):
                 "profile_completed": True
             }
         
-
-        
-        # OPTIMIZATION: Fetch all eligibility rules in one go to avoid N+1 queries
-        # This is strictly better for performance on Render
-        all_rules_docs = db.collection("eligibility_rules").stream()
-        rules_map = {}
-        for doc in all_rules_docs:
-            data = doc.to_dict()
-            sch_id = data.get("scholarshipId")
-            if sch_id:
-                rules_map[sch_id] = data.get("conditions", [])
-        
         results = []
+        evaluated = 0
         
-        for i, sch in enumerate(scholarships):
-            sch_data = sch.to_dict()
-            sch_id = sch.id
-            
-            # Fast lookup in memory
-            conditions = rules_map.get(sch_id)
-            
-            if not conditions:
-                continue
-            
-            # Evaluate eligibility
-            evaluation = evaluate_conditions(profile, conditions)
-            
-            # Store match result (optional - for analytics)
-            match_doc_id = f"{uid}_{sch_id}"
-            try:
-                # Optimized: Don't await/block on this write if possible, or skip for speed
-                # db.collection("matches").document(match_doc_id).set({...}) 
-                pass 
-            except Exception:
-                pass
-            
-            # Extract criteria for frontend display/filtering
-            criteria = {
-                "gender": "Any",
-                "category": "Any"
-            }
-            
-            for cond in conditions:
-                field = cond.get("field", "").lower()
-                value = cond.get("value")
-                operator = cond.get("operator")
+        # Timed and counted once for the whole loop, not per scholarship
+        with stage("eligibility"):
+            for sch in scholarships:
+                if not sch.conditions:
+                    continue
                 
-                if field == "gender":
-                    if operator == "==":
-                        criteria["gender"] = value
-                    elif operator == "IN" and isinstance(value, list):
-                        criteria["gender"] =  ", ".join(value)
+                # Evaluate eligibility
+                evaluation = evaluate_conditions(profile, sch.conditions)
+                evaluated += 1
                 
-                elif field == "category" or field == "caste":
-                    if operator == "==":
-                        criteria["category"] = value
-                    elif operator == "IN" and isinstance(value, list):
-                         criteria["category"] = ", ".join(value)
-
-            # If eligible, add to results
-            if evaluation["eligible"]:
-                result_item = {
-                    "scholarshipId": sch_id,
-                    "name": sch_data.get("name", "Unknown Scholarship"),
-                    "provider": sch_data.get("provider", "Unknown Provider"),
-                    "deadline": sch_data.get("deadline", "Not specified"),
-                    "amount": sch_data.get("amount", "Not specified"),
-                    "score": evaluation["score"],
-                    "reasons": evaluation["reasons"],
-                    "criteria": criteria,  # New field
-                    "apply_link": sch_data.get("application_link") or 
-                                 sch_data.get("source_url", "#"),
-                    "description": sch_data.get("description", ""),
-                    "icon": sch_data.get("icon", "🎓")
-                }
-                results.append(result_item)
-                logger.debug(f"✅ Eligible: {sch_data.get('name')}")
+                # If eligible, add to results
+                if evaluation["eligible"]:
+                    result_item = {
+                        "scholarshipId": sch.id,
+                        "name": sch.name or "Unknown Scholarship",
+                        "provider": sch.provider or "Unknown Provider",
+                        "deadline": sch.deadline or "Not specified",
+                        "amount": sch.amount or "Not specified",
+                        "score": evaluation["score"],
+                        "reasons": evaluation["reasons"],
+                        "criteria": catalog.criteria(sch),
+                        "apply_link": sch.application_link or sch.source_url or "#",
+                        "icon": sch.icon
+                    }
+                    results.append(result_item)
+                    logger.debug(f"✅ Eligible: {sch.name}")
+        metrics.evaluations(evaluated)
         
         # Sort by score (highest first)
         results.sort(key=lambda x: x["score"], reverse=True)
+        total_eligible = len(results)
+        page = results[offset:offset + limit] if limit else results[offset:]
         
-        logger.info(f"📊 Found {len(results)} eligible scholarships out of {len(scholarships)} checked")
+        # Full text only for the page being rendered
+        descriptions = catalog.descriptions([item["scholarshipId"] for item in page])
+        for item in page:
+            item["description"] = descriptions.get(item["scholarshipId"], "")
+        
+        logger.info(f"📊 Found {total_eligible} eligible scholarships out of {len(scholarships)} checked")
         
         return {
-            "count": len(results),
-            "scholarships": results,
+            "count": len(page),
+            "total_eligible": total_eligible,
+            "scholarships": page,
             "profile_completed": True,
             "total_checked": len(scholarships),
-            "processing_time_ms": "fast"  # Add timing in production
+            "processing_time_ms": elapsed_ms()
         }
         
     except Exception as e:
@@ -143,6 +142,132 @@ async def get_eligible_scholarships(uid: str = Depends(get_current_user)):
             "scholarships": []
         }
 
+@router.post("/eligible/batch")
+def get_eligible_scholarships_batch(
+    payload: dict,
+    uid: str = Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Evaluate many inline profiles (e.g. a whole class) against the cached catalog.
+    Body: {"profiles": [{"id": "...", "state": "...", "income": ..., ...}, ...]}
+    Streams one NDJSON line per profile, in input order, as each chunk of
+    profiles is scored. At most BATCH_MAX_PROFILES profiles per call and
+    BATCH_CONCURRENCY batches per worker at a time.
+    """
+    profiles = payload.get("profiles")
+    if not isinstance(profiles, list) or not profiles:
+        raise HTTPException(status_code=400, detail="Body must contain a non-empty 'profiles' list")
+    if len(profiles) > BATCH_MAX_PROFILES:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_PROFILES} profiles per batch")
+    if not all(isinstance(p, dict) for p in profiles):
+        raise HTTPException(status_code=400, detail="Each profile must be an object")
+    
+    scholarships = [sch for sch in catalog.get() if sch.conditions]
+    if catalog.pushdown:
+        raise HTTPException(status_code=503, detail="Batch eligibility is unavailable while the catalog is too large to cache")
+    
+    if not _batch_slots.acquire(blocking=False):
+        raise HTTPException(status_code=429, detail="Too many batch evaluations in progress, retry shortly")
+    slot = _BatchSlot()
+    
+    logger.info(f"🏫 Batch eligibility for {len(profiles)} profiles by user {uid}")
+    
+    def stream():
+        try:
+            for start in range(0, len(profiles), BATCH_CHUNK_SIZE):
+                chunk = profiles[start:start + BATCH_CHUNK_SIZE]
+                ids = [p.get("id", start + i) for i, p in enumerate(chunk)]
+                # Same order as /eligible: score descending, catalog order on ties
+                top, top_scores, counts = score_chunk(ids, chunk, rulesets, top_k=limit)
+                metrics.evaluations(len(chunk) * len(scholarships))
+                
+                for i, profile_id in enumerate(ids):
+                    n = min(int(counts[i]), limit)
+                    results = [
+                        {
+                            "scholarshipId": scholarships[j].id,
+                            "name": scholarships[j].name or "Unknown Scholarship",
+                            "provider": scholarships[j].provider or "Unknown Provider",
+                            "deadline": scholarships[j].deadline or "Not specified",
+                            "amount": scholarships[j].amount or "Not specified",
+                            "score": score,
+                            "apply_link": scholarships[j].application_link or scholarships[j].source_url or "#",
+                        }
+                        for j, score in zip(top[i, :n].tolist(), top_scores[i, :n].tolist())
+                    ]
+                    yield json.dumps({
+                        "index": start + i,
+                        "id": profile_id,
+                        "total_eligible": int(counts[i]),
+                        "count": len(results),
+                        "scholarships": results,
+                    }) + "\n"
+        finally:
+            slot.release()
+    
+    # The slot is released when the body finishes or fails, when the client
+    # disconnects before it starts (background task), or if setup fails here
+    try:
+        # numpy is only needed here and for near-miss; kept out of app startup
+        from jobs.recompute_matches import score_chunk
+        
+        rulesets = [sch.conditions for sch in scholarships]
+        return StreamingResponse(stream(), media_type="application/x-ndjson", background=BackgroundTask(slot.release))
+    except BaseException:
+        slot.release()
+        raise
+
+@router.get("/near-miss")
+async def get_near_miss_scholarships(
+    uid: str = Depends(get_current_user),
+    k: int = Query(1, ge=1, le=5),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Scholarships the current user fails exactly k conditions of, with the
+    failing conditions. Uses the catalog's precomputed condition table.
+    """
+    profile = store.profiles.get(uid)
+    if profile is None:
+        return {
+            "error": "Profile not found. Please complete your profile first.",
+            "count": 0,
+            "scholarships": []
+        }
+    
+    table = catalog.condition_table()
+    if catalog.pushdown:
+        raise HTTPException(status_code=503, detail="Near-miss search is unavailable while the catalog is too large to cache")
+    
+    misses = table.near_misses(profile, k)
+    # Most conditions already met first
+    misses.sort(key=lambda m: len(m[0].conditions), reverse=True)
+    
+    results = []
+    for sch, failing in misses[:limit]:
+        results.append({
+            "scholarshipId": sch.id,
+            "name": sch.name or "Unknown Scholarship",
+            "provider": sch.provider or "Unknown Provider",
+            "deadline": sch.deadline or "Not specified",
+            "amount": sch.amount or "Not specified",
+            "apply_link": sch.application_link or sch.source_url or "#",
+            "failing": [
+                {
+                    "field": cond.field,
+                    "operator": cond.operator,
+                    "value": cond.value,
+                    "your_value": profile.get(cond.field)
+                }
+                for cond in failing
+            ],
+        })
+    
+    logger.info(f"🎯 {len(misses)} scholarships {k} condition(s) away for user {uid}")
+    
+    return {"k": k, "count": len(results), "total": len(misses), "scholarships": results}
+
 @router.get("/eligible-fast")
 async def get_eligible_scholarships_fast(uid: str = Depends(get_current_user)):
     """
@@ -152,50 +277,40 @@ async def get_eligible_scholarships_fast(uid: str = Depends(get_current_user)):
         logger.info(f"🚀 Fast scholarships lookup for user: {uid}")
         
         # Get user profile
-        profile_doc = db.collection("profiles").document(uid).get()
-        if not profile_doc.exists:
+        profile = store.profiles.get(uid)
+        if profile is None:
             return {
                 "error": "Profile not found",
                 "count": 0,
                 "scholarships": []
             }
-
-        profile = profile_doc.to_dict()
         
-        # Get ONLY 5 scholarships for fast response
-        scholarships_ref = db.collection("scholarships").where("active", "==", True).limit(5)
-        scholarships = list(scholarships_ref.stream())
+        # Get ONLY 3 scholarships for fast response
+        scholarships = store.scholarships.active(limit=3)
+        
+        # Rules for all of them in one round trip (not one query per scholarship)
+        rules_by_id = store.rules.for_scholarships([sch_id for sch_id, _ in scholarships])
         
         results = []
         
-        # Quick check for first 3 scholarships
-        for sch in scholarships[:3]:
-            sch_data = sch.to_dict()
-            sch_id = sch.id
-            
-            # Get eligibility rules
-            rules_ref = db.collection("eligibility_rules").where("scholarshipId", "==", sch_id)
-            rules = list(rules_ref.stream())
-            
-            if rules:
-                rule_data = rules[0].to_dict()  # Take first rule
-                conditions = rule_data.get("conditions", [])
+        for sch_id, sch_data in scholarships:
+            conditions = rules_by_id.get(sch_id)
+            if conditions:
+                evaluation = evaluate_conditions(profile, conditions)
+                metrics.evaluations()
                 
-                if conditions:
-                    evaluation = evaluate_conditions(profile, conditions)
-                    
-                    if evaluation["eligible"]:
-                        results.append({
-                            "scholarshipId": sch_id,
-                            "name": sch_data.get("name", "Unknown"),
-                            "provider": sch_data.get("provider", "Unknown"),
-                            "deadline": sch_data.get("deadline", "Not specified"),
-                            "amount": sch_data.get("amount", "Not specified"),
-                            "score": evaluation["score"],
-                            "reasons": evaluation["reasons"],
-                            "apply_link": sch_data.get("application_link", "#"),
-                            "description": sch_data.get("description", "")
-                        })
+                if evaluation["eligible"]:
+                    results.append({
+                        "scholarshipId": sch_id,
+                        "name": sch_data.get("name", "Unknown"),
+                        "provider": sch_data.get("provider", "Unknown"),
+                        "deadline": sch_data.get("deadline", "Not specified"),
+                        "amount": sch_data.get("amount", "Not specified"),
+                        "score": evaluation["score"],
+                        "reasons": evaluation["reasons"],
+                        "apply_link": sch_data.get("application_link", "#"),
+                        "description": sch_data.get("description", "")
+                    })
         
         return {
             "count": len(results),
@@ -213,18 +328,22 @@ async def get_eligible_scholarships_fast(uid: str = Depends(get_current_user)):
         }
 
 @router.get("/all")
-async def get_all_scholarships(limit: int = 20):
-    """Get all scholarships (for debugging) - LIMITED for performance"""
+async def get_all_scholarships(limit: int = 20, fields: Optional[str] = None):
+    """
+    Get all scholarships (for debugging) - LIMITED for performance.
+    fields: optional comma-separated projection, e.g. ?fields=name,deadline
+    """
+    selected = None
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in PROJECTABLE_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    
     try:
         scholarships = []
-        docs = db.collection("scholarships") \
-                .where("active", "==", True) \
-                .limit(limit) \
-                .stream()
-        
-        for doc in docs:
-            sch_data = doc.to_dict()
-            sch_data["id"] = doc.id
+        for sch_id, sch_data in store.scholarships.active(fields=selected or None, limit=limit):
+            sch_data["id"] = sch_id
             scholarships.append(sch_data)
         
         return {
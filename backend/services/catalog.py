@@ -0,0 +1,318 @@
+from repositories import store
+from services.catalog_snapshot import CatalogSnapshot, ensure_fresh, write_snapshot
+from services.metrics import metrics
+from utils.catalog_bundle import BundleError, read_bundle
+from utils.normalizer import ANY_VALUE, FACET_FIELDS, facet_value, from_firestore
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TTL_SECONDS = int(os.getenv("CATALOG_TTL_SECONDS", 300))
+
+# Projections for catalog scans: everything the result cards need except the
+# long free-text description, which is fetched only for the page being rendered
+CATALOG_FIELDS = [
+    "name", "provider", "deadline", "amount", "application_link",
+    "source_url", "icon", "active", "created_at",
+]
+RULE_FIELDS = ["scholarshipId", "conditions"]
+
+# Above this many active scholarships the catalog is not cached in memory and
+# /eligible fetches per-profile candidates with a facet query instead. That
+# bounds memory, not work: facets only constrain single-condition rulesets
+# (utils.normalizer.facets), so for a catalog of multi-condition rulesets the
+# query returns almost every active scholarship on each request
+CATALOG_CACHE_MAX = int(os.getenv("CATALOG_CACHE_MAX_SCHOLARSHIPS", 5000))
+
+# With several workers, share one memory-mapped catalog file between them
+# (services/catalog_snapshot.py). Workers look for a newer file every
+# CATALOG_SNAPSHOT_CHECK_SECONDS; it is rebuilt from Firestore after the TTL.
+CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH") or None
+CATALOG_SNAPSHOT_CHECK_SECONDS = float(os.getenv("CATALOG_SNAPSHOT_CHECK_SECONDS", 5))
+
+# Catalog bundle exported by the scraper (utils/catalog_bundle.py): the first
+# load comes from it instead of a Firestore scan, and it is served whenever
+# storage can't be read
+CATALOG_BUNDLE_PATH = os.getenv("CATALOG_BUNDLE_PATH") or None
+
+
+def extract_criteria(conditions):
+    """Gender/category badges shown by the frontend for a scholarship"""
+    criteria = {
+        "gender": "Any",
+        "category": "Any"
+    }
+
+    for cond in conditions:
+        field = (cond.field or "").lower()
+        value = cond.value
+        operator = cond.operator
+
+        if field == "gender":
+            if operator == "==":
+                criteria["gender"] = value
+            elif operator == "IN" and isinstance(value, list):
+                criteria["gender"] = ", ".join(value)
+
+        elif field == "category" or field == "caste":
+            if operator == "==":
+                criteria["category"] = value
+            elif operator == "IN" and isinstance(value, list):
+                criteria["category"] = ", ".join(value)
+
+    return criteria
+
+
+class CatalogCache:
+    """
+    In-process cache of active scholarships joined with their eligibility rules.
+    Entries are slotted Scholarship records, reloaded from Firestore after the TTL.
+
+    When the catalog is larger than max_size nothing is cached (get() returns [])
+    and for_profile() pushes the state/income/marks facets down to Firestore.
+
+    With a snapshot_path the entries are SnapshotScholarship views over a file
+    shared by all workers instead, and a newer file is picked up within
+    CATALOG_SNAPSHOT_CHECK_SECONDS.
+
+    With a bundle_path the first load reads the scraper's catalog bundle, and
+    later loads fall back to it if storage fails.
+    """
+
+    def __init__(self, ttl=CATALOG_TTL_SECONDS, max_size=CATALOG_CACHE_MAX, snapshot_path=CATALOG_SNAPSHOT_PATH,
+                 bundle_path=CATALOG_BUNDLE_PATH):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.snapshot_path = snapshot_path
+        self.bundle_path = bundle_path
+        self.source = None
+        self._bootstrapped = False
+        self.snapshot = None
+        self._refresh_after = min(ttl, CATALOG_SNAPSHOT_CHECK_SECONDS) if snapshot_path else ttl
+        self._rebuild = False
+        self.pushdown = False
+        self._lock = threading.Lock()
+        self._scholarships = []
+        self._criteria = {}
+        self._table = None
+        self._loaded_at = 0.0
+
+    def get(self):
+        """Active scholarships (list of Scholarship), loading or refreshing if stale"""
+        if time.monotonic() - self._loaded_at > self._refresh_after:
+            with self._lock:
+                # Another request may have refreshed while we waited
+                if time.monotonic() - self._loaded_at > self._refresh_after:
+                    metrics.inc("fms_cache_requests_total", {"cache": "catalog", "result": "miss"})
+                    self._load()
+                    return self._scholarships
+        metrics.inc("fms_cache_requests_total", {"cache": "catalog", "result": "hit"})
+        return self._scholarships
+
+    def for_profile(self, profile):
+        """Scholarships to score for one profile: the cached catalog, or facet-matched candidates"""
+        scholarships = self.get()
+        if self.pushdown:
+            return self.candidates(profile)
+        return scholarships
+
+    def criteria(self, scholarship):
+        criteria = self._criteria.get(scholarship.id)
+        if criteria is None:
+            criteria = extract_criteria(scholarship.conditions)
+        return criteria
+
+    def condition_table(self):
+        """ConditionTable for the cached catalog, rebuilt after each reload"""
+        from services.condition_table import ConditionTable  # numpy, loaded on first use
+
+        scholarships = self.get()
+        table = self._table
+        if table is None or table.scholarships is not scholarships:
+            table = self._table = ConditionTable(scholarships)
+        return table
+
+    def candidates(self, profile):
+        """
+        Scholarships whose facets admit the profile. State, income and marks are
+        filtered by Firestore (composite index in infra/firestore.indexes.json);
+        Firestore allows one array_contains_any per query, so caste/gender/course
+        are checked here on the candidate set. Facets only constrain
+        single-condition rulesets (see utils.normalizer.facets), so this is a
+        superset of what the engine can find eligible - and for multi-condition
+        rulesets, which carry unconstrained facets, it filters almost nothing:
+        nearly the whole active catalog comes back, and the castes/genders/courses
+        fields are fetched only to be admitted. Documents written before facets
+        existed need jobs/backfill_facets.py.
+
+        Two range filters (max_income >=, min_marks <=) in one query need
+        Firestore's multi-field inequality support; google-cloud-firestore
+        2.23.0 sends them as one composite filter and the index in
+        infra/firestore.indexes.json covers both fields.
+        """
+        candidates = store.scholarships.candidates(
+            facet_value(profile.get("state")),
+            _as_float(profile.get("income")),
+            _as_float(profile.get("marks")),
+            fields=CATALOG_FIELDS + ["castes", "genders", "courses"],
+        )
+
+        matched = [
+            (sch_id, data) for sch_id, data in candidates
+            if all(
+                _facet_admits(data.get(facet), profile.get(field))
+                for field, facet in FACET_FIELDS.items() if field != "state"
+            )
+        ]
+        if not matched:
+            return []
+
+        # Rules for the candidates only, in one multi-get
+        rules_map = store.rules.for_scholarships([sch_id for sch_id, _ in matched])
+
+        return [from_firestore(sch_id, data, rules_map.get(sch_id)) for sch_id, data in matched]
+
+    def descriptions(self, scholarship_ids):
+        """Description text for just the given scholarships, in one multi-get"""
+        if not scholarship_ids:
+            return {}
+        found = store.scholarships.get_many(scholarship_ids, fields=["description"])
+        return {sch_id: data.get("description", "") for sch_id, data in found.items()}
+
+    def invalidate(self):
+        self._loaded_at = 0.0
+        self._table = None
+        self._rebuild = self.snapshot_path is not None
+
+    def _load(self):
+        if self.snapshot_path:
+            self._load_snapshot()
+            return
+
+        started = time.perf_counter()
+        scholarships = self._load_catalog()
+        if self.pushdown:
+            self._scholarships = []
+            self._criteria = {}
+            self._loaded_at = time.monotonic()
+            return
+
+        self._criteria = {s.id: extract_criteria(s.conditions) for s in scholarships}
+        self._scholarships = scholarships
+        self._loaded_at = time.monotonic()
+        logger.info(
+            f"📚 Catalog loaded: {len(scholarships)} scholarships, {sum(1 for s in scholarships if s.conditions)} rulesets "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
+    def _load_catalog(self):
+        """
+        Active scholarships, or None (and pushdown set) if there are too many.
+        From the bundle on the first load or when storage fails, else from storage.
+        """
+        if self.bundle_path and not self._bootstrapped:
+            self._bootstrapped = True
+            scholarships = self._load_bundle()
+            if scholarships is not None and len(scholarships) <= self.max_size:
+                return scholarships
+
+        try:
+            active = store.scholarships.count_active()
+            self.pushdown = active > self.max_size
+            if self.pushdown:
+                logger.info(f"📚 Catalog has {active} active scholarships (> {self.max_size}); using query pushdown")
+                self.source = "storage"
+                return None
+            scholarships = load_active_scholarships()
+        except Exception as e:
+            scholarships = self._load_bundle() if self.bundle_path else None
+            if scholarships is None:
+                raise
+            logger.warning(f"⚠️ Catalog storage unavailable ({e}); serving the catalog bundle until the next reload")
+            return scholarships
+        self.source = "storage"
+        return scholarships
+
+    def _load_bundle(self):
+        """Active scholarships from the catalog bundle, or None if it can't be used"""
+        started = time.perf_counter()
+        try:
+            scholarships, version = load_bundle_scholarships(self.bundle_path)
+        except BundleError as e:
+            logger.warning(f"⚠️ {e}")
+            return None
+        self.pushdown = False
+        self.source = f"bundle v{version}"
+        logger.info(
+            f"📦 Catalog read from bundle v{version}: {len(scholarships)} scholarships "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return scholarships
+
+    def _build_snapshot(self, path):
+        scholarships = self._load_catalog()
+        write_snapshot(scholarships or [], path, pushdown=self.pushdown)
+
+    def _load_snapshot(self):
+        """Map the shared snapshot, rebuilding it first if it is past the TTL (one worker does)"""
+        max_age = 0 if self._rebuild else self.ttl
+        ensure_fresh(self.snapshot_path, max_age, self._build_snapshot)
+        self._rebuild = False
+
+        current = self.snapshot
+        stat = os.stat(self.snapshot_path)
+        if current is None or current.identity != (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            started = time.perf_counter()
+            snapshot = CatalogSnapshot(self.snapshot_path)
+            if current is None or snapshot.version != current.version:
+                # Requests still iterating the old entries keep the old mapping alive
+                self.snapshot = snapshot
+                self.pushdown = snapshot.pushdown
+                self._scholarships = snapshot.scholarships
+                self._criteria = {}
+                self._table = None
+                logger.info(
+                    f"📚 Catalog snapshot v{snapshot.version} mapped: {len(snapshot.scholarships)} scholarships "
+                    f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+                )
+            else:
+                current.identity = snapshot.identity
+        self._loaded_at = time.monotonic()
+
+
+def load_active_scholarships():
+    """Every active scholarship with its conditions (two streamed queries, no N+1)"""
+    rules_map = store.rules.all()
+    return [from_firestore(sch_id, data, rules_map.get(sch_id)) for sch_id, data in store.scholarships.active(CATALOG_FIELDS)]
+
+
+def load_bundle_scholarships(path):
+    """(active scholarships, bundle version) from a catalog bundle; raises BundleError"""
+    bundle = read_bundle(path)
+    rules_map = bundle["rules"]
+    scholarships = [
+        from_firestore(sch_id, {k: data[k] for k in CATALOG_FIELDS if k in data}, rules_map.get(sch_id))
+        for sch_id, data in sorted(bundle["scholarships"].items())
+        if data.get("active", True)
+    ]
+    return scholarships, bundle["version"]
+
+
+def _as_float(value):
+    try:
+        return float(value or 0)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _facet_admits(facet, profile_value):
+    # No facet recorded means the field is unconstrained
+    if not facet or ANY_VALUE in facet:
+        return True
+    return facet_value(profile_value) in facet
+
+
+catalog = CatalogCache()
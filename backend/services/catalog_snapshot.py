@@ -0,0 +1,336 @@
+"""
+Shared, memory-mapped catalog snapshot for multi-worker deployments.
+
+With several uvicorn/gunicorn workers each CatalogCache would hold its own
+copy of the catalog and scan Firestore on its own. With CATALOG_SNAPSHOT_PATH
+set, one worker (whoever takes the lock file) loads the catalog and writes it
+to a versioned binary file; every worker maps that file read-only, so the
+string data and columns live once in the OS page cache however many workers
+there are. A new file is written next to the old one and renamed over it;
+workers notice the new inode and swap, while requests still holding the old
+mapping finish on it.
+
+Layout (native byte order, recorded in the header; sections 8-byte aligned):
+  header      magic, format, flags, version (build time in ns), build time,
+              counts, then (offset, length) for each of SECTIONS
+  strings     deduplicated UTF-8 string table (offsets + blob)
+  cells       one (kind, ref) pair per scholarship and SCHOLARSHIP_COLUMNS entry
+  conditions  per-scholarship start offsets, then field/operator string ids and
+              the value as (kind, ref, length, number) columns
+  list_items  string ids of list values (IN / NOT_IN)
+
+Scholarships come back as SnapshotScholarship views: ids and conditions are
+decoded when the snapshot is opened (identical conditions and rulesets are
+shared), display fields are decoded from the mapping only when read.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from utils.normalizer import Condition
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FMSCATv1"
+FORMAT_VERSION = 1
+
+FLAG_PUSHDOWN = 1  # catalog was over CATALOG_CACHE_MAX when built; no entries
+FLAG_BIG_ENDIAN = 2
+
+# Scholarship attributes stored per entry (the catalog's CATALOG_FIELDS)
+SCHOLARSHIP_COLUMNS = (
+    "name", "provider", "deadline", "amount", "application_link",
+    "source_url", "icon", "active", "created_at",
+)
+
+# (section, array typecode or None for raw bytes)
+SECTIONS = (
+    ("string_offsets", "I"),
+    ("strings", None),
+    ("ids", "I"),
+    ("cell_kinds", "B"),
+    ("cell_refs", "I"),
+    ("condition_starts", "I"),
+    ("condition_fields", "I"),
+    ("condition_operators", "I"),
+    ("condition_kinds", "B"),
+    ("condition_refs", "I"),
+    ("condition_lengths", "I"),
+    ("condition_numbers", "d"),
+    ("list_items", "I"),
+)
+
+HEADER = struct.Struct("<8sHHQdIIII")
+SECTION_ENTRY = struct.Struct("<QQ")
+
+# Value kinds
+NONE, FALSE, TRUE, INT, FLOAT, STR, STR_LIST, JSON = range(8)
+MAX_EXACT_INT = 2 ** 53
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.offsets = array("I", [0])
+        self.blob = bytearray()
+
+    def add(self, text):
+        sid = self.ids.get(text)
+        if sid is None:
+            sid = self.ids[text] = len(self.ids)
+            self.blob += text.encode("utf-8")
+            if len(self.blob) >= 2 ** 32:
+                raise ValueError("Catalog snapshot string table exceeds 4 GiB")
+            self.offsets.append(len(self.blob))
+        return sid
+
+
+class _Encoder:
+    def __init__(self):
+        self.strings = _StringTable()
+        self.list_items = array("I")
+        self._lists = {}
+
+    def value(self, value):
+        """(kind, ref, length, number) for one value"""
+        if value is None:
+            return NONE, 0, 0, 0.0
+        if isinstance(value, bool):
+            return (TRUE if value else FALSE), 0, 0, 0.0
+        if isinstance(value, int) and abs(value) < MAX_EXACT_INT:
+            return INT, 0, 0, float(value)
+        if isinstance(value, float):
+            return FLOAT, 0, 0, value
+        if isinstance(value, str):
+            return STR, self.strings.add(value), 0, 0.0
+        if isinstance(value, (list, tuple)) and all(isinstance(v, str) for v in value):
+            key = tuple(value)
+            start = self._lists.get(key)
+            if start is None:
+                start = self._lists[key] = len(self.list_items)
+                self.list_items.extend(self.strings.add(v) for v in value)
+            return STR_LIST, start, len(value), 0.0
+        return JSON, self.strings.add(json.dumps(value, default=str)), 0, 0.0
+
+
+def write_snapshot(scholarships, path, pushdown=False, version=None):
+    """
+    Write Scholarship records (with their conditions) to a snapshot at `path`.
+    The file is written beside `path` and renamed over it, so readers never
+    see a partial file. Returns the snapshot version.
+    """
+    started = time.perf_counter()
+    version = version or time.time_ns()
+    encoder = _Encoder()
+    columns = {name: array(code or "B") for name, code in SECTIONS}
+    columns["condition_starts"].append(0)
+
+    for sch in scholarships:
+        columns["ids"].append(encoder.strings.add(sch.id))
+        for name in SCHOLARSHIP_COLUMNS:
+            value = getattr(sch, name)
+            if isinstance(value, (str, bool)) or value is None:
+                kind, ref, _, _ = encoder.value(value)
+            else:
+                kind, ref = JSON, encoder.strings.add(json.dumps(value, default=str))
+            columns["cell_kinds"].append(kind)
+            columns["cell_refs"].append(ref)
+        for cond in sch.conditions:
+            kind, ref, length, number = encoder.value(cond.value)
+            columns["condition_fields"].append(encoder.strings.add(cond.field or ""))
+            columns["condition_operators"].append(encoder.strings.add(cond.operator or ""))
+            columns["condition_kinds"].append(kind)
+            columns["condition_refs"].append(ref)
+            columns["condition_lengths"].append(length)
+            columns["condition_numbers"].append(number)
+        columns["condition_starts"].append(len(columns["condition_fields"]))
+
+    columns["string_offsets"] = encoder.strings.offsets
+    columns["list_items"] = encoder.list_items
+    payloads = [bytes(encoder.strings.blob) if code is None else columns[name].tobytes() for name, code in SECTIONS]
+
+    flags = (FLAG_PUSHDOWN if pushdown else 0) | (FLAG_BIG_ENDIAN if sys.byteorder == "big" else 0)
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, flags, version, time.time(),
+        len(columns["ids"]), len(columns["condition_fields"]), len(encoder.strings.ids), len(encoder.list_items),
+    )
+    offset = _align(HEADER.size + SECTION_ENTRY.size * len(SECTIONS))
+    table, body = [], bytearray()
+    for payload in payloads:
+        table.append(SECTION_ENTRY.pack(offset, len(payload)))
+        body += payload + b"\0" * (_align(len(payload)) - len(payload))
+        offset += _align(len(payload))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(b"".join(table))
+        f.write(b"\0" * (_align(f.tell()) - f.tell()))
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    logger.info(
+        f"📦 Catalog snapshot v{version} written to {path}: {len(columns['ids'])} scholarships, "
+        f"{offset / 1024:.0f} KiB in {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+    return version
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+class CatalogSnapshot:
+    """A snapshot file mapped read-only. Keep a reference while its entries are in use."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        view = memoryview(self._map)
+        (magic, fmt, flags, self.version, self.built_at,
+         self.n_scholarships, self.n_conditions, self.n_strings, self.n_list_items) = HEADER.unpack_from(view)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a catalog snapshot (format {FORMAT_VERSION})")
+        if bool(flags & FLAG_BIG_ENDIAN) != (sys.byteorder == "big"):
+            raise ValueError(f"{path} was written on a machine with a different byte order")
+        self.pushdown = bool(flags & FLAG_PUSHDOWN)
+
+        for i, (name, code) in enumerate(SECTIONS):
+            offset, length = SECTION_ENTRY.unpack_from(view, HEADER.size + i * SECTION_ENTRY.size)
+            if offset + length > len(view):
+                raise ValueError(f"{path} is truncated")
+            section = view[offset:offset + length]
+            setattr(self, f"_{name}", section if code is None else section.cast(code))
+
+        self._decoded = {}
+        self.scholarships = self._entries()
+
+    def string(self, sid):
+        return str(self._strings[self._string_offsets[sid]:self._string_offsets[sid + 1]], "utf-8")
+
+    def _value(self, kind, ref, length=0, number=0.0):
+        if kind == STR:
+            return self.string(ref)
+        if kind == NONE:
+            return None
+        if kind in (FALSE, TRUE):
+            return kind == TRUE
+        if kind == INT:
+            return int(number)
+        if kind == FLOAT:
+            return number
+        if kind == STR_LIST:
+            return [self.string(sid) for sid in self._list_items[ref:ref + length]]
+        return json.loads(self.string(ref))
+
+    def cell(self, row, column):
+        i = row * len(SCHOLARSHIP_COLUMNS) + column
+        return self._value(self._cell_kinds[i], self._cell_refs[i])
+
+    def _interned(self, sid):
+        # Field names and operators repeat across the catalog; decode each once
+        text = self._decoded.get(sid)
+        if text is None:
+            text = self._decoded[sid] = sys.intern(self.string(sid))
+        return text
+
+    def _entries(self):
+        conditions, rulesets = {}, {}
+        starts = self._condition_starts
+        entries = []
+        for row in range(self.n_scholarships):
+            keys = tuple(
+                (self._condition_fields[i], self._condition_operators[i], self._condition_kinds[i],
+                 self._condition_refs[i], self._condition_lengths[i], self._condition_numbers[i])
+                for i in range(starts[row], starts[row + 1])
+            )
+            ruleset = rulesets.get(keys)
+            if ruleset is None:
+                ruleset = []
+                for key in keys:
+                    cond = conditions.get(key)
+                    if cond is None:
+                        cond = conditions[key] = Condition(
+                            self._interned(key[0]), self._interned(key[1]), self._value(*key[2:]),
+                        )
+                    ruleset.append(cond)
+                ruleset = rulesets[keys] = tuple(ruleset)
+            entries.append(SnapshotScholarship(self, row, self.string(self._ids[row]), ruleset))
+        self._decoded = None
+        return entries
+
+
+def _column(index):
+    return property(lambda self: self._snapshot.cell(self._row, index))
+
+
+class SnapshotScholarship:
+    """Read-only Scholarship view over one snapshot entry (same attributes as Scholarship)"""
+    __slots__ = ("_snapshot", "_row", "id", "conditions")
+
+    # Not part of the catalog projection; from_firestore defaults
+    description = ""
+    official_only = True
+    category = "General"
+    state_specific = False
+    state = ""
+    source = "unknown"
+
+    def __init__(self, snapshot, row, sch_id, conditions):
+        self._snapshot = snapshot
+        self._row = row
+        self.id = sch_id
+        self.conditions = conditions
+
+    def __repr__(self):
+        return f"SnapshotScholarship(id={self.id!r}, name={self.name!r})"
+
+
+for _index, _name in enumerate(SCHOLARSHIP_COLUMNS):
+    setattr(SnapshotScholarship, _name, _column(_index))
+
+
+def snapshot_age(path):
+    """Seconds since the snapshot at `path` was written (inf if there is none)"""
+    try:
+        return time.time() - os.stat(path).st_mtime
+    except FileNotFoundError:
+        return float("inf")
+
+
+def ensure_fresh(path, max_age, build):
+    """
+    Make sure a snapshot at most `max_age` seconds old exists at `path`,
+    calling build(path) under an exclusive lock file so only one worker
+    rebuilds. While another worker is rebuilding, the current (stale) file is
+    used as is; only when there is no file at all do we wait for the builder.
+    """
+    import fcntl
+
+    if snapshot_age(path) <= max_age:
+        return
+    with open(f"{path}.lock", "a+") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            if os.path.exists(path):
+                return
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            # Someone else may have rebuilt while we waited for the lock
+            if snapshot_age(path) <= max_age:
+                return
+            build(path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,121 @@
+"""
+Catalog-wide condition table for "near-miss" queries.
+
+Every condition of every cached scholarship gets a row and each scholarship's
+conditions are numbered as bits. Conditions are indexed by field and
+operator (numeric limits as arrays, ==/IN values as hash lookups), so one
+profile is checked against the whole catalog in a single pass, then folded
+into a per-scholarship satisfaction bitmask. Scholarships failing exactly k
+conditions, and which ones, fall out of the mask without rescanning rules.
+
+Satisfaction follows services.eligibility_engine per condition; conditions
+without a field or operator are ignored, like the engine does.
+"""
+import logging
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAX_CONDITION_BITS = 64
+
+
+class ConditionTable:
+    def __init__(self, scholarships):
+        started = time.perf_counter()
+        self.scholarships = scholarships
+        self.conditions = []  # per scholarship: its conditions in bit order
+        sch_index, bits = [], []
+        numeric, equals, members, present = {}, {}, {}, {}
+        skipped = 0
+
+        for j, sch in enumerate(scholarships):
+            valid = [c for c in sch.conditions if c.field and c.operator]
+            if len(valid) > MAX_CONDITION_BITS:
+                skipped += 1
+                valid = []
+            self.conditions.append(valid)
+
+            for bit, cond in enumerate(valid):
+                cid = len(sch_index)
+                sch_index.append(j)
+                bits.append(bit)
+                field, operator, value = cond.field, cond.operator, cond.value
+
+                if operator in ("<=", ">="):
+                    try:
+                        limit = float(value)
+                    except (ValueError, TypeError):
+                        continue  # never satisfied
+                    limits, ids = numeric.setdefault((field, operator), ([], []))
+                    limits.append(limit)
+                    ids.append(cid)
+                elif operator == "==" or (operator == "IN" and not isinstance(value, list)):
+                    equals.setdefault(field, {}).setdefault(str(value).lower(), []).append(cid)
+                elif operator == "IN":
+                    for v in {str(v).lower().strip() for v in value}:
+                        members.setdefault(field, {}).setdefault(v, []).append(cid)
+                elif operator == "ANY":
+                    present.setdefault(field, []).append(cid)
+
+        self.sch_index = np.array(sch_index, dtype=np.int32)
+        self.bit_values = np.left_shift(np.uint64(1), np.array(bits, dtype=np.uint64))
+        self.totals = np.bincount(self.sch_index, minlength=len(scholarships))
+        self._numeric = {key: (np.array(limits), np.array(ids, dtype=np.int32)) for key, (limits, ids) in numeric.items()}
+        self._equals = {f: {v: np.array(ids, dtype=np.int32) for v, ids in index.items()} for f, index in equals.items()}
+        self._members = {f: {v: np.array(ids, dtype=np.int32) for v, ids in index.items()} for f, index in members.items()}
+        self._present = {f: np.array(ids, dtype=np.int32) for f, ids in present.items()}
+
+        if skipped:
+            logger.warning(f"⚠️ {skipped} scholarships have more than {MAX_CONDITION_BITS} conditions; left out of near-miss queries")
+        logger.info(
+            f"🧩 Condition table: {len(sch_index)} conditions over {len(scholarships)} scholarships "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
+    def satisfied(self, profile):
+        """Bool per condition row: does this profile meet it"""
+        sat = np.zeros(len(self.sch_index), dtype=bool)
+
+        for (field, operator), (limits, ids) in self._numeric.items():
+            try:
+                value = float(profile.get(field))
+            except (ValueError, TypeError):
+                continue
+            sat[ids] = value <= limits if operator == "<=" else value >= limits
+
+        for field, index in self._equals.items():
+            ids = index.get(str(profile.get(field)).lower())
+            if ids is not None:
+                sat[ids] = True
+
+        for field, index in self._members.items():
+            ids = index.get(str(profile.get(field)).lower().strip())
+            if ids is not None:
+                sat[ids] = True
+
+        for field, ids in self._present.items():
+            if profile.get(field):
+                sat[ids] = True
+
+        return sat
+
+    def masks(self, profile):
+        """(satisfaction bitmask, failed condition count) per scholarship"""
+        sat = self.satisfied(profile)
+        mask = np.zeros(len(self.scholarships), dtype=np.uint64)
+        np.bitwise_or.at(mask, self.sch_index[sat], self.bit_values[sat])
+        failed = self.totals - np.bincount(self.sch_index[sat], minlength=len(self.scholarships))
+        return mask, failed
+
+    def near_misses(self, profile, k):
+        """[(Scholarship, [failing Condition, ...]), ...] for scholarships failing exactly k conditions"""
+        mask, failed = self.masks(profile)
+        hits = np.flatnonzero((failed == k) & (self.totals > 0))
+        results = []
+        for j in hits.tolist():
+            met = int(mask[j])
+            failing = [cond for bit, cond in enumerate(self.conditions[j]) if not met >> bit & 1]
+            results.append((self.scholarships[j], failing))
+        return results
@@ -4,7 +4,9 @@ import hashlib
 def evaluate_conditions(profile: dict, conditions: list):
     """
     Evaluate if profile matches scholarship conditions
+    (condition dicts or utils.normalizer.Condition records)
     Returns: {"eligible": bool, "score": float, "reasons": list}
+    Callers time and count (metrics.evaluations) their loops, not each call.
     """
     # Track matches
     total_conditions = len(conditions)
@@ -16,9 +18,12 @@ def evaluate_conditions(profile: dict, conditions: list):
     bonus_points = 0.0
     
     for condition in conditions:
-        field = condition.get("field")
-        operator = condition.get("operator")
-        value = condition.get("value")
+        if isinstance(condition, dict):
+            field = condition.get("field")
+            operator = condition.get("operator")
+            value = condition.get("value")
+        else:
+            field, operator, value = condition.field, condition.operator, condition.value
         
         if not field or not operator:
             continue
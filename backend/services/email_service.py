@@ -1,8 +1,13 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from concurrent.futures import ThreadPoolExecutor
 import os
 import logging
+import threading
+import time
+
+from services.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -11,35 +16,174 @@ EMAIL_USER = os.getenv("EMAIL_USER")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
 SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", 3))
+SMTP_PER_MINUTE = int(os.getenv("SMTP_PER_MINUTE", 0))  # 0 = no throttling
+SMTP_TIMEOUT = 30
 
-def send_email(to_email: str, subject: str, body: str):
+
+class _Throttle:
+    """Spaces sends evenly so at most per_minute messages go out per minute"""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SMTPMailer:
     """
-    Sends an email using SMTP (e.g., Gmail).
-    If credentials are missing, logs the email to console (Mock Mode).
+    Keeps a small pool of authenticated SMTP connections and reuses them for
+    many messages (RSET between messages), reconnecting when one goes stale.
+    If credentials are missing, messages are logged instead (Mock Mode).
     """
-    if not EMAIL_USER or not EMAIL_PASSWORD:
-        logger.warning("⚠️ Email credentials missing. Running in MOCK MODE.")
-        logger.info(f"📧 [MOCK EMAIL] To: {to_email} | Subject: {subject} | Body: {body}")
-        return {"status": "mock_sent", "message": "Mock email logged to console"}
 
-    try:
+    def __init__(self, host=SMTP_SERVER, port=SMTP_PORT, user=EMAIL_USER, password=EMAIL_PASSWORD,
+                 pool_size=SMTP_POOL_SIZE, per_minute=SMTP_PER_MINUTE):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.pool_size = max(1, pool_size)
+        self.throttle = _Throttle(per_minute)
+        self._idle = []
+        # Guards _idle and _open; notified whenever a connection is returned or closed
+        self._available = threading.Condition()
+        self._open = 0
+
+    @property
+    def mock_mode(self):
+        return not self.user or not self.password
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        server.starttls()
+        server.login(self.user, self.password)
+        return server
+
+    def _acquire(self, fresh=False):
+        """
+        Idle connection if any, a new one if under pool_size, else wait until
+        one is returned or closed. Both are re-checked after every wakeup: a
+        connection discarded by another sender frees a slot to open our own.
+        fresh skips idle connections unless we had to wait.
+        """
+        with self._available:
+            waited = False
+            while True:
+                if self._idle and (waited or not fresh):
+                    return self._idle.pop(), True
+                if self._open < self.pool_size:
+                    self._open += 1
+                    break
+                self._available.wait()
+                waited = True
+        try:
+            return self._connect(), False
+        except Exception:
+            self._closed()
+            raise
+
+    def _release(self, server):
+        with self._available:
+            self._idle.append(server)
+            self._available.notify()
+
+    def _closed(self):
+        with self._available:
+            self._open -= 1
+            self._available.notify()
+
+    def _discard(self, server):
+        self._closed()
+        try:
+            server.close()
+        except Exception:
+            pass
+
+    def send(self, to_email: str, subject: str, body: str):
+        return self._send(to_email, subject, body, self.throttle)
+
+    def _send(self, to_email, subject, body, throttle):
+        result = self._deliver(to_email, subject, body, throttle)
+        metrics.inc("fms_emails_total", {"status": result["status"]})
+        return result
+
+    def _deliver(self, to_email, subject, body, throttle):
+        if self.mock_mode:
+            logger.warning("⚠️ Email credentials missing. Running in MOCK MODE.")
+            logger.info(f"📧 [MOCK EMAIL] To: {to_email} | Subject: {subject} | Body: {body}")
+            return {"status": "mock_sent", "message": "Mock email logged to console"}
+
         msg = MIMEMultipart()
-        msg['From'] = EMAIL_USER
+        msg['From'] = self.user
         msg['To'] = to_email
         msg['Subject'] = subject
-
         msg.attach(MIMEText(body, 'plain'))
-
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_USER, EMAIL_PASSWORD)
         text = msg.as_string()
-        server.sendmail(EMAIL_USER, to_email, text)
-        server.quit()
 
-        logger.info(f"✅ Email sent to {to_email}")
-        return {"status": "sent", "message": "Email sent successfully"}
+        throttle.wait()
+        # One retry on a fresh connection if a pooled one turns out to be dead
+        for attempt in range(2):
+            server = None
+            try:
+                server, reused = self._acquire(fresh=attempt > 0)
+                if reused:
+                    server.rset()
+                server.sendmail(self.user, to_email, text)
+                self._release(server)
+                logger.info(f"✅ Email sent to {to_email}")
+                return {"status": "sent", "message": "Email sent successfully"}
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                # Server rejected this message; the connection itself is still usable
+                self._release(server)
+                logger.error(f"❌ Failed to send email: {e}")
+                return {"status": "error", "error": str(e)}
+            except (smtplib.SMTPException, OSError) as e:
+                # Includes SMTPServerDisconnected: drop the connection and retry once
+                if server is not None:
+                    self._discard(server)
+                if attempt == 1:
+                    logger.error(f"❌ Failed to send email: {e}")
+                    return {"status": "error", "error": str(e)}
+
+    def send_many(self, messages, concurrency=None, per_minute=None):
+        """
+        Send (to_email, subject, body) tuples over the pooled connections.
+        concurrency is capped at pool_size; per_minute overrides SMTP_PER_MINUTE
+        for this batch. Returns results in input order.
+        """
+        workers = min(concurrency or self.pool_size, self.pool_size)
+        throttle = _Throttle(per_minute) if per_minute else self.throttle
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp") as pool:
+            return list(pool.map(lambda m: self._send(*m, throttle), messages))
+
+    def close(self):
+        with self._available:
+            idle, self._idle = self._idle, []
+        for server in idle:
+            try:
+                server.quit()
+            except Exception:
+                pass
+            self._closed()
 
-    except Exception as e:
-        logger.error(f"❌ Failed to send email: {e}")
-        return {"status": "error", "error": str(e)}
+
+mailer = SMTPMailer()
+
+
+def send_email(to_email: str, subject: str, body: str):
+    """
+    Sends an email using SMTP (e.g., Gmail) over the shared connection pool.
+    If credentials are missing, logs the email to console (Mock Mode).
+    """
+    return mailer.send(to_email, subject, body)
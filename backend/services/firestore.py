@@ -1,12 +1,23 @@
-from google.cloud import firestore
 import os
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# "firestore" (default) or "memory" for the in-process store in services/memory_firestore.py
+FIRESTORE_BACKEND = os.getenv("FIRESTORE_BACKEND", "firestore")
+
 def get_firestore_client():
-    """Get Firestore client with default credentials"""
+    """Get Firestore client with default credentials (or the in-memory store)"""
+    if FIRESTORE_BACKEND == "memory":
+        from services.memory_firestore import MemoryFirestore
+        logger.info("✅ Using in-memory Firestore (FIRESTORE_BACKEND=memory)")
+        return MemoryFirestore.from_env()
+
     try:
+        from google.cloud import firestore
+
         # Try with environment variable (JSON string) - Best for Render/Cloud
         # We check both keys since users might prefer one or the other
         firebase_creds = os.getenv("FIREBASE_CREDENTIALS") or os.getenv("GOOGLE_APPLICATION_CREDENTIALS_JSON")
@@ -39,55 +50,245 @@ def get_firestore_client():
     except Exception as e:
         logger.error(f"❌ Firestore initialization failed: {e}")
         
-        # Create a mock client for development
-        logger.warning("⚠️  Using mock Firestore client (data won't be saved)")
-        
-        class MockFirestore:
-            def collection(self, name):
-                return MockCollection()
-        
-        class MockCollection:
-            def document(self, doc_id):
-                return MockDocument()
-            
-            def where(self, field, operator, value):
-                return MockQuery()
-            
-            def stream(self):
-                return []
-            
-            def add(self, data):
-                print(f"📝 [MOCK] Would add to {self}: {data}")
-                return None
-        
-        class MockDocument:
-            def get(self):
-                return MockDocumentSnapshot()
-            
-            def set(self, data, merge=False):
-                print(f"📝 [MOCK] Would set document: {data}")
-                return None
-            
-            def update(self, data):
-                print(f"📝 [MOCK] Would update document: {data}")
-                return None
-        
-        class MockDocumentSnapshot:
-            def exists(self):
-                return False
-            
-            def to_dict(self):
-                return {}
-        
-        class MockQuery:
-            def stream(self):
-                return []
-            
-            def limit(self, limit):
-                return self
-        
-        return MockFirestore()
+        # In-memory store for development (same API, nothing persisted)
+        from services.memory_firestore import MemoryFirestore
+        logger.warning("⚠️  Using in-memory Firestore client (data won't be saved)")
+        return MemoryFirestore.from_env()
+
+class FirestoreCall:
+    """One billable Firestore round trip, as seen by observers"""
+    __slots__ = ("op", "kind", "collection", "shape", "docs", "seconds")
+
+    def __init__(self, op, kind, collection, shape, docs, seconds):
+        self.op = op                  # get, stream, get_all, count, set, update, delete, commit, ...
+        self.kind = kind              # "read" or "write"
+        self.collection = collection
+        self.shape = shape            # query shape without values, e.g. (("where", "userId", "=="), ("limit",))
+        self.docs = docs              # documents read or written
+        self.seconds = seconds
+
+
+# Methods that build a new reference/query; everything else is forwarded as-is
+_REF_METHODS = {"collection", "document", "collection_group"}
+_QUERY_METHODS = {"where", "order_by", "limit", "limit_to_last", "offset", "select",
+                  "start_at", "start_after", "end_at", "end_before"}
+_WRITE_METHODS = {"set", "update", "delete", "create"}
+_FLUSH_METHODS = {"commit", "flush", "close"}
+
+
+class _Proxy:
+    """
+    Wraps a Firestore client/reference/query/batch and reports every read and
+    write to the client's observers. With no observers the only cost is the
+    wrapping itself.
+    """
+    __slots__ = ("_target", "_client", "_collection", "_shape", "_pending")
+
+    def __init__(self, target, client, collection="", shape=()):
+        self._target = target
+        self._client = client
+        self._collection = collection
+        self._shape = shape
+        self._pending = None
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+        if name in _REF_METHODS:
+            return lambda *args, **kwargs: self._ref(name, attr, args, kwargs)
+        if name in _QUERY_METHODS:
+            return lambda *args, **kwargs: self._query(name, attr, args, kwargs)
+        if name == "count":
+            return lambda *args, **kwargs: _Proxy(attr(*args, **kwargs), self._client, self._collection, self._shape + (("count",),))
+        if name in ("batch", "bulk_writer"):
+            return lambda *args, **kwargs: self._batch(attr(*args, **kwargs))
+        if name in ("get", "stream", "get_all") or name in _WRITE_METHODS or name in _FLUSH_METHODS or name == "add":
+            return lambda *args, **kwargs: self._call(name, attr, args, kwargs)
+        return attr
+
+    def _ref(self, name, method, args, kwargs):
+        ref = method(*args, **kwargs)
+        if name == "document":
+            # Shape starts with "document" so single-document gets are told apart from queries
+            return _Proxy(ref, self._client, self._collection, (("document",),))
+        return _Proxy(ref, self._client, getattr(ref, "id", None) or (args[0] if args else ""))
+
+    def _query(self, name, method, args, kwargs):
+        if name == "where":
+            if "filter" in kwargs:
+                flt = kwargs["filter"]
+                step = ("where", getattr(flt, "field_path", "?"), getattr(flt, "op_string", "?"))
+            else:
+                step = ("where", args[0] if args else kwargs.get("field_path"), args[1] if len(args) > 1 else kwargs.get("op_string"))
+        elif name == "order_by":
+            step = ("order_by", args[0] if args else kwargs.get("field_path"))
+        elif name in ("start_at", "start_after", "end_at", "end_before"):
+            step = ("cursor",)
+        else:
+            step = (name,)
+        return _Proxy(method(*args, **kwargs), self._client, self._collection, self._shape + (step,))
+
+    def _batch(self, batch):
+        proxy = _Proxy(batch, self._client)
+        proxy._pending = {}
+        return proxy
+
+    def _call(self, name, method, args, kwargs):
+        collection = self._collection
+        if name == "get_all":
+            refs = list(args[0] if args else kwargs.pop("references", []))
+            collection = _collection_of(refs[0]) if refs else ""
+            args = ([_unwrap(ref) for ref in refs],) + args[1:]
+        elif args and name in _WRITE_METHODS and self._pending is not None:
+            collection = _collection_of(args[0])
+        args = tuple(_unwrap(a) for a in args)
+
+        if self._pending is not None:
+            # Batch / BulkWriter: queue writes, report them when flushed
+            if name in _WRITE_METHODS:
+                self._pending[collection] = self._pending.get(collection, 0) + 1
+                return method(*args, **kwargs)
+            if name in _FLUSH_METHODS:
+                observers = self._client._observers
+                started = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    if observers and self._pending:
+                        elapsed = time.perf_counter() - started
+                        total = sum(self._pending.values())
+                        for collection, count in self._pending.items():
+                            self._client._notify(FirestoreCall(name, "write", collection, (), count, elapsed * count / total))
+                    self._pending = {}
+            return method(*args, **kwargs)
+
+        if not self._client._observers:
+            return method(*args, **kwargs)
+
+        if name in ("stream", "get_all"):
+            return self._observe_stream(name, collection, method(*args, **kwargs))
+
+        started = time.perf_counter()
+        result = method(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        op, kind, docs = name, "write", 1
+        if name == "get":
+            kind = "read"
+            if self._shape[-1:] == (("count",),):
+                op = "count"
+            elif self._shape[:1] != (("document",),):
+                docs = len(result)  # Query.get() returns a list
+        self._client._notify(FirestoreCall(op, kind, collection, self._shape, docs, elapsed))
+        return result
+
+    def _observe_stream(self, name, collection, iterator):
+        """Yield from a streaming read, timing only the time spent waiting on Firestore"""
+        docs = 0
+        elapsed = 0.0
+        iterator = iter(iterator)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    doc = next(iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - started
+                    break
+                elapsed += time.perf_counter() - started
+                docs += 1
+                yield doc
+        finally:
+            self._client._notify(FirestoreCall(name, "read", collection, self._shape, docs, elapsed))
+
+
+def _unwrap(value):
+    return value._target if isinstance(value, _Proxy) else value
+
+
+def _collection_of(ref):
+    if isinstance(ref, _Proxy):
+        return ref._collection
+    parent = getattr(ref, "parent", None)
+    return getattr(parent, "id", "") or ""
+
+
+class InstrumentedClient(_Proxy):
+    """
+    The shared `db`. Behaves like the Firestore client it wraps; observers
+    (callables taking a FirestoreCall) see every read and write. The wrapped
+    client can be swapped with use_client(), e.g. for tests.
+
+    Given a factory instead of a client, the client is only built (once,
+    thread-safely) on first use, so importing this module stays cheap.
+    """
+    __slots__ = ("_observers", "_factory", "_connect_lock")
+
+    def __init__(self, client=None, factory=None):
+        _Proxy.__init__(self, client, self)
+        if client is None:
+            del self._target  # built by _connect() on first access
+        self._observers = ()
+        self._factory = factory
+        self._connect_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name == "_target":
+            return self._connect()
+        return _Proxy.__getattr__(self, name)
+
+    def _connect(self):
+        with self._connect_lock:
+            try:
+                return object.__getattribute__(self, "_target")
+            except AttributeError:
+                pass
+            started = time.perf_counter()
+            client = self._factory()
+            self._target = client
+            logger.info(f"✅ Firestore client initialized in {(time.perf_counter() - started) * 1000:.0f}ms")
+            return client
+
+    def disconnect(self):
+        """Drop the built client so the next use builds a new one from the factory"""
+        with self._connect_lock:
+            if self._factory is not None and self.connected:
+                del self._target
+
+    @property
+    def connected(self):
+        """Whether the underlying client has been built yet"""
+        try:
+            object.__getattribute__(self, "_target")
+            return True
+        except AttributeError:
+            return False
+
+    def add_observer(self, observer):
+        if observer not in self._observers:
+            self._observers = self._observers + (observer,)
+
+    def remove_observer(self, observer):
+        self._observers = tuple(o for o in self._observers if o is not observer)
+
+    def use_client(self, client):
+        """Swap the underlying client; returns the previous one (None if none was built yet)"""
+        with self._connect_lock:
+            previous = object.__getattribute__(self, "_target") if self.connected else None
+            self._target = client
+        return previous
+
+    @property
+    def client(self):
+        return self._target
+
+    def _notify(self, call):
+        for observer in self._observers:
+            try:
+                observer(call)
+            except Exception as e:
+                logger.debug(f"Firestore observer failed: {e}")
+
 
-# Initialize Firestore client
-db = get_firestore_client()
-logger.info("✅ Firestore client initialized")
\ No newline at end of file
+# Shared client, built on first use
+db = InstrumentedClient(factory=get_firestore_client)
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""
+Firestore call tracer with N+1 detection.
+
+Records every read/write going through the shared `db` (via its observer
+hook) together with the line of application code that issued it, per scope:
+- per request, when FIRESTORE_TRACE=1 (FirestoreTraceMiddleware; meant for
+  staging). Requests issuing the same query shape from the same call site
+  FIRESTORE_N1_THRESHOLD times or more are logged as N+1 suspects;
+- around any block with `with trace() as t:` (scripts, jobs);
+- in tests, with the `firestore_budget` pytest fixture:
+
+    pytest_plugins = ["services.firestore_tracer"]
+
+    def test_eligible(client, firestore_budget):
+        with firestore_budget(reads=60, n_plus_one=3):
+            client.get("/scholarships/eligible")
+
+  which fails the test when the block reads more documents than allowed or
+  repeats a query shape n_plus_one times (tests/test_read_budgets.py, run in CI).
+"""
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from services.firestore import db
+
+logger = logging.getLogger(__name__)
+
+FIRESTORE_TRACE = os.getenv("FIRESTORE_TRACE", "0") == "1"
+FIRESTORE_N1_THRESHOLD = int(os.getenv("FIRESTORE_N1_THRESHOLD", 5))
+
+# Frames from these files (and the stdlib / installed packages) are never reported as the call site
+_INTERNAL_FILES = (
+    os.path.normcase(os.path.abspath(__file__)),
+    os.path.normcase(os.path.abspath(sys.modules["services.firestore"].__file__)),
+)
+_STDLIB = os.path.normcase(os.path.dirname(os.__file__))
+
+
+class TracedCall:
+    __slots__ = ("call", "site")
+
+    def __init__(self, call, site):
+        self.call = call
+        self.site = site
+
+    def __repr__(self):
+        call = self.call
+        return f"<{call.kind} {call.op} {call.collection} {call.shape} docs={call.docs} at {self.site}>"
+
+
+class Trace:
+    def __init__(self, name=""):
+        self.name = name
+        self.calls = []
+
+    @property
+    def reads(self):
+        """Documents read (what Firestore bills)"""
+        return sum(c.call.docs for c in self.calls if c.call.kind == "read")
+
+    @property
+    def writes(self):
+        return sum(c.call.docs for c in self.calls if c.call.kind == "write")
+
+    def repeated(self, threshold=FIRESTORE_N1_THRESHOLD):
+        """
+        [(site, op, collection, shape, times), ...] for query shapes issued at
+        least `threshold` times from the same call site, e.g. a query per
+        item inside a loop. Batched writes are not counted.
+        """
+        groups = {}
+        for traced in self.calls:
+            call = traced.call
+            if call.op in ("commit", "flush", "close"):
+                continue
+            key = (traced.site, call.op, call.collection, call.shape)
+            groups[key] = groups.get(key, 0) + 1
+        return [key + (times,) for key, times in groups.items() if times >= threshold]
+
+    def summary(self):
+        return {"calls": len(self.calls), "reads": self.reads, "writes": self.writes}
+
+
+_request_trace = ContextVar("firestore_trace", default=None)
+_global_traces = []
+
+
+def _call_site():
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.normcase(frame.f_code.co_filename)
+        if (filename not in _INTERNAL_FILES and "site-packages" not in filename
+                and not filename.startswith(_STDLIB) and not filename.startswith("<")):
+            return f"{os.path.relpath(frame.f_code.co_filename)}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return "unknown"
+
+
+def observer(call):
+    """db observer feeding the active traces"""
+    request_trace = _request_trace.get()
+    if request_trace is None and not _global_traces:
+        return
+    traced = TracedCall(call, _call_site())
+    if request_trace is not None:
+        request_trace.calls.append(traced)
+    for global_trace in _global_traces:
+        global_trace.calls.append(traced)
+
+
+@contextmanager
+def trace(name="", all_threads=False):
+    """
+    Record Firestore calls made inside the block. With all_threads=True calls
+    from any thread are recorded too (e.g. an app driven by a test client).
+    """
+    db.add_observer(observer)
+    current = Trace(name)
+    if all_threads:
+        _global_traces.append(current)
+        try:
+            yield current
+        finally:
+            _global_traces.remove(current)
+    else:
+        token = _request_trace.set(current)
+        try:
+            yield current
+        finally:
+            _request_trace.reset(token)
+
+
+class FirestoreTraceMiddleware:
+    """ASGI middleware: trace each request, log N+1 suspects and totals"""
+
+    def __init__(self, app, threshold=FIRESTORE_N1_THRESHOLD):
+        self.app = app
+        self.threshold = threshold
+        db.add_observer(observer)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        current = Trace(f"{scope['method']} {scope['path']}")
+        token = _request_trace.set(current)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_trace.reset(token)
+            for site, op, collection, shape, times in current.repeated(self.threshold):
+                logger.warning(f"⚠️ Possible N+1 in {current.name}: {op} on {collection} {shape} issued {times}x at {site}")
+            if current.calls:
+                logger.info(f"🔎 Firestore {current.name}: {current.summary()}")
+
+
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
+if pytest is not None:
+    @pytest.fixture
+    def firestore_budget():
+        """
+        Context manager factory asserting a block stays within a Firestore
+        budget: firestore_budget(reads=None, writes=None, n_plus_one=FIRESTORE_N1_THRESHOLD)
+        """
+        @contextmanager
+        def budget(reads=None, writes=None, n_plus_one=FIRESTORE_N1_THRESHOLD):
+            with trace("budget", all_threads=True) as current:
+                yield current
+            problems = []
+            if reads is not None and current.reads > reads:
+                problems.append(f"read {current.reads} documents (budget {reads})")
+            if writes is not None and current.writes > writes:
+                problems.append(f"wrote {current.writes} documents (budget {writes})")
+            for site, op, collection, shape, times in current.repeated(n_plus_one):
+                problems.append(f"N+1: {op} on {collection} {shape} issued {times}x at {site}")
+            assert not problems, "Firestore budget exceeded:\n  " + "\n  ".join(problems)
+
+        return budget
@@ -0,0 +1,492 @@
+"""
+In-memory stand-in for the Firestore client, for local runs, benchmarks and
+load tests (FIRESTORE_BACKEND=memory, or the fallback when no credentials are
+found).
+
+Implements the subset of google.cloud.firestore the app uses, with the same
+call shapes: collection/document/get/set(merge)/create/update/delete,
+where (==, !=, <, <=, >, >=, in, not-in, array_contains[_any])/order_by/
+limit/offset/select/start_at/start_after/end_at/end_before/stream/get,
+count() aggregation, get_all(), batch() and bulk_writer(). Data is kept in
+plain dicts and copied on every read and write, like a real round trip, and
+errors are the google.api_core exceptions Firestore raises.
+
+Round trips can be made to cost something: `latency` is seconds per
+operation ("read", "query", "write", "commit"), with +/- `jitter` spread, and
+`failure_rate` makes that fraction of round trips raise ServiceUnavailable.
+From the environment:
+
+    FIRESTORE_MEMORY_LATENCY_MS=20                       # every op
+    FIRESTORE_MEMORY_LATENCY_MS=read=15,query=40,commit=60
+    FIRESTORE_MEMORY_JITTER=0.2
+    FIRESTORE_MEMORY_FAILURE_RATE=0.01
+    FIRESTORE_MEMORY_SEED=fixtures.json                  # {collection: {doc_id: data}}
+"""
+import copy
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+
+from google.api_core import exceptions
+
+logger = logging.getLogger(__name__)
+
+OPS = ("read", "query", "write", "commit")
+MAX_BATCH_WRITES = 500
+MAX_IN_VALUES = 30
+
+_NUMBER = (int, float)
+
+
+def _comparable(a, b):
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool)
+    if isinstance(a, _NUMBER) and isinstance(b, _NUMBER):
+        return True
+    return type(a) is type(b)
+
+
+def _equal(a, b):
+    return _comparable(a, b) and a == b
+
+
+def _matches(data, field, op, value):
+    if field not in data:
+        return False
+    current = data[field]
+    if op == "==":
+        return _equal(current, value)
+    if op == "!=":
+        return current is not None and not _equal(current, value)
+    if op in ("<", "<=", ">", ">="):
+        if current is None or not _comparable(current, value):
+            return False
+        if op == "<":
+            return current < value
+        if op == "<=":
+            return current <= value
+        if op == ">":
+            return current > value
+        return current >= value
+    if op == "in":
+        return any(_equal(current, v) for v in value)
+    if op == "not-in":
+        return current is not None and not any(_equal(current, v) for v in value)
+    if op == "array_contains":
+        return isinstance(current, list) and any(_equal(item, value) for item in current)
+    if op == "array_contains_any":
+        return isinstance(current, list) and any(_equal(item, v) for item in current for v in value)
+    raise exceptions.InvalidArgument(f"Unsupported operator: {op}")
+
+
+def _compare(a, b):
+    """-1/0/1 ordering of two field values (None first, then by value)"""
+    if a is None or b is None:
+        return (a is not None) - (b is not None)
+    if not _comparable(a, b):
+        # Firestore orders mixed types by type; keep it deterministic
+        a, b = type(a).__name__, type(b).__name__
+    return (a > b) - (a < b)
+
+
+def parse_latency(spec):
+    """"20" or "read=15,query=40" (milliseconds) -> {op: seconds}"""
+    if not spec:
+        return {}
+    if "=" not in spec:
+        return {op: float(spec) / 1000 for op in OPS}
+    latency = {}
+    for part in spec.split(","):
+        op, _, ms = part.partition("=")
+        op = op.strip()
+        if op not in OPS:
+            raise ValueError(f"Unknown Firestore op in latency spec: {op} (choose from {', '.join(OPS)})")
+        latency[op] = float(ms) / 1000
+    return latency
+
+
+class AggregationResult:
+    def __init__(self, alias, value):
+        self.alias = alias
+        self.value = value
+
+
+class MemorySnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self._data = data
+
+    @property
+    def id(self):
+        return self.reference.id
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field):
+        return copy.deepcopy((self._data or {}).get(field))
+
+
+class MemoryDocument:
+    def __init__(self, client, collection_id, doc_id):
+        self._client = client
+        self._collection_id = collection_id
+        self.id = doc_id
+
+    @property
+    def parent(self):
+        return MemoryCollection(self._client, self._collection_id)
+
+    @property
+    def path(self):
+        return f"{self._collection_id}/{self.id}"
+
+    def get(self, field_paths=None):
+        self._client._round_trip("read")
+        return self._client._snapshot(self, field_paths)
+
+    def set(self, document_data, merge=False):
+        self._client._round_trip("write")
+        self._client._apply([("set", self, document_data, merge)])
+
+    def create(self, document_data):
+        self._client._round_trip("write")
+        self._client._apply([("create", self, document_data, False)])
+
+    def update(self, field_updates):
+        self._client._round_trip("write")
+        self._client._apply([("update", self, field_updates, False)])
+
+    def delete(self):
+        self._client._round_trip("write")
+        self._client._apply([("delete", self, None, False)])
+
+
+class MemoryQuery:
+    def __init__(self, client, collection_id, filters=(), orders=(), limit=None, offset=0, fields=None, cursors=()):
+        self._client = client
+        self._collection_id = collection_id
+        self._filters = filters
+        self._orders = orders
+        self._limit = limit
+        self._offset = offset
+        self._fields = fields
+        self._cursors = cursors  # ((kind, values), ...)
+
+    def _copy(self, **changes):
+        state = {
+            "filters": self._filters, "orders": self._orders, "limit": self._limit,
+            "offset": self._offset, "fields": self._fields, "cursors": self._cursors,
+        }
+        state.update(changes)
+        return MemoryQuery(self._client, self._collection_id, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        if op_string in ("in", "not-in", "array_contains_any") and len(value) > MAX_IN_VALUES:
+            raise exceptions.InvalidArgument(f"'{op_string}' filters support a maximum of {MAX_IN_VALUES} elements in the value array")
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction="ASCENDING"):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def offset(self, num_to_skip):
+        return self._copy(offset=num_to_skip)
+
+    def select(self, field_paths):
+        return self._copy(fields=tuple(field_paths))
+
+    def start_at(self, document_fields_or_snapshot):
+        return self._cursor("start_at", document_fields_or_snapshot)
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._cursor("start_after", document_fields_or_snapshot)
+
+    def end_at(self, document_fields_or_snapshot):
+        return self._cursor("end_at", document_fields_or_snapshot)
+
+    def end_before(self, document_fields_or_snapshot):
+        return self._cursor("end_before", document_fields_or_snapshot)
+
+    def _cursor(self, kind, position):
+        if isinstance(position, MemorySnapshot):
+            values = dict(position._data or {})
+            values["__name__"] = position.id
+        elif isinstance(position, dict):
+            values = dict(position)
+        else:
+            values = {field: value for (field, _), value in zip(self._order_fields(), position)}
+        cursors = tuple(c for c in self._cursors if c[0][:3] != kind[:3])  # start_* replaces start_*, end_* end_*
+        return self._copy(cursors=cursors + ((kind, values),))
+
+    def count(self, alias=None):
+        return _MemoryCount(self, alias or "field_1")
+
+    def _order_fields(self):
+        """Explicit orders plus the implicit __name__ tiebreak"""
+        orders = list(self._orders)
+        if not any(field == "__name__" for field, _ in orders):
+            orders.append(("__name__", orders[-1][1] if orders else "ASCENDING"))
+        return orders
+
+    def _position(self, doc_id, data, values):
+        """-1/0/1: where a document sits relative to a cursor, in query order"""
+        for field, direction in self._order_fields():
+            if field not in values:
+                break
+            current = doc_id if field == "__name__" else data.get(field)
+            result = _compare(current, values[field])
+            if result:
+                return -result if direction == "DESCENDING" else result
+        return 0
+
+    def _matching(self):
+        items = [
+            (doc_id, data) for doc_id, data in self._client._items(self._collection_id)
+            if all(_matches(data, f, op, v) for f, op, v in self._filters)
+        ]
+        for field, direction in reversed(self._orders):
+            if field == "__name__":
+                items.sort(key=lambda item: item[0], reverse=direction == "DESCENDING")
+                continue
+            items = [item for item in items if field in item[1]]
+            items.sort(key=lambda item: _SortKey(item[1][field]), reverse=direction == "DESCENDING")
+        for kind, values in self._cursors:
+            keep = {
+                "start_at": lambda p: p >= 0, "start_after": lambda p: p > 0,
+                "end_at": lambda p: p <= 0, "end_before": lambda p: p < 0,
+            }[kind]
+            items = [item for item in items if keep(self._position(item[0], item[1], values))]
+        items = items[self._offset:]
+        if self._limit is not None:
+            items = items[:self._limit]
+        return items
+
+    def stream(self):
+        self._client._round_trip("query")
+        for doc_id, data in self._matching():
+            if self._fields is not None:
+                data = {k: v for k, v in data.items() if k in self._fields}
+            yield MemorySnapshot(MemoryDocument(self._client, self._collection_id, doc_id), copy.deepcopy(data))
+
+    def get(self):
+        return list(self.stream())
+
+
+class _SortKey:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return _compare(self.value, other.value) < 0
+
+
+class _MemoryCount:
+    def __init__(self, query, alias):
+        self._query = query
+        self._alias = alias
+
+    def get(self):
+        self._query._client._round_trip("query")
+        return [[AggregationResult(self._alias, len(self._query._matching()))]]
+
+
+class MemoryCollection(MemoryQuery):
+    def __init__(self, client, collection_id):
+        super().__init__(client, collection_id)
+
+    @property
+    def id(self):
+        return self._collection_id
+
+    def document(self, document_id=None):
+        return MemoryDocument(self._client, self._collection_id, document_id or uuid.uuid4().hex[:20])
+
+    def add(self, document_data, document_id=None):
+        ref = self.document(document_id)
+        ref.create(document_data)
+        return None, ref
+
+
+class MemoryWriteBatch:
+    """Writes applied atomically on commit() (max 500, like Firestore)"""
+
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(("set", reference, document_data, merge))
+
+    def create(self, reference, document_data):
+        self._writes.append(("create", reference, document_data, False))
+
+    def update(self, reference, field_updates):
+        self._writes.append(("update", reference, field_updates, False))
+
+    def delete(self, reference):
+        self._writes.append(("delete", reference, None, False))
+
+    def commit(self):
+        if len(self._writes) > MAX_BATCH_WRITES:
+            raise exceptions.InvalidArgument(f"maximum {MAX_BATCH_WRITES} writes allowed per request")
+        self._client._round_trip("commit")
+        writes, self._writes = self._writes, []
+        self._client._apply(writes)
+        return writes
+
+
+class MemoryBulkWriter(MemoryWriteBatch):
+    """Buffers writes and commits them in batches on flush()/close(); not atomic overall"""
+
+    def __init__(self, client):
+        super().__init__(client)
+        self._closed = False
+
+    def _add(self, write):
+        if self._closed:
+            raise ValueError("BulkWriter is closed")
+        self._writes.append(write)
+        if len(self._writes) >= MAX_BATCH_WRITES:
+            self.flush()
+
+    def set(self, reference, document_data, merge=False):
+        self._add(("set", reference, document_data, merge))
+
+    def create(self, reference, document_data):
+        self._add(("create", reference, document_data, False))
+
+    def update(self, reference, field_updates):
+        self._add(("update", reference, field_updates, False))
+
+    def delete(self, reference):
+        self._add(("delete", reference, None, False))
+
+    def flush(self):
+        writes, self._writes = self._writes, []
+        for start in range(0, len(writes), MAX_BATCH_WRITES):
+            self._client._round_trip("commit")
+            # Each write succeeds or fails on its own, like BulkWriter
+            for write in writes[start:start + MAX_BATCH_WRITES]:
+                try:
+                    self._client._apply([write])
+                except exceptions.GoogleAPICallError as e:
+                    logger.warning(f"⚠️ Bulk write to {write[1].path} failed: {e}")
+
+    def close(self):
+        self.flush()
+        self._closed = True
+
+
+class MemoryFirestore:
+    def __init__(self, latency=None, jitter=0.0, failure_rate=0.0, seed=None):
+        self._collections = {}
+        self._lock = threading.RLock()
+        self.latency = latency if isinstance(latency, dict) else {op: latency or 0.0 for op in OPS}
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self.round_trips = {op: 0 for op in OPS}
+
+    @classmethod
+    def from_env(cls):
+        client = cls(
+            latency=parse_latency(os.getenv("FIRESTORE_MEMORY_LATENCY_MS", "")),
+            jitter=float(os.getenv("FIRESTORE_MEMORY_JITTER", 0.0)),
+            failure_rate=float(os.getenv("FIRESTORE_MEMORY_FAILURE_RATE", 0.0)),
+        )
+        seed_path = os.getenv("FIRESTORE_MEMORY_SEED")
+        if seed_path:
+            client.load(seed_path)
+        return client
+
+    def collection(self, collection_id):
+        return MemoryCollection(self, collection_id)
+
+    def get_all(self, references, field_paths=None):
+        self._round_trip("read")
+        for ref in references:
+            yield self._snapshot(ref, field_paths)
+
+    def batch(self):
+        return MemoryWriteBatch(self)
+
+    def bulk_writer(self):
+        return MemoryBulkWriter(self)
+
+    # Fixtures
+
+    def load(self, path):
+        """Add documents from a JSON file shaped {collection: {doc_id: data}}"""
+        with open(path) as f:
+            collections = json.load(f)
+        with self._lock:
+            for collection_id, docs in collections.items():
+                self._collections.setdefault(collection_id, {}).update(docs)
+        logger.info(f"📦 Memory Firestore: loaded {sum(len(d) for d in collections.values())} documents from {path}")
+
+    def dump(self, path):
+        with self._lock:
+            collections = copy.deepcopy(self._collections)
+        with open(path, "w") as f:
+            json.dump(collections, f, default=str)
+
+    # Internals
+
+    def _round_trip(self, op):
+        """Simulated network cost and injected failures for one round trip"""
+        self.round_trips[op] += 1
+        delay = self.latency.get(op, 0.0)
+        if delay:
+            if self.jitter:
+                delay *= 1 + self._random.uniform(-self.jitter, self.jitter)
+            time.sleep(delay)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise exceptions.ServiceUnavailable(f"Injected failure ({op})")
+
+    def _items(self, collection_id):
+        with self._lock:
+            return sorted(self._collections.get(collection_id, {}).items())
+
+    def _snapshot(self, ref, field_paths):
+        ref = getattr(ref, "_target", ref)
+        with self._lock:
+            data = self._collections.get(ref._collection_id, {}).get(ref.id)
+            if data is not None and field_paths is not None:
+                data = {k: v for k, v in data.items() if k in field_paths}
+            data = copy.deepcopy(data)
+        return MemorySnapshot(ref, data)
+
+    def _apply(self, writes):
+        """Apply (kind, ref, data, merge) writes all-or-nothing"""
+        with self._lock:
+            for kind, ref, _, _ in writes:
+                ref = getattr(ref, "_target", ref)
+                exists = ref.id in self._collections.get(ref._collection_id, {})
+                if kind == "update" and not exists:
+                    raise exceptions.NotFound(f"No document to update: {ref.path}")
+                if kind == "create" and exists:
+                    raise exceptions.AlreadyExists(f"Document already exists: {ref.path}")
+            for kind, ref, data, merge in writes:
+                ref = getattr(ref, "_target", ref)
+                store = self._collections.setdefault(ref._collection_id, {})
+                if kind == "delete":
+                    store.pop(ref.id, None)
+                elif kind == "update" or (kind == "set" and merge and ref.id in store):
+                    store[ref.id].update(copy.deepcopy(data))
+                else:
+                    store[ref.id] = copy.deepcopy(data)
@@ -0,0 +1,288 @@
+"""
+In-process Prometheus-style metrics, served as text at /metrics.
+
+Counters and histograms live in this worker's memory. When METRICS_DIR is
+set (e.g. under gunicorn with several uvicorn workers), each worker also
+flushes a snapshot to METRICS_DIR/metrics-<pid>.json every
+METRICS_FLUSH_SECONDS, and /metrics sums the snapshots of all live workers,
+so any worker can answer a scrape for the whole server.
+
+MetricsMiddleware records request latency by route, and keeps a per-request
+scope so Firestore reads/writes (db observer) and eligibility evaluations are
+attributed to the route that caused them.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from services import timing
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", 5))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+# name -> (type, help, histogram buckets)
+DEFINITIONS = {
+    "fms_http_requests_total": ("counter", "HTTP requests by route and status", None),
+    "fms_http_request_duration_seconds": ("histogram", "HTTP request latency by route", LATENCY_BUCKETS),
+    "fms_request_stage_duration_seconds": ("histogram", "Time per request stage (sampled requests)", LATENCY_BUCKETS),
+    "fms_firestore_calls_total": ("counter", "Firestore round trips by kind, collection and route", None),
+    "fms_firestore_documents_total": ("counter", "Firestore documents read/written by collection and route", None),
+    "fms_token_verify_duration_seconds": ("histogram", "Firebase ID token verification latency", LATENCY_BUCKETS),
+    "fms_token_verifications_total": ("counter", "Token verifications by result", None),
+    "fms_cache_requests_total": ("counter", "Cache lookups by cache and result (hit/miss)", None),
+    "fms_eligibility_evaluations_total": ("counter", "Profile x scholarship evaluations by route", None),
+    "fms_eligibility_evaluations_per_request": ("histogram", "Evaluations per request by route", COUNT_BUCKETS),
+    "fms_emails_total": ("counter", "Email send attempts by outcome", None),
+}
+
+NO_ROUTE = "-"
+
+
+class _RequestScope:
+    __slots__ = ("scope", "evaluations")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.evaluations = 0
+
+    @property
+    def route(self):
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+
+_request = ContextVar("metrics_request", default=None)
+
+
+def current_route():
+    request = _request.get()
+    return request.route if request is not None else NO_ROUTE
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, labels=None, value=1):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=None):
+        buckets = DEFINITIONS[name][2]
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [0] * (len(buckets) + 3)  # buckets, +Inf, count, sum
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    hist[i] += 1
+                    break
+            else:
+                hist[len(buckets)] += 1
+            hist[-2] += 1
+            hist[-1] += value
+
+    def evaluations(self, n=1):
+        """Count eligibility evaluations against the current request"""
+        request = _request.get()
+        if request is not None:
+            request.evaluations += n
+        else:
+            self.inc("fms_eligibility_evaluations_total", {"route": NO_ROUTE}, n)
+
+    def snapshot(self):
+        """JSON-serializable copy of this worker's metrics (incl. stage timings)"""
+        with self._lock:
+            counters = [[name, list(labels), value] for (name, labels), value in self._counters.items()]
+            histograms = [[name, list(labels), list(hist)] for (name, labels), hist in self._histograms.items()]
+
+        # Stage histograms kept by services.timing, converted to seconds
+        for stage, hist in timing.histograms.snapshot().items():
+            cells = [0] * (len(LATENCY_BUCKETS) + 3)
+            previous = 0
+            for bound_ms, cumulative in hist["buckets"]:
+                seconds = bound_ms / 1000
+                index = next((i for i, b in enumerate(LATENCY_BUCKETS) if seconds <= b), len(LATENCY_BUCKETS))
+                cells[index] += cumulative - previous
+                previous = cumulative
+            cells[-2] = hist["count"]
+            cells[-1] = hist["sum_ms"] / 1000
+            histograms.append(["fms_request_stage_duration_seconds", [["stage", stage]], cells])
+
+        return {"pid": os.getpid(), "counters": counters, "histograms": histograms}
+
+    def render(self):
+        """Prometheus text exposition of all live workers' metrics"""
+        snapshots = [self.snapshot()]
+        if METRICS_DIR:
+            self.flush(snapshots[0])
+            snapshots.extend(_read_worker_snapshots(exclude_pid=os.getpid()))
+        return _render(_merge(snapshots))
+
+    # Multi-worker support
+
+    def flush(self, snapshot=None):
+        if not METRICS_DIR:
+            return
+        snapshot = snapshot or self.snapshot()
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f"metrics-{snapshot['pid']}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp, path)
+
+    def start_flusher(self):
+        if not METRICS_DIR:
+            return
+
+        def run():
+            while True:
+                time.sleep(METRICS_FLUSH_SECONDS)
+                try:
+                    self.flush()
+                except OSError as e:
+                    logger.warning(f"⚠️ Metrics flush failed: {e}")
+
+        threading.Thread(target=run, name="metrics-flush", daemon=True).start()
+        logger.info(f"📊 Metrics: flushing to {METRICS_DIR} every {METRICS_FLUSH_SECONDS:.0f}s")
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _read_worker_snapshots(exclude_pid):
+    snapshots = []
+    for name in os.listdir(METRICS_DIR):
+        if not (name.startswith("metrics-") and name.endswith(".json")):
+            continue
+        path = os.path.join(METRICS_DIR, name)
+        try:
+            pid = int(name[len("metrics-"):-len(".json")])
+        except ValueError:
+            continue
+        if pid == exclude_pid:
+            continue
+        if not _alive(pid):
+            # Worker is gone; its counters go with it (Prometheus treats this as a reset)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(snapshots):
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, cells in snapshot["histograms"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            merged = histograms.get(key)
+            histograms[key] = list(cells) if merged is None else [a + b for a, b in zip(merged, cells)]
+    return counters, histograms
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _render(merged):
+    counters, histograms = merged
+    lines = []
+    for name, (kind, help_text, buckets) in DEFINITIONS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "counter":
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+        else:
+            for (metric, labels), cells in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + ("+Inf",), cells):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cells[-2]}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {cells[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def firestore_observer(call):
+    """db observer: Firestore round trips and documents by collection and route"""
+    labels = {"kind": call.kind, "collection": call.collection or "unknown", "route": current_route()}
+    metrics.inc("fms_firestore_calls_total", labels)
+    metrics.inc("fms_firestore_documents_total", labels, call.docs)
+
+
+class MetricsMiddleware:
+    """ASGI middleware: request count/latency by route, per-request attribution scope"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = _RequestScope(scope)
+        token = _request.set(request)
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request.reset(token)
+            route = request.route
+            metrics.inc("fms_http_requests_total", {"method": scope["method"], "route": route, "status": str(status[0])})
+            metrics.observe("fms_http_request_duration_seconds", time.perf_counter() - started, {"method": scope["method"], "route": route})
+            if request.evaluations:
+                metrics.inc("fms_eligibility_evaluations_total", {"route": route}, request.evaluations)
+                metrics.observe("fms_eligibility_evaluations_per_request", request.evaluations, {"route": route})
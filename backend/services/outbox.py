@@ -0,0 +1,242 @@
+"""
+Durable email outbox.
+
+Enqueue is a single SQLite insert, so request latency never depends on SMTP.
+A small pool of worker threads drains due messages, retrying failures with
+exponential backoff; after OUTBOX_MAX_ATTEMPTS a message is moved to 'dead'.
+Rows are claimed with a lease, so several processes can share one outbox file
+and a message held by a crashed worker is picked up again when the lease ends.
+
+The file is opened on first use, not at import. Processes without workers
+(the jobs, cron) deliver what they queued with drain(), or:
+
+    python -m services.outbox --drain
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from services.email_service import send_email
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "outbox.db"))
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", 2))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 6))
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE_SECONDS", 30))
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", 3600))
+OUTBOX_LEASE_SECONDS = 300
+OUTBOX_POLL_SECONDS = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dedup_key TEXT UNIQUE,
+    to_email TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+def dedup_key(uid, scholarship_id, kind, scope=None):
+    """
+    One message per (user, scholarship, kind[, scope]). Scope it to what the
+    message is about, e.g. the reminder's createdAt for a subscribe
+    confirmation, so a later resubscribe is confirmed again.
+    """
+    key = f"{uid}:{scholarship_id}:{kind}"
+    return f"{key}:{scope}" if scope else key
+
+
+class Outbox:
+    def __init__(self, path=OUTBOX_PATH, workers=OUTBOX_WORKERS, sender=send_email):
+        self.path = path
+        self.workers = workers
+        self.sender = sender
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _connect(self):
+        """This thread's connection, opening the file (and creating the table) on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, to_email, subject, body, dedup_key=None):
+        """Queue a message. Returns False if a message with this dedup_key already exists."""
+        now = time.time()
+        cur = self._connect().execute(
+            "INSERT OR IGNORE INTO outbox (dedup_key, to_email, subject, body, next_attempt_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (dedup_key, to_email, subject, body, now, now, now),
+        )
+        queued = cur.rowcount == 1
+        if queued:
+            self._wake.set()
+        else:
+            logger.info(f"📭 Outbox: skipped duplicate message {dedup_key}")
+        return queued
+
+    def enqueue_many(self, messages):
+        """
+        Queue (to_email, subject, body, dedup_key) tuples in one transaction.
+        Returns how many were queued (duplicates are skipped).
+        """
+        now = time.time()
+        conn = self._connect()
+        before = conn.total_changes
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR IGNORE INTO outbox (dedup_key, to_email, subject, body, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(key, to, subject, body, now, now, now) for to, subject, body, key in messages],
+            )
+        queued = conn.total_changes - before
+        if queued:
+            self._wake.set()
+        return queued
+
+    def stats(self):
+        rows = self._connect().execute("SELECT status, COUNT(*) AS n FROM outbox GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def drain(self):
+        """
+        Deliver every due message in the calling thread, for processes that
+        exit right after queueing. Messages that fail are rescheduled with
+        backoff as usual and left for a later drain or the workers.
+        Returns {"delivered": n, "failed": n}.
+        """
+        delivered = failed = 0
+        while True:
+            message = self._claim()
+            if message is None:
+                break
+            if self._deliver(message):
+                delivered += 1
+            else:
+                failed += 1
+        if delivered or failed:
+            logger.info(f"📮 Outbox drained: {delivered} delivered, {failed} failed")
+        return {"delivered": delivered, "failed": failed}
+
+    # Worker side
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"outbox-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"📮 Outbox started with {self.workers} workers ({self.path})")
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                message = self._claim()
+            except sqlite3.OperationalError as e:
+                logger.warning(f"⚠️ Outbox claim failed: {e}")
+                message = None
+
+            if message is None:
+                self._wake.wait(OUTBOX_POLL_SECONDS)
+                self._wake.clear()
+                continue
+
+            self._deliver(message)
+
+    def _claim(self):
+        """Atomically lease the next due message (pending, or sending with an expired lease)"""
+        now = time.time()
+        return self._connect().execute(
+            "UPDATE outbox SET status = 'sending', next_attempt_at = ?, updated_at = ? "
+            "WHERE id = (SELECT id FROM outbox "
+            "            WHERE status IN ('pending', 'sending') AND next_attempt_at <= ? "
+            "            ORDER BY next_attempt_at LIMIT 1) "
+            "RETURNING id, to_email, subject, body, attempts",
+            (now + OUTBOX_LEASE_SECONDS, now, now),
+        ).fetchone()
+
+    def _deliver(self, message):
+        """Send one claimed message and record the outcome; True if it was sent"""
+        try:
+            result = self.sender(message["to_email"], message["subject"], message["body"])
+            error = result.get("error") if result.get("status") == "error" else None
+        except Exception as e:
+            error = str(e)
+
+        now = time.time()
+        conn = self._connect()
+        if error is None:
+            conn.execute(
+                "UPDATE outbox SET status = 'sent', attempts = attempts + 1, last_error = NULL, updated_at = ? WHERE id = ?",
+                (now, message["id"]),
+            )
+            return True
+
+        attempts = message["attempts"] + 1
+        if attempts >= OUTBOX_MAX_ATTEMPTS:
+            conn.execute(
+                "UPDATE outbox SET status = 'dead', attempts = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (attempts, error, now, message["id"]),
+            )
+            logger.error(f"💀 Outbox: giving up on message {message['id']} to {message['to_email']} after {attempts} attempts: {error}")
+            return False
+
+        delay = min(OUTBOX_BACKOFF_BASE * (2 ** (attempts - 1)), OUTBOX_BACKOFF_MAX)
+        delay *= random.uniform(0.8, 1.2)
+        conn.execute(
+            "UPDATE outbox SET status = 'pending', attempts = ?, last_error = ?, next_attempt_at = ?, updated_at = ? WHERE id = ?",
+            (attempts, error, now + delay, now, message["id"]),
+        )
+        logger.warning(f"⚠️ Outbox: message {message['id']} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}")
+        return False
+
+
+# Shared outbox; the file is opened on first use
+outbox = Outbox()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliver or inspect queued emails")
+    parser.add_argument("--drain", action="store_true", help="Send every due message, then exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    summary = outbox.drain() if args.drain else {}
+    print(json.dumps({**summary, "outbox": outbox.stats()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Columnar snapshot of the `profiles` collection for matching one ruleset
+against every user at once.
+
+Each profile field used by a ruleset becomes a column:
+- string fields are dictionary-encoded (one int code per profile plus the
+  distinct lower-cased values), so ==/IN/ANY conditions are evaluated once per
+  distinct value and broadcast with a lookup, not once per user;
+- numeric comparisons (<=, >=) run on a float64 column (NaN where the value
+  isn't a number).
+
+`evaluate()` reproduces services.eligibility_engine.evaluate_conditions
+exactly (match ratio + bonus + name jitter, capped at 0.99, eligible at 0.33).
+"""
+import hashlib
+import logging
+import time
+
+import numpy as np
+
+from repositories import store
+
+logger = logging.getLogger(__name__)
+
+BONUS = 0.05
+
+
+def round_scores(scores):
+    """round(score, 2) like the engine (Python rounding), once per distinct score"""
+    distinct, inverse = np.unique(scores, return_inverse=True)
+    return np.array([round(s, 2) for s in distinct.tolist()])[inverse].reshape(scores.shape)
+
+
+class _Column:
+    def __init__(self, values):
+        vocab = {}
+        codes = np.empty(len(values), dtype=np.int32)
+        numbers = np.empty(len(values), dtype=np.float64)
+        truthy = np.empty(len(values), dtype=bool)
+        for i, value in enumerate(values):
+            codes[i] = vocab.setdefault(str(value).lower(), len(vocab))
+            try:
+                numbers[i] = float(value)
+            except (ValueError, TypeError):
+                numbers[i] = np.nan
+            truthy[i] = bool(value)
+        self.vocab = list(vocab)
+        self.codes = codes
+        self.numbers = numbers
+        self.truthy = truthy
+
+    def match(self, predicate):
+        """Apply predicate(lower-cased value) per distinct value, broadcast to all profiles"""
+        lookup = np.fromiter((predicate(v) for v in self.vocab), dtype=bool, count=len(self.vocab))
+        return lookup[self.codes]
+
+
+class ProfileMatrix:
+    def __init__(self, uids, rows):
+        self.uids = list(uids)
+        self.rows = rows
+        self._columns = {}
+        self._jitter = {}
+        names = [str(row.get("name", "")) for row in rows]
+        self._names = sorted(set(names))
+        index = {name: i for i, name in enumerate(self._names)}
+        self._name_codes = np.fromiter((index[n] for n in names), dtype=np.int32, count=len(names))
+
+    def __len__(self):
+        return len(self.uids)
+
+    @classmethod
+    def load(cls, fields):
+        """Snapshot of all profiles, projected to `fields` (plus name)"""
+        started = time.perf_counter()
+        field_paths = sorted(set(fields) | {"name"})
+        uids, rows = [], []
+        for uid, data in store.profiles.all(field_paths):
+            uids.append(uid)
+            rows.append(data or {})
+        logger.info(f"👥 Loaded {len(uids)} profiles ({len(field_paths)} fields) in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return cls(uids, rows)
+
+    def column(self, field):
+        col = self._columns.get(field)
+        if col is None:
+            col = self._columns[field] = _Column([row.get(field) for row in self.rows])
+        return col
+
+    def jitter(self, n_reasons):
+        """Per-profile jitter; the engine seeds it with name + number of reasons"""
+        values = self._jitter.get(n_reasons)
+        if values is None:
+            per_name = np.fromiter(
+                (int(hashlib.sha256((name + str(n_reasons)).encode("utf-8")).hexdigest(), 16) % 100 / 2000.0
+                 for name in self._names),
+                dtype=np.float64, count=len(self._names),
+            )
+            values = self._jitter[n_reasons] = per_name[self._name_codes]
+        return values
+
+    def evaluate(self, conditions):
+        """
+        (eligible bool array, score float array) for every profile, with the
+        same result evaluate_conditions(profile, conditions) gives per profile.
+        Scores are unrounded; round(score, 2) matches the engine.
+        """
+        n = len(self.uids)
+        total = len(conditions)
+        if total == 0:
+            return np.ones(n, dtype=bool), np.ones(n, dtype=np.float64)
+
+        matched = np.zeros(n, dtype=np.int32)
+        bonus = np.zeros(n, dtype=np.float64)
+        n_reasons = 0
+
+        for cond in conditions:
+            if isinstance(cond, dict):
+                field, operator, value = cond.get("field"), cond.get("operator"), cond.get("value")
+            else:
+                field, operator, value = cond.field, cond.operator, cond.value
+            if not field or not operator:
+                continue
+            # Every evaluated condition adds one reason (met or not)
+            n_reasons += 1
+            col = self.column(field)
+
+            if operator in ("<=", ">="):
+                try:
+                    limit = float(value)
+                except (ValueError, TypeError):
+                    continue
+                numbers = col.numbers
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    if operator == "<=":
+                        hit = numbers <= limit
+                        extra = hit & ((limit - numbers) / limit > 0.5) if limit > 0 else None
+                    else:
+                        hit = numbers >= limit
+                        extra = hit & ((numbers - limit) / limit > 0.2) if limit > 0 else None
+                if extra is not None:
+                    bonus[extra] += BONUS
+            elif operator == "==" or (operator == "IN" and not isinstance(value, list)):
+                target = str(value).lower()
+                hit = col.match(lambda v: v == target)
+            elif operator == "IN":
+                allowed = {str(v).lower().strip() for v in value}
+                hit = col.match(lambda v: v.strip() in allowed)
+            elif operator == "ANY":
+                hit = col.truthy
+            else:
+                continue
+
+            matched += hit
+
+        scores = matched / total + bonus + self.jitter(n_reasons)
+        np.minimum(scores, 0.99, out=scores)
+        return scores >= 0.33, scores
@@ -0,0 +1,190 @@
+"""
+Per-request stage timing.
+
+TimingMiddleware starts a RequestTiming for every HTTP request (kept in a
+contextvar, so it follows the request into threadpool routes). Code marks
+stages with `with stage("name"):` or `@timed("name")`; Firestore round trips
+are added through a db observer (firestore_observer). Sampled requests get a
+Server-Timing header and feed the per-stage histograms.
+
+Only a TIMING_SAMPLE_RATE fraction of requests is sampled (1% by default;
+set it to 1 to profile every request). For the rest,
+stage()/timed() are a contextvar lookup and a no-op, while elapsed_ms() still
+reports the request's processing time.
+"""
+import functools
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+TIMING_SAMPLE_RATE = float(os.getenv("TIMING_SAMPLE_RATE", 0.01))
+
+# Histogram bucket upper bounds, in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_current = ContextVar("request_timing", default=None)
+
+
+class RequestTiming:
+    __slots__ = ("started", "sampled", "stages")
+
+    def __init__(self, sampled):
+        self.started = time.perf_counter()
+        self.sampled = sampled
+        self.stages = {}
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def header(self):
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        parts.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(parts)
+
+
+class _Stage:
+    __slots__ = ("timing", "name", "started")
+
+    def __init__(self, timing, name):
+        self.timing = timing
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timing.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def current():
+    """The RequestTiming for this request, or None outside a request"""
+    return _current.get()
+
+
+def stage(name):
+    """Context manager timing a block as `name` (no-op unless the request is sampled)"""
+    timing = _current.get()
+    if timing is None or not timing.sampled:
+        return _NO_STAGE
+    return _Stage(timing, name)
+
+
+def timed(name):
+    """Decorator timing every call of a sync function as stage `name`"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timing = _current.get()
+            if timing is None or not timing.sampled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timing.add(name, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def elapsed_ms():
+    """Milliseconds since the current request started, or None outside a request"""
+    timing = _current.get()
+    return round(timing.elapsed_ms(), 1) if timing is not None else None
+
+
+def firestore_observer(call):
+    """db observer: adds Firestore round-trip time to the 'firestore' stage"""
+    timing = _current.get()
+    if timing is not None and timing.sampled:
+        timing.add("firestore", call.seconds)
+
+
+class StageHistograms:
+    """Cumulative per-stage latency histograms over sampled requests"""
+
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def observe(self, name, ms):
+        with self._lock:
+            hist = self._stages.get(name)
+            if hist is None:
+                hist = self._stages[name] = {"counts": [0] * (len(self.buckets) + 1), "count": 0, "sum": 0.0}
+            for i, bound in enumerate(self.buckets):
+                if ms <= bound:
+                    break
+            else:
+                i = len(self.buckets)
+            hist["counts"][i] += 1
+            hist["count"] += 1
+            hist["sum"] += ms
+
+    def snapshot(self):
+        """{stage: {"buckets": [(le, cumulative count), ...], "count": n, "sum_ms": total}}"""
+        with self._lock:
+            result = {}
+            for name, hist in self._stages.items():
+                cumulative, running = [], 0
+                for bound, count in zip(self.buckets + (float("inf"),), hist["counts"]):
+                    running += count
+                    cumulative.append((bound, running))
+                result[name] = {"buckets": cumulative, "count": hist["count"], "sum_ms": hist["sum"]}
+            return result
+
+
+histograms = StageHistograms()
+
+
+class TimingMiddleware:
+    """ASGI middleware: one RequestTiming per HTTP request, Server-Timing on sampled ones"""
+
+    def __init__(self, app, sample_rate=TIMING_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rate = self.sample_rate
+        timing = RequestTiming(sampled=rate >= 1 or (rate > 0 and random.random() < rate))
+        token = _current.set(timing)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.header().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing if timing.sampled else send)
+        finally:
+            _current.reset(token)
+            if timing.sampled:
+                for name, seconds in timing.stages.items():
+                    histograms.observe(name, seconds * 1000)
+                histograms.observe("total", timing.elapsed_ms())
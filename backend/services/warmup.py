@@ -0,0 +1,103 @@
+"""
+Startup warm-up and readiness.
+
+On startup the storage client is built and the catalog cache preloaded on a
+background thread, so the server accepts connections right away and the
+first /scholarships/eligible doesn't pay for either. /health/ready answers
+503 until every warm-up step has succeeded (failed steps are retried every
+WARMUP_RETRY_SECONDS); /health/live only says the process is up.
+
+With STARTUP_WARMUP=0 nothing is preloaded and the app is ready at once.
+"""
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1") == "1"
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", 10))
+
+
+def _connect_storage():
+    """
+    Build the storage client. The in-memory store only counts as ready when it
+    was asked for (FIRESTORE_BACKEND=memory): get_firestore_client falls back
+    to it when credentials fail, which would serve an empty catalog and drop
+    every write. That client is discarded so the next retry connects again.
+    """
+    from repositories import STORAGE_BACKEND
+    from services.firestore import FIRESTORE_BACKEND, db
+    from services.memory_firestore import MemoryFirestore
+
+    if STORAGE_BACKEND != "firestore":
+        return STORAGE_BACKEND
+    if isinstance(db.client, MemoryFirestore) and FIRESTORE_BACKEND != "memory":
+        db.disconnect()
+        raise RuntimeError("Firestore is unavailable (fell back to the in-memory store); check credentials")
+    return type(db.client).__name__
+
+
+def _load_catalog():
+    from services.catalog import catalog
+
+    scholarships = catalog.get()
+    return "pushdown" if catalog.pushdown else f"{len(scholarships)} scholarships from {catalog.source or 'snapshot'}"
+
+
+# (name, callable returning a short detail string), run in order
+STEPS = (("storage", _connect_storage), ("catalog", _load_catalog))
+
+
+class Readiness:
+    def __init__(self, steps=STEPS):
+        self.steps = steps
+        self._lock = threading.Lock()
+        self._checks = {name: {"ok": False, "detail": "pending"} for name, _ in steps}
+        self._thread = None
+
+    @property
+    def ready(self):
+        with self._lock:
+            return all(check["ok"] for check in self._checks.values())
+
+    def snapshot(self):
+        with self._lock:
+            checks = {name: dict(check) for name, check in self._checks.items()}
+        return {"status": "ready" if all(c["ok"] for c in checks.values()) else "starting", "checks": checks}
+
+    def _set(self, name, ok, detail, ms=None):
+        with self._lock:
+            self._checks[name] = {"ok": ok, "detail": detail}
+            if ms is not None:
+                self._checks[name]["ms"] = round(ms, 1)
+
+    def start(self, enabled=STARTUP_WARMUP):
+        """Run the warm-up steps on a daemon thread (or mark everything ready if disabled)"""
+        if not enabled:
+            for name, _ in self.steps:
+                self._set(name, True, "skipped (STARTUP_WARMUP=0)")
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        started = time.perf_counter()
+        for name, step in self.steps:
+            while True:
+                step_started = time.perf_counter()
+                try:
+                    detail = step()
+                except Exception as e:
+                    self._set(name, False, f"error: {e}")
+                    logger.warning(f"⚠️ Warm-up step '{name}' failed, retrying in {WARMUP_RETRY_SECONDS:.0f}s: {e}")
+                    time.sleep(WARMUP_RETRY_SECONDS)
+                    continue
+                self._set(name, True, detail, (time.perf_counter() - step_started) * 1000)
+                break
+        logger.info(f"🔥 Warm-up complete in {(time.perf_counter() - started) * 1000:.0f}ms; ready for traffic")
+
+
+readiness = Readiness()
@@ -0,0 +1,69 @@
+"""
+Shared fixtures. Tests run from backend/ against the in-memory Firestore
+(services/memory_firestore.py), so no credentials or emulator are needed.
+"""
+import os
+import smtplib
+import socket
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("FIRESTORE_BACKEND", "memory")
+os.environ.setdefault("STARTUP_WARMUP", "0")
+os.environ.setdefault("OUTBOX_PATH", os.path.join(tempfile.mkdtemp(prefix="fms-tests-"), "outbox.db"))
+
+import pytest  # noqa: E402
+
+from services.email_service import SMTPMailer  # noqa: E402
+from services.firestore import db  # noqa: E402
+from services.memory_firestore import MemoryFirestore  # noqa: E402
+
+
+@pytest.fixture
+def memory_db():
+    """A fresh, empty MemoryFirestore behind the shared `db` client"""
+    client = MemoryFirestore()
+    previous = db.use_client(client)
+    yield client
+    if previous is not None:
+        db.use_client(previous)
+
+
+class PlainMailer(SMTPMailer):
+    """SMTPMailer for the local test server: no STARTTLS or login"""
+
+    def __init__(self, port, **kwargs):
+        super().__init__(host="127.0.0.1", port=port, user="noreply@fundmystudy.test", password="unused", **kwargs)
+
+    def _connect(self):
+        return smtplib.SMTP(self.host, self.port, timeout=5)
+
+
+class _Inbox:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    """A local aiosmtpd server; .port to connect, .inbox.messages for what it received"""
+    from aiosmtpd.controller import Controller
+
+    controller = Controller(_Inbox(), hostname="127.0.0.1", port=free_port())
+    controller.start()
+    controller.inbox = controller.handler
+    yield controller
+    controller.stop()
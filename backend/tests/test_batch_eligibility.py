@@ -0,0 +1,66 @@
+import asyncio
+import json
+import sys
+
+import pytest
+
+import routes.scholarships as scholarships_route
+from benchmarks.synthetic import make_profiles, make_scholarships, seed_store
+from services.catalog import CatalogCache
+
+
+@pytest.fixture
+def seeded(memory_db, monkeypatch):
+    profiles = make_profiles(60)
+    seed_store(memory_db, make_scholarships(120), profiles)
+    monkeypatch.setattr(scholarships_route, "catalog", CatalogCache(snapshot_path=None, bundle_path=None))
+    return profiles
+
+
+def _slots_free():
+    return scholarships_route._batch_slots._value == scholarships_route.BATCH_CONCURRENCY
+
+
+async def _run(response, disconnect=False):
+    """Serve a StreamingResponse over ASGI; returns the body it sent"""
+    sent = []
+
+    async def receive():
+        if not disconnect:
+            await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message.get("body", b""))
+
+    await response({"type": "http"}, receive, send)
+    return b"".join(sent)
+
+
+def test_batch_matches_eligible(seeded):
+    limit = 10
+    profiles = [{**p, "id": p["userId"]} for p in seeded]
+    response = scholarships_route.get_eligible_scholarships_batch({"profiles": profiles}, uid="teacher", limit=limit)
+    lines = [json.loads(line) for line in asyncio.run(_run(response)).decode().splitlines()]
+    assert [line["id"] for line in lines] == [p["userId"] for p in seeded]
+    assert _slots_free()
+
+    for profile, line in zip(seeded[:10], lines):
+        eligible = asyncio.run(scholarships_route.get_eligible_scholarships(uid=profile["userId"], limit=limit, offset=0))
+        assert line["total_eligible"] == eligible["total_eligible"]
+        assert [(s["scholarshipId"], s["score"]) for s in line["scholarships"]] == \
+            [(s["scholarshipId"], s["score"]) for s in eligible["scholarships"]]
+
+
+def test_slot_released_when_client_disconnects_before_body(seeded):
+    response = scholarships_route.get_eligible_scholarships_batch({"profiles": seeded}, uid="teacher", limit=10)
+    assert not _slots_free()
+    asyncio.run(_run(response, disconnect=True))
+    assert _slots_free()
+
+
+def test_slot_released_when_setup_fails(seeded, monkeypatch):
+    monkeypatch.setitem(sys.modules, "jobs.recompute_matches", None)
+    with pytest.raises(ImportError):
+        scholarships_route.get_eligible_scholarships_batch({"profiles": seeded}, uid="teacher", limit=10)
+    assert _slots_free()
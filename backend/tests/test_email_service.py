@@ -0,0 +1,71 @@
+import smtplib
+import threading
+import time
+
+from tests.conftest import PlainMailer
+
+
+class _DeadConnection:
+    """A pooled connection the server has dropped; fails once the test lets it"""
+
+    def __init__(self, release):
+        self.release = release
+
+    def rset(self):
+        self.release.wait(5)
+        raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+
+    def close(self):
+        pass
+
+
+class _FlakyMailer(PlainMailer):
+    def __init__(self, port, **kwargs):
+        super().__init__(port, **kwargs)
+        self.failing_connects = 0
+
+    def _connect(self):
+        if self.failing_connects:
+            self.failing_connects -= 1
+            raise ConnectionRefusedError("Connection refused")
+        return super()._connect()
+
+
+def test_pool_reuses_connections(smtp_server):
+    mailer = PlainMailer(smtp_server.port, pool_size=2)
+    results = mailer.send_many([(f"user{i}@example.com", "Subject", "Body") for i in range(6)])
+    assert [r["status"] for r in results] == ["sent"] * 6
+    assert mailer._open <= 2
+    mailer.close()
+    assert mailer._open == 0
+    assert len(smtp_server.inbox.messages) == 6
+
+
+def test_waiter_opens_a_connection_when_holder_fails_to_reconnect(smtp_server):
+    mailer = _FlakyMailer(smtp_server.port, pool_size=1)
+    release = threading.Event()
+    # The only pooled connection is dead, and the next reconnect is refused
+    mailer._idle.append(_DeadConnection(release))
+    mailer._open = 1
+    mailer.failing_connects = 1
+
+    results = {}
+
+    def send(name):
+        results[name] = mailer.send(f"{name}@example.com", "Subject", "Body")["status"]
+
+    holder = threading.Thread(target=send, args=("holder",), daemon=True)
+    waiter = threading.Thread(target=send, args=("waiter",), daemon=True)
+    holder.start()
+    time.sleep(0.2)
+    waiter.start()
+    # Let the waiter block on the full pool before the holder discards its connection
+    time.sleep(0.2)
+    release.set()
+
+    holder.join(10)
+    waiter.join(10)
+    assert not holder.is_alive() and not waiter.is_alive(), "a sender is stuck waiting for a connection"
+    assert "sent" in results.values()
+    assert mailer._open <= 1
+    mailer.close()
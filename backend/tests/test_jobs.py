@@ -0,0 +1,156 @@
+"""
+The reminder, digest and alert jobs (and the reminders listing they share
+data with) run through `store`, so they must behave the same on
+STORAGE_BACKEND=firestore (the in-memory Firestore here) and
+STORAGE_BACKEND=sqlite.
+"""
+from datetime import datetime
+
+import pytest
+
+import jobs.daily_digest as daily_digest
+import jobs.new_scholarship_alerts as new_scholarship_alerts
+import jobs.reminder_dispatcher as reminder_dispatcher
+import routes.reminders as reminders_route
+import services.profile_matrix as profile_matrix
+from benchmarks.synthetic import make_profiles, make_scholarships
+from repositories.firestore import FirestoreStore
+from repositories.sqlite import SQLiteStore
+from routes.reminders import build_reminder
+from services.catalog import CatalogCache
+from services.outbox import Outbox
+from utils.normalizer import normalize
+
+NOW = datetime(2026, 3, 1, 12, 0)
+DEADLINES = {"soon": "2026-03-05", "passed": "2026-02-20", "later": "2026-06-01"}
+
+
+class _Mailer:
+    def __init__(self):
+        self.sent = []
+
+    def send_many(self, messages):
+        self.sent.extend(messages)
+        return [{"status": "sent"} for _ in messages]
+
+
+@pytest.fixture(params=["firestore", "sqlite"])
+def store(request, tmp_path, monkeypatch):
+    if request.param == "firestore":
+        request.getfixturevalue("memory_db")
+        backend = FirestoreStore()
+    else:
+        backend = SQLiteStore(str(tmp_path / "fundmystudy.db"))
+    for module in (reminder_dispatcher, daily_digest, new_scholarship_alerts, profile_matrix, reminders_route):
+        monkeypatch.setattr(module, "store", backend)
+    monkeypatch.setattr("services.catalog.store", backend)
+    return backend
+
+
+@pytest.fixture
+def mailer(monkeypatch):
+    fake = _Mailer()
+    monkeypatch.setattr(reminder_dispatcher, "mailer", fake)
+    monkeypatch.setattr(daily_digest, "mailer", fake)
+    return fake
+
+
+def _seed_reminders(store):
+    profiles = {
+        "instant_user": {"name": "Asha", "email": "asha@example.com"},
+        "other_user": {"name": "Ravi", "email": "ravi@example.com", "reminder_mode": "instant"},
+        "digest_user": {"name": "Meera", "email": "meera@example.com", "reminder_mode": "digest"},
+    }
+    for uid, data in profiles.items():
+        store.profiles.save(uid, data)
+
+    reminders = {}
+    for uid, profile in profiles.items():
+        for label, deadline in DEADLINES.items():
+            reminders[f"{uid}_{label}"] = build_reminder(uid, profile["email"], label, {"name": label, "deadline": deadline})
+    store.reminders.save_many(reminders)
+
+
+def _statuses(store, uid):
+    return {
+        reminder_id.split("_")[-1]: data["status"]
+        for reminder_id, data in store.reminders.list_for_user(uid, 10, fields=["status"])
+    }
+
+
+def test_dispatch_then_digest(store, mailer, monkeypatch):
+    _seed_reminders(store)
+
+    # page_size=1 walks the (notify_at, id) cursor one reminder at a time
+    summary = reminder_dispatcher.dispatch(now=NOW, page_size=1)
+    assert summary["due"] == 3 and summary["users"] == 2 and summary["expired"] == 3
+    assert summary["digest_users_deferred"] == 1
+    assert sorted(to for to, _, _ in mailer.sent) == ["asha@example.com", "ravi@example.com"]
+    assert _statuses(store, "instant_user") == {"soon": "notified", "passed": "expired", "later": "active"}
+    assert _statuses(store, "digest_user") == {"soon": "active", "passed": "expired", "later": "active"}
+
+    # Nothing is sent twice
+    assert reminder_dispatcher.dispatch(now=NOW)["due"] == 1
+
+    mailer.sent.clear()
+    monkeypatch.setattr(daily_digest, "catalog", CatalogCache(snapshot_path=None, bundle_path=None))
+    summary = daily_digest.run_digest(now=NOW)
+    assert summary["emails_sent"] == 1
+    assert [to for to, _, _ in mailer.sent] == ["meera@example.com"]
+    assert _statuses(store, "digest_user")["soon"] == "notified"
+    assert store.profiles.get("digest_user")["last_digest_on"] == NOW.date().isoformat()
+    assert daily_digest.run_digest(now=NOW)["users"] == 0
+
+
+def test_digest_expires_passed_deadlines_instead_of_listing_them(store, mailer, monkeypatch):
+    _seed_reminders(store)
+    monkeypatch.setattr(daily_digest, "catalog", CatalogCache(snapshot_path=None, bundle_path=None))
+
+    summary = daily_digest.run_digest(now=NOW)
+    assert summary["emails_sent"] == 1 and summary["expired"] == 1
+    [(to, _, body)] = mailer.sent
+    assert to == "meera@example.com" and "soon" in body and "passed" not in body
+    assert _statuses(store, "digest_user") == {"soon": "notified", "passed": "expired", "later": "active"}
+
+
+def test_reminders_without_email_are_skipped_once(store, mailer):
+    store.profiles.save("no_email_user", {"name": "Kiran"})
+    store.reminders.save("no_email_user_soon", build_reminder("no_email_user", None, "soon", {"name": "soon", "deadline": DEADLINES["soon"]}))
+
+    summary = reminder_dispatcher.dispatch(now=NOW)
+    assert summary["skipped"] == 1 and summary["users"] == 0 and not mailer.sent
+    assert _statuses(store, "no_email_user") == {"soon": "skipped"}
+    assert reminder_dispatcher.dispatch(now=NOW)["due"] == 0
+
+
+def test_reminders_list_by_date_across_deadline_formats(store):
+    deadlines = {"d": "2026-04-01", "b": "15-03-2026", "c": "20/03/2026", "e": "31 March 2026", "a": "10-03-2026"}
+    store.reminders.save_many({
+        f"reader_{label}": build_reminder("reader", "reader@example.com", label, {"name": label, "deadline": deadline})
+        for label, deadline in deadlines.items()
+    })
+
+    # limit=2 walks the (notify_at, id) cursor across pages
+    seen, cursor = [], None
+    while True:
+        page = reminders_route.get_my_reminders(uid="reader", limit=2, cursor=cursor, active_only=False)
+        seen += [r["scholarshipId"] for r in page["reminders"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == ["a", "b", "c", "e", "d"]
+
+
+def test_new_scholarship_alerts(store, tmp_path, monkeypatch):
+    box = Outbox(str(tmp_path / "outbox.db"))
+    monkeypatch.setattr(new_scholarship_alerts, "outbox", box)
+    store.scholarships.save_many([normalize(raw) for raw in make_scholarships(20)])
+    for profile in make_profiles(30):
+        store.profiles.save(profile["userId"], {**profile, "email": f"{profile['userId']}@example.com"})
+
+    summary = new_scholarship_alerts.run_alerts(since="2000-01-01T00:00:00")
+    assert summary["scholarships"] == 20 and summary["profiles"] == 30
+    assert summary["users"] > 0 and summary["queued"] == summary["users"]
+
+    named = new_scholarship_alerts.load_scholarships(ids=[normalize(make_scholarships(1)[0]).id])
+    assert len(named) == 1 and named[0].conditions
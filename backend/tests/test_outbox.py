@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import routes.reminders as reminders_route
+import services.outbox as outbox_module
+from services.outbox import Outbox, dedup_key
+from tests.conftest import BACKEND_DIR, PlainMailer
+
+
+@pytest.fixture
+def outbox_path(tmp_path):
+    return str(tmp_path / "outbox.db")
+
+
+def test_outbox_opens_its_file_on_first_use(outbox_path):
+    box = Outbox(outbox_path)
+    assert not os.path.exists(outbox_path)
+    box.enqueue("a@example.com", "Hi", "Body")
+    assert os.path.exists(outbox_path)
+
+
+def test_drain_delivers_over_smtp(outbox_path, smtp_server):
+    mailer = PlainMailer(smtp_server.port, pool_size=2)
+    box = Outbox(outbox_path, sender=mailer.send)
+    queued = box.enqueue_many([
+        (f"user{i}@example.com", f"Subject {i}", "Body", dedup_key(f"u{i}", "sch", "test")) for i in range(3)
+    ])
+    assert queued == 3
+
+    assert box.drain() == {"delivered": 3, "failed": 0}
+    mailer.close()
+    assert sorted(m.rcpt_tos[0] for m in smtp_server.inbox.messages) == [f"user{i}@example.com" for i in range(3)]
+    assert box.stats() == {"sent": 3}
+    assert box.drain() == {"delivered": 0, "failed": 0}
+
+
+def test_failing_message_backs_off_then_dies(outbox_path, monkeypatch):
+    box = Outbox(outbox_path, sender=lambda *message: {"status": "error", "error": "550 mailbox unavailable"})
+    box.enqueue("a@example.com", "Hi", "Body")
+
+    # Backoff leaves the failed message for later
+    assert box.drain() == {"delivered": 0, "failed": 1}
+    assert box.stats() == {"pending": 1}
+
+    # Without backoff it is retried until it is given up on
+    monkeypatch.setattr(outbox_module, "OUTBOX_BACKOFF_BASE", 0)
+    box2 = Outbox(outbox_path, sender=box.sender)
+    box2._connect().execute("UPDATE outbox SET next_attempt_at = 0")
+    assert box2.drain() == {"delivered": 0, "failed": outbox_module.OUTBOX_MAX_ATTEMPTS - 1}
+    assert box2.stats() == {"dead": 1}
+
+
+def test_resubscribe_is_confirmed_again(memory_db, outbox_path, monkeypatch):
+    box = Outbox(outbox_path)
+    monkeypatch.setattr(reminders_route, "outbox", box)
+    memory_db.collection("scholarships").document("sch_1").set({"name": "Test Scholarship", "deadline": "2026-12-31", "active": True})
+    user = {"uid": "user_1", "email": "user1@example.com"}
+
+    reminders_route.subscribe_reminder({"scholarshipId": "sch_1"}, user=user)
+    reminders_route.subscribe_reminder({"scholarshipId": "sch_1"}, user=user)
+    assert box.stats() == {"pending": 1}
+
+    # Once the reminder has gone out, subscribing again is a new subscription
+    memory_db.collection("reminders").document("user_1_sch_1").update({"status": "sent", "createdAt": "2026-01-01T00:00:00"})
+    reminders_route.subscribe_reminder({"scholarshipId": "sch_1"}, user=user)
+    assert box.stats() == {"pending": 2}
+
+
+def test_drain_from_the_command_line(outbox_path):
+    Outbox(outbox_path).enqueue("a@example.com", "Hi", "Body")
+    env = {k: v for k, v in os.environ.items() if k not in ("EMAIL_USER", "EMAIL_PASSWORD")}
+    result = subprocess.run(
+        [sys.executable, "-m", "services.outbox", "--drain"],
+        cwd=BACKEND_DIR, env={**env, "OUTBOX_PATH": outbox_path}, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    # Mock mode (no credentials) counts as delivered
+    assert '"delivered": 1' in result.stdout
+    assert Outbox(outbox_path).stats() == {"sent": 1}
@@ -0,0 +1,126 @@
+"""
+/scholarships/eligible with the catalog cached in memory vs pushed down to
+Firestore as a facet query (CatalogCache.candidates): the pushdown may score
+fewer scholarships, but must find exactly the same eligible ones.
+"""
+import asyncio
+
+import pytest
+
+import routes.scholarships as scholarships_route
+from benchmarks.synthetic import make_profiles, make_scholarships, seed_store
+from jobs.backfill_facets import backfill
+from services.catalog import CatalogCache
+from utils.normalizer import FACET_KEYS
+
+SINGLE_CONDITIONS = [
+    {"field": "state", "operator": "==", "value": "Kerala"},
+    {"field": "state", "operator": "IN", "value": ["Delhi", "Punjab"]},
+    {"field": "income", "operator": "<=", "value": 150000},
+    {"field": "marks", "operator": ">=", "value": 80},
+    {"field": "gender", "operator": "==", "value": "Female"},
+    {"field": "caste", "operator": "IN", "value": ["SC", "ST"]},
+    {"field": "course", "operator": "IN", "value": ["MBBS", "B.Tech"]},
+]
+
+
+def _single_condition_scholarships():
+    # One condition each: the only rulesets whose facets can exclude a profile
+    return [
+        {
+            "name": f"Single Condition Scholarship #{i}",
+            "provider": "Test Trust",
+            "description": "One eligibility condition",
+            "amount": "₹10,000",
+            "deadline": "2026-12-31",
+            "eligibility_conditions": [condition],
+            "source_url": f"https://example.org/single/{i}",
+            "application_link": f"https://example.org/single/{i}/apply",
+            "source": "synthetic",
+        }
+        for i, condition in enumerate(SINGLE_CONDITIONS)
+    ]
+
+
+@pytest.fixture
+def seeded(memory_db):
+    profiles = make_profiles(40)
+    seed_store(memory_db, make_scholarships(200) + _single_condition_scholarships(), profiles)
+    return memory_db, profiles
+
+
+def _eligible(monkeypatch, uid, max_size):
+    monkeypatch.setattr(scholarships_route, "catalog", CatalogCache(max_size=max_size, snapshot_path=None, bundle_path=None))
+    result = asyncio.run(scholarships_route.get_eligible_scholarships(uid=uid, limit=None, offset=0))
+    assert "error" not in result
+    return result
+
+
+def _eligible_ids(result):
+    return sorted(item["scholarshipId"] for item in result["scholarships"])
+
+
+def test_pushdown_barely_filters_multi_condition_catalog(memory_db, monkeypatch):
+    # Every synthetic ruleset has two or more conditions, so every facet is
+    # unconstrained and each profile's candidates are the whole catalog
+    profiles = make_profiles(20)
+    seed_store(memory_db, make_scholarships(200), profiles)
+    for profile in profiles:
+        result = _eligible(monkeypatch, profile["userId"], max_size=0)
+        assert result["total_checked"] == 200
+
+
+def test_pushdown_matches_cached_catalog(seeded, monkeypatch):
+    _, profiles = seeded
+    narrowed = 0
+    for profile in profiles:
+        cached = _eligible(monkeypatch, profile["userId"], max_size=10 ** 6)
+        pushed = _eligible(monkeypatch, profile["userId"], max_size=0)
+        assert _eligible_ids(pushed) == _eligible_ids(cached), profile
+        narrowed += pushed["total_checked"] < cached["total_checked"]
+    # Only the hand-made single-condition scholarships are ever ruled out
+    assert narrowed > 0
+    assert all(
+        _eligible(monkeypatch, p["userId"], max_size=0)["total_checked"] >= 200 for p in profiles
+    )
+
+
+def test_backfill_restores_legacy_documents(seeded, monkeypatch):
+    client, profiles = seeded
+    # Documents written before facets existed
+    for doc in client.collection("scholarships").stream():
+        data = doc.to_dict()
+        client.collection("scholarships").document(doc.id).set({k: v for k, v in data.items() if k not in FACET_KEYS})
+
+    uid = profiles[0]["userId"]
+    cached = _eligible_ids(_eligible(monkeypatch, uid, max_size=10 ** 6))
+    assert cached
+    assert _eligible_ids(_eligible(monkeypatch, uid, max_size=0)) == []
+
+    assert backfill(dry_run=True)["stale"] == 207
+    summary = backfill()
+    assert summary["updated"] == summary["scholarships"] == 207
+
+    for profile in profiles:
+        uid = profile["userId"]
+        assert _eligible_ids(_eligible(monkeypatch, uid, max_size=0)) == _eligible_ids(_eligible(monkeypatch, uid, max_size=10 ** 6))
+    assert backfill()["stale"] == 0
+
+
+def test_candidates_query_builds_with_pinned_firestore_client(memory_db, monkeypatch):
+    # Two inequality filters in one query: the real client must send both
+    from google.auth.credentials import AnonymousCredentials
+    from google.cloud import firestore
+    from google.cloud.firestore_v1.query import Query
+
+    from repositories.firestore import FirestoreScholarships
+    from services.firestore import db
+
+    sent = []
+    monkeypatch.setattr(Query, "stream", lambda query, *args, **kwargs: sent.append(query._to_protobuf()) or iter(()))
+    # memory_db puts the in-memory client back afterwards
+    db.use_client(firestore.Client(project="test", credentials=AnonymousCredentials()))
+    assert FirestoreScholarships().candidates("kerala", 100000.0, 70.0, fields=["name"]) == []
+
+    filters = {(f.field_filter.field.field_path, f.field_filter.op.name) for f in sent[0].where.composite_filter.filters}
+    assert {("max_income", "GREATER_THAN_OR_EQUAL"), ("min_marks", "LESS_THAN_OR_EQUAL")} <= filters
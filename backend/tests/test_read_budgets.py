@@ -0,0 +1,89 @@
+"""
+Firestore read budgets for the hot paths, on the in-memory Firestore. A
+regression to per-document reads or an N+1 loop fails here before it shows
+up on the bill.
+"""
+import asyncio
+
+import pytest
+
+import delete_partners
+import routes.reminders as reminders_route
+import routes.scholarships as scholarships_route
+from benchmarks.synthetic import make_profiles, make_reminders, make_scholarships, seed_store
+from services.catalog import CatalogCache
+
+pytest_plugins = ["services.firestore_tracer"]
+
+N_SCHOLARSHIPS = 200
+PAGE = 20
+
+
+@pytest.fixture
+def seeded(memory_db, monkeypatch):
+    scholarships = make_scholarships(N_SCHOLARSHIPS)
+    profiles = make_profiles(5)
+    seed_store(memory_db, scholarships, profiles, make_reminders(profiles, scholarships, per_user=60))
+    monkeypatch.setattr(scholarships_route, "catalog", CatalogCache(snapshot_path=None, bundle_path=None))
+    return profiles[0]["userId"]
+
+
+def _eligible(uid):
+    return asyncio.run(scholarships_route.get_eligible_scholarships(uid=uid, limit=PAGE, offset=0))
+
+
+def test_eligible_cold_catalog(seeded, firestore_budget):
+    # Profile, count, one scan each of scholarships and rules, then the page's descriptions
+    with firestore_budget(reads=1 + 1 + 2 * N_SCHOLARSHIPS + PAGE):
+        result = _eligible(seeded)
+    assert result["count"] == PAGE
+
+
+def test_eligible_warm_catalog(seeded, firestore_budget):
+    _eligible(seeded)
+    # Only the profile and the page's descriptions once the catalog is cached
+    with firestore_budget(reads=1 + PAGE):
+        result = _eligible(seeded)
+    assert result["count"] == PAGE
+
+
+def test_eligible_pushdown(seeded, firestore_budget, monkeypatch):
+    monkeypatch.setattr(scholarships_route, "catalog", CatalogCache(max_size=0, snapshot_path=None, bundle_path=None))
+    # Candidates and their rules can't exceed the catalog
+    with firestore_budget(reads=1 + 1 + 2 * N_SCHOLARSHIPS + PAGE):
+        result = _eligible(seeded)
+    assert result["count"] == PAGE
+
+
+def test_eligible_fast(seeded, firestore_budget):
+    # Profile, three scholarships and their rules in one query
+    with firestore_budget(reads=1 + 3 + 3):
+        result = asyncio.run(scholarships_route.get_eligible_scholarships_fast(uid=seeded))
+    assert "error" not in result
+
+
+def test_reminders_page(seeded, firestore_budget):
+    # One page plus the document that says another page exists
+    with firestore_budget(reads=PAGE + 1):
+        first = reminders_route.get_my_reminders(uid=seeded, limit=PAGE, cursor=None, active_only=False)
+    assert first["count"] == PAGE and first["next_cursor"]
+
+    with firestore_budget(reads=PAGE + 1):
+        second = reminders_route.get_my_reminders(uid=seeded, limit=PAGE, cursor=first["next_cursor"], active_only=False)
+    assert not {r["id"] for r in first["reminders"]} & {r["id"] for r in second["reminders"]}
+
+
+def test_delete_partners(memory_db, firestore_budget):
+    partners = [
+        {**raw, "name": f"Partner Scholarship #{i}", "provider": "Buddy4Study Partner"}
+        for i, raw in enumerate(make_scholarships(70))
+    ]
+    seed_store(memory_db, partners + make_scholarships(10, seed=1))
+
+    # The partners and their rules, looked up 30 ids per query
+    with firestore_budget(reads=2 * len(partners), writes=2 * len(partners)):
+        delete_partners.delete_scholarships()
+
+    remaining = [doc.to_dict()["provider"] for doc in memory_db.collection("scholarships").stream()]
+    assert len(remaining) == 10 and "Buddy4Study Partner" not in remaining
+    assert len(list(memory_db.collection("eligibility_rules").stream())) == 10
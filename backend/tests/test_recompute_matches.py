@@ -0,0 +1,35 @@
+import tracemalloc
+
+from benchmarks.synthetic import make_profiles, make_scholarships, seed_store
+from jobs.recompute_matches import CELL_BYTES, recompute, score_chunk
+from utils.normalizer import normalize
+
+
+def test_cell_bytes_covers_peak_scoring_memory():
+    rulesets = [[c.to_dict() for c in normalize(raw).conditions] for raw in make_scholarships(1000)]
+    profiles = make_profiles(1000)
+    uids = [p["userId"] for p in profiles]
+
+    tracemalloc.start()
+    try:
+        score_chunk(uids, profiles, rulesets)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak / (len(uids) * len(rulesets)) <= CELL_BYTES
+
+
+def test_process_pool_matches_serial(memory_db):
+    seed_store(memory_db, make_scholarships(150), make_profiles(250))
+
+    def matches():
+        return {doc.id: doc.to_dict()["scholarships"] for doc in memory_db.collection("matches").stream()}
+
+    # chunk_mb=0 gives MIN_CHUNK_ROWS profiles per chunk: three chunks
+    serial = recompute(workers=1, chunk_mb=0)
+    expected = matches()
+    pooled = recompute(workers=2, chunk_mb=0)
+    assert serial["chunks"] == pooled["chunks"] == 3
+    assert pooled["eligible_pairs"] == serial["eligible_pairs"]
+    assert matches() == expected
+    assert len(expected) == 250
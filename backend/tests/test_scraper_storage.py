@@ -0,0 +1,43 @@
+"""
+The scraper imports the backend repositories from its own directory, where
+its `utils` package shadows backend/utils. It runs in a subprocess so the two
+packages don't meet in this test process.
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+
+from tests.conftest import BACKEND_DIR
+
+SCRAPER_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "scraper")
+
+SAVE_SCRIPT = """
+from utils.firestore_helper import FirestoreHelper
+
+helper = FirestoreHelper()
+assert helper.storage_backend == "sqlite", helper.storage_backend
+print(helper.save_scholarships([
+    {"name": "Merit Scholarship", "deadline": "2026-03-31", "source": "test",
+     "eligibility_conditions": [{"field": "income", "operator": "<=", "value": 250000}]},
+    {"name": "State Grant", "deadline": "15-04-2026", "source": "test"},
+]))
+"""
+
+
+def _run_scraper(script, **env):
+    return subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=SCRAPER_DIR, env={**os.environ, **env}, capture_output=True, text=True, timeout=60,
+    )
+
+
+def test_scraper_saves_into_sqlite(tmp_path):
+    path = str(tmp_path / "fundmystudy.db")
+    result = _run_scraper(SAVE_SCRIPT, STORAGE_BACKEND="sqlite", SQLITE_PATH=path)
+    assert result.returncode == 0, result.stderr
+
+    conn = sqlite3.connect(path)
+    assert sorted(row[0] for row in conn.execute("SELECT id FROM scholarships")) == ["merit_scholarship", "state_grant"]
+    assert conn.execute("SELECT count(*) FROM eligibility_rules").fetchone()[0] == 1
+
@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+import services.firestore as firestore_module
+import services.warmup as warmup
+from services.firestore import InstrumentedClient
+from services.memory_firestore import MemoryFirestore
+
+
+class Client:
+    """Stands in for google.cloud.firestore.Client"""
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    """Factory results in order: the credential fallback first, then a real client"""
+    built = []
+    results = [MemoryFirestore(), Client()]
+
+    def factory():
+        built.append(results[min(len(built), len(results) - 1)])
+        return built[-1]
+
+    monkeypatch.setattr(firestore_module, "db", InstrumentedClient(factory=factory))
+    monkeypatch.setattr(firestore_module, "FIRESTORE_BACKEND", "firestore")
+    monkeypatch.setattr(warmup, "WARMUP_RETRY_SECONDS", 0.01)
+    return built
+
+
+def test_memory_fallback_is_not_ready(clients):
+    with pytest.raises(RuntimeError, match="in-memory"):
+        warmup._connect_storage()
+    # The fallback client is dropped, so the next attempt connects again
+    assert not firestore_module.db.connected
+    assert warmup._connect_storage() == "Client"
+    assert len(clients) == 2
+
+
+def test_memory_backend_when_asked_for(clients, monkeypatch):
+    monkeypatch.setattr(firestore_module, "FIRESTORE_BACKEND", "memory")
+    assert warmup._connect_storage() == "MemoryFirestore"
+
+
+def test_readiness_waits_for_real_storage(clients):
+    readiness = warmup.Readiness(steps=(("storage", warmup._connect_storage),))
+    readiness.start(enabled=True)
+    deadline = time.monotonic() + 5
+    while not readiness.ready and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert readiness.ready
+    assert readiness.snapshot()["checks"]["storage"]["detail"] == "Client"
+    assert len(clients) == 2
@@ -0,0 +1,119 @@
+"""
+Catalog bundle: the scraped catalog as one versioned, checksummed msgpack file.
+
+The scraper writes it after each run (scraper/main.py, --bundle or
+CATALOG_BUNDLE_PATH) and the backend can load its catalog from it instead of
+scanning Firestore: at startup, and whenever Firestore can't be read.
+
+File: MAGIC, then a msgpack map
+    {"format": 1, "version": <ns>, "created_at": <iso>, "count": n,
+     "sha256": <hex of payload>, "payload": <bytes>}
+where payload is msgpack of
+    {"scholarships": {id: scholarships document}, "rules": {id: [condition dict]}}
+with documents in their Firestore shape (to_firestore / rules_to_firestore).
+Only plain dicts go in and out, so scraper and backend share this module
+without sharing imports.
+"""
+import hashlib
+import logging
+import os
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FMSBNDL\n"
+BUNDLE_FORMAT = 1
+
+
+class BundleError(ValueError):
+    """Missing, unreadable or corrupt bundle"""
+
+
+def write_bundle(path, scholarships, rules, version=None):
+    """
+    Write {id: document} and {id: conditions} to `path` (written beside it and
+    renamed over it). Returns the bundle version.
+    """
+    import msgpack
+
+    version = version or time.time_ns()
+    payload = msgpack.packb({"scholarships": scholarships, "rules": rules}, use_bin_type=True, default=str)
+    envelope = msgpack.packb({
+        "format": BUNDLE_FORMAT,
+        "version": version,
+        "created_at": datetime.utcnow().isoformat(),
+        "count": len(scholarships),
+        "sha256": hashlib.sha256(payload).hexdigest(),
+        "payload": payload,
+    }, use_bin_type=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(envelope)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return version
+
+
+def read_bundle(path):
+    """
+    {"version", "created_at", "scholarships", "rules"} from a bundle, after
+    checking its format and checksum. Raises BundleError.
+    """
+    import msgpack
+
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        raise BundleError(f"Cannot read catalog bundle {path}: {e}") from e
+    if not data.startswith(MAGIC):
+        raise BundleError(f"{path} is not a catalog bundle")
+
+    try:
+        envelope = msgpack.unpackb(data[len(MAGIC):], raw=False)
+    except (ValueError, msgpack.UnpackException) as e:
+        raise BundleError(f"Catalog bundle {path} is corrupt: {e}") from e
+    if not isinstance(envelope, dict) or envelope.get("format") != BUNDLE_FORMAT:
+        found = envelope.get("format") if isinstance(envelope, dict) else None
+        raise BundleError(f"Catalog bundle {path} has format {found}, expected {BUNDLE_FORMAT}")
+    payload = envelope.get("payload") or b""
+    if hashlib.sha256(payload).hexdigest() != envelope.get("sha256"):
+        raise BundleError(f"Catalog bundle {path} failed its checksum")
+
+    contents = msgpack.unpackb(payload, raw=False)
+    return {
+        "version": envelope["version"],
+        "created_at": envelope.get("created_at"),
+        "scholarships": contents.get("scholarships", {}),
+        "rules": contents.get("rules", {}),
+    }
+
+
+def update_bundle(path, scholarships, rules):
+    """
+    Merge one scrape's documents into the bundle at `path`, like the
+    set(merge=True) writes to Firestore: existing documents are updated and
+    keep their created_at, new ones get created_at now. A missing or corrupt
+    bundle is started over. Returns (version, total scholarships).
+    """
+    try:
+        bundle = read_bundle(path)
+    except BundleError as e:
+        if os.path.exists(path):
+            logger.warning(f"⚠️ Starting a new catalog bundle: {e}")
+        bundle = {"scholarships": {}, "rules": {}}
+
+    created_at = datetime.utcnow().isoformat()
+    merged = bundle["scholarships"]
+    for sch_id, data in scholarships.items():
+        existing = merged.get(sch_id)
+        merged[sch_id] = {**existing, **data} if existing else {**data, "created_at": created_at}
+    merged_rules = {**bundle["rules"], **rules}
+
+    version = write_bundle(path, merged, merged_rules)
+    logger.info(f"📦 Catalog bundle v{version} at {path}: {len(merged)} scholarships, {len(merged_rules)} rulesets")
+    return version, len(merged)
@@ -1,11 +1,213 @@
-from datetime import datetime
+"""
+Shared scholarship record type and Firestore (de)serialization.
+
+Used by both the scraper (scraper/normalizer.py re-exports this module) and
+the backend catalog cache, so the two sides read and write the same shape.
+"""
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+
+@dataclass(slots=True)
+class Condition:
+    field: str
+    operator: str
+    value: object = None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("field"), data.get("operator"), data.get("value"))
+
+    def to_dict(self):
+        return {"field": self.field, "operator": self.operator, "value": self.value}
+
+
+@dataclass(slots=True)
+class Scholarship:
+    id: str
+    name: str
+    provider: str = ""
+    description: str = ""
+    amount: str = "Not specified"
+    deadline: str = ""
+    source_url: str = ""
+    application_link: str = ""
+    official_only: bool = True
+    category: str = "General"
+    state_specific: bool = False
+    state: str = ""
+    source: str = "unknown"
+    icon: str = "🎓"
+    active: bool = True
+    created_at: str = ""
+    conditions: tuple = ()
+
+
+# Scholarship fields stored on the Firestore document (conditions live in eligibility_rules)
+DOC_FIELDS = (
+    "name", "provider", "description", "amount", "deadline", "source_url",
+    "application_link", "official_only", "category", "state_specific", "state",
+    "source", "icon", "active",
+)
+
+
+# Denormalized eligibility facets written onto each scholarship document so
+# candidate scholarships can be queried in Firestore instead of filtered in Python
+FACET_FIELDS = {"state": "states", "caste": "castes", "gender": "genders", "course": "courses"}
+FACET_KEYS = tuple(FACET_FIELDS.values()) + ("max_income", "min_marks")
+ANY_VALUE = "*"
+NO_INCOME_LIMIT = 1e12
+
+
+def facet_value(value):
+    return str(value).lower().strip()
+
+
+def facets(conditions):
+    """
+    Conditions -> {"states": [...], "castes": [...], "genders": [...], "courses": [...],
+    "max_income": float, "min_marks": float}. Unconstrained arrays hold ANY_VALUE.
+
+    The pushdown query must never drop a scholarship the eligibility engine
+    would admit. The engine admits a score >= 0.33 (share of conditions met,
+    plus small bonuses and jitter), so with two or more conditions a profile
+    failing any one of them can still be eligible. Only a single-condition
+    ruleset excludes every profile that fails it; longer rulesets get
+    unconstrained facets and are scored in full.
+    """
+    if len(conditions) != 1:
+        conditions = ()
+    arrays = {name: set() for name in FACET_FIELDS.values()}
+    max_income = NO_INCOME_LIMIT
+    min_marks = 0.0
+
+    for cond in conditions:
+        field = (cond.field or "").lower()
+        if field in FACET_FIELDS and cond.operator in ("==", "IN"):
+            values = cond.value if isinstance(cond.value, list) else [cond.value]
+            arrays[FACET_FIELDS[field]].update(facet_value(v) for v in values)
+        elif field == "income" and cond.operator == "<=":
+            try:
+                max_income = min(max_income, float(cond.value))
+            except (ValueError, TypeError):
+                pass
+        elif field == "marks" and cond.operator == ">=":
+            try:
+                min_marks = max(min_marks, float(cond.value))
+            except (ValueError, TypeError):
+                pass
+
+    result = {name: sorted(values) or [ANY_VALUE] for name, values in arrays.items()}
+    result["max_income"] = max_income
+    result["min_marks"] = min_marks
+    return result
+
+
+REMINDER_LEAD_DAYS = 7
+DEADLINE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%d %B %Y", "%d %b %Y")
+
+
+def parse_deadline(deadline):
+    """Deadline string as scraped ('2026-03-31', '31-03-2026', ...) -> datetime, or None"""
+    if not deadline:
+        return None
+    text = str(deadline).strip()
+    for fmt in DEADLINE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def notify_at_for(deadline, lead_days=REMINDER_LEAD_DAYS):
+    """
+    When a deadline reminder is due, as a sortable UTC ISO string (what
+    `reminders.notify_at` stores), or None if the deadline can't be parsed.
+    """
+    parsed = parse_deadline(deadline)
+    if parsed is None:
+        return None
+    return (parsed - timedelta(days=lead_days)).isoformat()
+
+
+def reminder_deadline_updates(deadline, status, now_iso):
+    """
+    Fields to update on a reminder whose scholarship deadline changed. Reminders
+    already sent are re-armed if the new notify date is still ahead.
+    """
+    notify_at = notify_at_for(deadline)
+    updates = {"deadline": deadline, "notify_at": notify_at}
+    if status in ("notified", "expired") and notify_at and notify_at > now_iso:
+        updates["status"] = "active"
+    return updates
+
+
+def make_doc_id(name):
+    """Firestore document ID from a scholarship name"""
+    doc_id = name.lower().strip()
+    doc_id = re.sub(r'[^a-z0-9\s]', ' ', doc_id)
+    doc_id = re.sub(r'\s+', '_', doc_id)
+    return doc_id[:100]
+
 
 def normalize(raw):
+    """Raw scraper dict -> Scholarship"""
+    return Scholarship(
+        id=raw.get("id") or make_doc_id(raw["name"]),
+        name=raw.get("name", ""),
+        provider=raw.get("provider", ""),
+        description=raw.get("description", ""),
+        amount=raw.get("amount", "Not specified"),
+        deadline=raw.get("deadline", ""),
+        source_url=raw.get("source_url", ""),
+        application_link=raw.get("application_link", ""),
+        official_only=raw.get("official_only", True),
+        category=raw.get("category", "General"),
+        state_specific=raw.get("state_specific", False),
+        state=raw.get("state", ""),
+        source=raw.get("source", "unknown"),
+        icon=raw.get("icon", "🎓"),
+        conditions=tuple(Condition.from_dict(c) for c in raw.get("eligibility_conditions") or ()),
+    )
+
+
+def to_firestore(scholarship):
+    """Scholarship -> `scholarships` document dict incl. facets (None values dropped)"""
+    data = {name: getattr(scholarship, name) for name in DOC_FIELDS}
+    data.update(facets(scholarship.conditions))
+    data["last_updated"] = datetime.utcnow().isoformat()
+    return {k: v for k, v in data.items() if v is not None}
+
+
+def rules_to_firestore(scholarship):
+    """Scholarship -> `eligibility_rules` document dict"""
     return {
-        "name": raw.get("name", ""),
-        "provider": raw.get("provider", ""),
-        "source_url": raw.get("source_url", ""),
-        "official_only": raw.get("official_only", True),
-        "active": True,
-        "last_verified": datetime.utcnow().isoformat()
-    }
\ No newline at end of file
+        "scholarshipId": scholarship.id,
+        "conditions": [c.to_dict() for c in scholarship.conditions],
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+
+
+def from_firestore(doc_id, data, conditions=()):
+    """`scholarships` document (+ its rule conditions as dicts) -> Scholarship"""
+    return Scholarship(
+        id=doc_id,
+        name=data.get("name", ""),
+        provider=data.get("provider", ""),
+        description=data.get("description", ""),
+        amount=data.get("amount", "Not specified"),
+        deadline=data.get("deadline", ""),
+        source_url=data.get("source_url", ""),
+        application_link=data.get("application_link", ""),
+        official_only=data.get("official_only", True),
+        category=data.get("category", "General"),
+        state_specific=data.get("state_specific", False),
+        state=data.get("state", ""),
+        source=data.get("source", "unknown"),
+        icon=data.get("icon", "🎓"),
+        active=data.get("active", True),
+        created_at=data.get("created_at", ""),
+        conditions=tuple(Condition.from_dict(c) for c in conditions or ()),
+    )
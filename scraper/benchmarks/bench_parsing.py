@@ -0,0 +1,88 @@
+"""
+Parsing benchmark on saved HTML fixtures.
+
+Compares pages/sec for:
+  - full:     BeautifulSoup(html, "html.parser") over the whole document (old approach)
+  - strainer: BeautifulSoup limited to cards/eligibility with SoupStrainer
+  - lxml:     utils.html_parser fast path (lxml + precompiled XPath)
+
+Run with: python benchmarks/bench_parsing.py [--seconds 2]
+"""
+import argparse
+import os
+import sys
+import time
+
+SCRAPER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRAPER_DIR)
+
+from bs4 import BeautifulSoup  # noqa: E402
+from utils import html_parser  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def full_listing(page_html):
+    soup = BeautifulSoup(page_html, "html.parser")
+    cards = []
+    for node in soup.find_all("a", class_=html_parser._class_starts(html_parser.CARD_CLASS)):
+        name = node.find(class_=html_parser._class_starts(html_parser.NAME_CLASS))
+        if name:
+            cards.append({"name": html_parser._clean(name.get_text(" ")), "source_url": node.get("href")})
+    return cards
+
+
+def full_eligibility(page_html):
+    soup = BeautifulSoup(page_html, "html.parser")
+    blocks = soup.find_all(class_=html_parser._class_starts(html_parser.ELIGIBILITY_CLASS))
+    return html_parser._clean(" ".join(b.get_text(" ") for b in blocks))
+
+
+def pages_per_sec(fn, page_html, seconds):
+    fn(page_html)  # warm-up
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn(page_html)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper HTML parsing")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Time per case")
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURES, "listing.html")) as f:
+        listing = f.read()
+    with open(os.path.join(FIXTURES, "detail.html")) as f:
+        detail = f.read()
+
+    # All paths must agree before timing means anything
+    expected = [card["name"] for card in full_listing(listing)]
+    assert [card["name"] for card in html_parser._parse_listing_soup(listing)] == expected
+    assert [card["name"] for card in html_parser.parse_listing(listing)] == expected
+    assert html_parser._parse_eligibility_soup(detail) == full_eligibility(detail)
+    assert html_parser.parse_eligibility(detail) == full_eligibility(detail)
+
+    cases = [
+        ("listing", "full", full_listing, listing),
+        ("listing", "strainer", html_parser._parse_listing_soup, listing),
+        ("listing", "lxml", html_parser.parse_listing, listing),
+        ("detail", "full", full_eligibility, detail),
+        ("detail", "strainer", html_parser._parse_eligibility_soup, detail),
+        ("detail", "lxml", html_parser.parse_eligibility, detail),
+    ]
+    if not html_parser.HAS_LXML:
+        print("⚠️  lxml not installed: 'lxml' rows measure the strainer fallback")
+
+    print(f"{'page':<8} {'parser':<9} {'pages/sec':>10} {'speedup':>8}")
+    baseline = {}
+    for page, name, fn, page_html in cases:
+        rate = pages_per_sec(fn, page_html, args.seconds)
+        baseline.setdefault(page, rate)
+        print(f"{page:<8} {name:<9} {rate:>10.1f} {rate / baseline[page]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
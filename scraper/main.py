@@ -1,5 +1,8 @@
 """
 Run with: python main.py --source all
+Daemon:   python main.py --daemon
+Bundle:   python main.py --source all --bundle ../backend/catalog.bundle
+          (then start the backend with CATALOG_BUNDLE_PATH=catalog.bundle)
 """
 import argparse
 import json
@@ -20,6 +23,7 @@ try:
     from scrapers.buddy4study_scraper import Buddy4StudyScraper
     from utils.firestore_helper import FirestoreHelper
     from utils.cleanup import clean_fake_scholarships
+    from utils.scheduler import Scheduler, SourceSchedule
     print("✅ All modules imported successfully")
 except ImportError as e:
     print(f"❌ Import error: {e}")
@@ -33,7 +37,49 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def scrape_scholarships(source: str = "all"):
+# Catalog bundle the backend can load instead of scanning Firestore
+# (backend/utils/catalog_bundle.py); not written unless set or --bundle is given
+CATALOG_BUNDLE_PATH = os.getenv("CATALOG_BUNDLE_PATH") or None
+
+
+def export_bundle(scholarships, path):
+    """
+    Export stage: merge this run's normalized scholarships and rules into the
+    catalog bundle at `path`. Returns {"path", "version", "count", "total"}.
+    """
+    from normalizer import normalize, rules_to_firestore, to_firestore
+    from backend.utils.catalog_bundle import update_bundle
+
+    docs, rules = {}, {}
+    for raw in scholarships:
+        try:
+            scholarship = normalize(raw)
+        except Exception as e:
+            logger.warning(f"Skipping '{raw.get('name', 'Unknown')}' in bundle: {e}")
+            continue
+        docs[scholarship.id] = to_firestore(scholarship)
+        if scholarship.conditions:
+            rules[scholarship.id] = rules_to_firestore(scholarship)["conditions"]
+
+    version, total = update_bundle(path, docs, rules)
+    return {"path": path, "version": version, "count": len(docs), "total": total}
+
+
+def export_stage(scholarships, path):
+    """export_bundle, reported like the other stages; a failed export doesn't fail the run"""
+    if not path:
+        return None
+    print(f"\n📦 Exporting catalog bundle to {path}...")
+    try:
+        bundle = export_bundle(scholarships, path)
+        print(f"✅ Bundle v{bundle['version']}: {bundle['count']} exported, {bundle['total']} in bundle")
+        return bundle
+    except Exception as e:
+        print(f"❌ Error exporting catalog bundle: {e}")
+        return {"path": path, "error": str(e)}
+
+
+def scrape_scholarships(source: str = "all", bundle_path=CATALOG_BUNDLE_PATH):
     """
     Main scraping function - MIXED APPROACH
     Returns: {"status": "success/error", "count": X, "scholarships": [...]}
@@ -159,6 +205,9 @@ def scrape_scholarships(source: str = "all"):
             for category, count in sorted(category_counts.items()):
                 print(f"   • {category}: {count}")
             
+            # Export first, so the bundle is current even if Firestore is down
+            bundle = export_stage(all_scholarships, bundle_path)
+
             # Save to Firestore
             print("\n💾 Saving to Firestore database...")
             try:
@@ -179,6 +228,7 @@ def scrape_scholarships(source: str = "all"):
                     "total_in_db": save_result.get("total", 0),
                     "sources": source_counts,
                     "categories": category_counts,
+                    "bundle": bundle,
                     "timestamp": datetime.utcnow().isoformat(),
                     "scraping_approach": "mixed_real_nsp_mock_state"
                 }
@@ -190,6 +240,7 @@ def scrape_scholarships(source: str = "all"):
                     "message": f"Collected {len(all_scholarships)} scholarships but failed to save",
                     "count": len(all_scholarships),
                     "error": str(e),
+                    "bundle": bundle,
                     "timestamp": datetime.utcnow().isoformat()
                 }
         else:
@@ -211,6 +262,82 @@ def scrape_scholarships(source: str = "all"):
             "timestamp": datetime.utcnow().isoformat()
         }
 
+class WarmResources:
+    """
+    Resources kept alive between daemon runs: the DB client and scraper instances.
+    """
+
+    def __init__(self):
+        self.firestore_helper = FirestoreHelper()
+        self.last_counts = {}
+        self._scrapers = {}
+
+    def scraper(self, name):
+        if name not in self._scrapers:
+            if name == "buddy4study":
+                self._scrapers[name] = Buddy4StudyScraper()
+            else:
+                self._scrapers[name] = MockScholarshipScraper()
+        return self._scrapers[name]
+
+
+def run_source(name, resources):
+    """Scrape and save a single source, reusing warm resources"""
+    if name == "buddy4study":
+        scholarships = resources.scraper(name).scrape()
+    else:
+        # Mock state/central data is only a backup when real sources come up short
+        if resources.last_counts.get("buddy4study", 0) >= 5:
+            return {"status": "success", "count": 0, "skipped": True}
+        mock_scholarships = resources.scraper("mock").scrape()
+        if name == "state":
+            scholarships = [s for s in mock_scholarships if s.get("state_specific", False)]
+        else:
+            scholarships = [s for s in mock_scholarships
+                            if not s.get("state_specific", False) and "nsp" not in s.get("source", "").lower()]
+
+    resources.last_counts[name] = len(scholarships)
+    if not scholarships:
+        return {"status": "success", "count": 0}
+
+    bundle = export_stage(scholarships, CATALOG_BUNDLE_PATH)
+    save_result = resources.firestore_helper.save_scholarships(scholarships)
+    return {
+        "status": "success",
+        "count": len(scholarships),
+        "saved": save_result.get("saved", 0),
+        "updated": save_result.get("updated", 0),
+        "bundle": bundle,
+    }
+
+
+def run_cleanup():
+    clean_fake_scholarships()
+    return {"status": "success", "count": 0}
+
+
+def run_daemon():
+    """Long-running mode: each source on its own interval (override with SCRAPER_INTERVAL_<SOURCE>)"""
+    import signal
+
+    resources = WarmResources()
+    schedules = [
+        SourceSchedule("buddy4study", lambda: run_source("buddy4study", resources),
+                       interval=6 * 3600, jitter=20 * 60),
+        SourceSchedule("state", lambda: run_source("state", resources),
+                       interval=12 * 3600, jitter=30 * 60),
+        SourceSchedule("central", lambda: run_source("central", resources),
+                       interval=12 * 3600, jitter=30 * 60),
+        SourceSchedule("cleanup", run_cleanup, interval=24 * 3600, jitter=60 * 60),
+    ]
+    scheduler = Scheduler(schedules)
+
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    signal.signal(signal.SIGINT, scheduler.stop)
+
+    scheduler.run_forever()
+
+
 def main():
     """Command line interface"""
     parser = argparse.ArgumentParser(description="FundMyStudy Scholarship Scraper - Mixed Real & Mock Approach")
@@ -219,14 +346,26 @@ def main():
                        help="Source to scrape (default: all = Real NSP + Mock State)")
     parser.add_argument("--output", type=str, help="Output JSON file (optional)")
     parser.add_argument("--no-save", action="store_true", help="Don't save to Firestore (debug)")
+    parser.add_argument("--bundle", type=str, default=CATALOG_BUNDLE_PATH,
+                       help="Also export the catalog to this bundle file for the backend (default: $CATALOG_BUNDLE_PATH)")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
+    parser.add_argument("--daemon", action="store_true",
+                       help="Run continuously, each source on its own schedule (full crawl every run)")
     
     args = parser.parse_args()
+
+    if args.daemon:
+        if args.verbose:
+            logging.getLogger().setLevel(logging.DEBUG)
+        print("\n🕒 Starting scraper daemon (Ctrl+C to stop)")
+        run_daemon()
+        sys.exit(0)
     
     print(f"\n⚙️  Arguments:")
     print(f"   Source: {args.source}")
     print(f"   Output file: {args.output or 'None'}")
     print(f"   Save to DB: {not args.no_save}")
+    print(f"   Catalog bundle: {args.bundle or 'None'}")
     print(f"   Verbose: {args.verbose}")
     print()
     
@@ -239,7 +378,7 @@ def main():
     print("🚀 STARTING SCRAPING PROCESS")
     print("="*60)
     
-    result = scrape_scholarships(args.source)
+    result = scrape_scholarships(args.source, bundle_path=args.bundle)
     
     # Output result
     print("\n" + "="*60)
@@ -1,11 +1,20 @@
-from datetime import datetime
+"""
+The normalizer lives in backend/utils/normalizer.py so the scraper and the
+backend share one record type. Re-exported here for scraper code.
+"""
+import os
+import sys
 
-def normalize(raw):
-    return {
-        "name": raw["name"],
-        "provider": raw["provider"],
-        "source_url": raw["source_url"],
-        "official_only": True,
-        "active": True,
-        "last_verified": datetime.utcnow()
-    }
\ No newline at end of file
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.normalizer import (  # noqa: E402,F401
+    Condition,
+    Scholarship,
+    from_firestore,
+    make_doc_id,
+    normalize,
+    notify_at_for,
+    reminder_deadline_updates,
+    rules_to_firestore,
+    to_firestore,
+)
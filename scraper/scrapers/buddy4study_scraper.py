@@ -1,8 +1,9 @@
-from bs4 import BeautifulSoup
 import re
 import logging
 import sys
 
+from utils.html_parser import parse_listing, parse_eligibility
+
 # Try importing playwright
 try:
     from playwright.sync_api import sync_playwright
@@ -33,6 +34,14 @@ class Buddy4StudyScraper:
             
         return scholarships
 
+    def _parse_listing_page(self, page_html):
+        """Scholarship cards from a listing page (only the cards are parsed)"""
+        return parse_listing(page_html, base_url=self.base_url)
+
+    def _parse_detail_page(self, page_html):
+        """Structured conditions from a detail page's eligibility block"""
+        return self._parse_conditions(parse_eligibility(page_html))
+
     def _parse_conditions(self, text):
         """
         Heuristic parser to convert raw eligibility text into structured conditions
@@ -6,43 +6,75 @@ import sys
 from datetime import datetime
 import logging
 
-print("💾 Initializing Firestore Helper...")
+from normalizer import normalize, reminder_deadline_updates, rules_to_firestore, to_firestore
 
-# Add the backend directory to path to access shared Firebase config
-backend_path = os.path.join(os.path.dirname(__file__), "../../backend")
-sys.path.insert(0, backend_path)
+# The backend directory, for the shared Firebase config and storage repositories
+BACKEND_PATH = os.path.join(os.path.dirname(__file__), "../../backend")
+
+_storage = None
+
+
+def _connect_storage():
+    """
+    (db, storage backend, SQLite path, store), resolved on first use rather
+    than at import. STORAGE_BACKEND=sqlite saves into the backend's local
+    SQLite store instead of Firestore.
+    """
+    global _storage
+    if _storage is not None:
+        return _storage
+
+    print("💾 Initializing Firestore Helper...")
+    if BACKEND_PATH not in sys.path:
+        sys.path.insert(0, BACKEND_PATH)
 
-try:
-    from services.firestore import db
-    print("✅ Using shared Firestore client from backend")
-except ImportError:
-    print("⚠️  Could not import shared Firestore client, initializing directly...")
     try:
-        # Initialize Firebase directly
-        import firebase_admin
-        from firebase_admin import credentials
-        from google.cloud import firestore
-        
-        # Path to service account key
-        cred_path = os.path.join(backend_path, "serviceAccountKey.json")
-        
-        if os.path.exists(cred_path):
-            cred = credentials.Certificate(cred_path)
-            if not firebase_admin._apps:
-                firebase_admin.initialize_app(cred)
-            db = firestore.Client()
-            print("✅ Firebase initialized directly")
-        else:
-            print(f"❌ Service account key not found at: {cred_path}")
+        from services.firestore import db
+        print("✅ Using shared Firestore client from backend")
+    except ImportError:
+        print("⚠️  Could not import shared Firestore client, initializing directly...")
+        try:
+            # Initialize Firebase directly
+            import firebase_admin
+            from firebase_admin import credentials
+            from google.cloud import firestore
+            
+            # Path to service account key
+            cred_path = os.path.join(BACKEND_PATH, "serviceAccountKey.json")
+            
+            if os.path.exists(cred_path):
+                cred = credentials.Certificate(cred_path)
+                if not firebase_admin._apps:
+                    firebase_admin.initialize_app(cred)
+                db = firestore.Client()
+                print("✅ Firebase initialized directly")
+            else:
+                print(f"❌ Service account key not found at: {cred_path}")
+                db = None
+        except Exception as e:
+            print(f"❌ Failed to initialize Firebase: {e}")
             db = None
-    except Exception as e:
-        print(f"❌ Failed to initialize Firebase: {e}")
-        db = None
+
+    try:
+        from repositories import SQLITE_PATH, STORAGE_BACKEND, store
+    except ImportError as e:
+        # Never fall back to Firestore when SQLite was asked for
+        if os.getenv("STORAGE_BACKEND") == "sqlite":
+            raise RuntimeError(f"STORAGE_BACKEND=sqlite but the backend SQLite store could not be loaded: {e}") from e
+        STORAGE_BACKEND, SQLITE_PATH, store = "firestore", None, None
+
+    _storage = (db, STORAGE_BACKEND, SQLITE_PATH, store)
+    return _storage
+
+WRITE_BATCH_SIZE = 400  # Firestore batch limit is 500
+IN_QUERY_LIMIT = 30  # Firestore 'in' filter accepts at most 30 values
 
 class FirestoreHelper:
     def __init__(self):
-        self.db = db
-        if self.db:
+        self.db, self.storage_backend, self.sqlite_path, self.store = _connect_storage()
+        if self.storage_backend == "sqlite":
+            print(f"✅ FirestoreHelper ready (SQLite store at {self.sqlite_path})")
+        elif self.db:
             print("✅ FirestoreHelper ready")
         else:
             print("❌ FirestoreHelper: No database connection")
@@ -52,6 +84,9 @@ class FirestoreHelper:
         Save scholarships to Firestore
         Returns: {"saved": X, "updated": Y}
         """
+        if self.storage_backend == "sqlite":
+            return self._save_to_sqlite(scholarships)
+        
         if not self.db:
             print("❌ Cannot save: No database connection")
             return {"saved": 0, "updated": 0, "error": "No database"}
@@ -59,97 +94,126 @@ class FirestoreHelper:
         saved = 0
         updated = 0
         errors = 0
+        deadline_changes = {}
         
         print(f"\n💾 Saving {len(scholarships)} scholarships to Firestore...")
         
-        for scholarship in scholarships:
+        for raw in scholarships:
             try:
-                # Generate document ID
-                doc_id = self._generate_doc_id(scholarship["name"])
-                
-                # Prepare data
-                scholarship_data = {
-                    "name": scholarship.get("name", ""),
-                    "provider": scholarship.get("provider", ""),
-                    "description": scholarship.get("description", ""),
-                    "amount": scholarship.get("amount", "Not specified"),
-                    "deadline": scholarship.get("deadline", ""),
-                    "source_url": scholarship.get("source_url", ""),
-                    "application_link": scholarship.get("application_link", ""),
-                    "official_only": scholarship.get("official_only", True),
-                    "category": scholarship.get("category", "General"),
-                    "state_specific": scholarship.get("state_specific", False),
-                    "state": scholarship.get("state", ""),
-                    "source": scholarship.get("source", "unknown"),
-                    "active": True,
-                    "last_updated": datetime.utcnow().isoformat(),
-                    "icon": scholarship.get("icon", "🎓")
-                }
-                
-                # Remove None values
-                scholarship_data = {k: v for k, v in scholarship_data.items() if v is not None}
+                scholarship = normalize(raw)
+                doc_id = scholarship.id
+                scholarship_data = to_firestore(scholarship)
                 
                 # Check if document exists
                 existing_doc = self.db.collection("scholarships").document(doc_id).get()
                 
                 if existing_doc.exists:
+                    old_deadline = (existing_doc.to_dict() or {}).get("deadline")
+                    if old_deadline != scholarship_data.get("deadline"):
+                        deadline_changes[doc_id] = scholarship_data.get("deadline", "")
+                    
                     # Update existing
                     self.db.collection("scholarships").document(doc_id).update(scholarship_data)
                     updated += 1
-                    print(f"   🔄 Updated: {scholarship['name'][:50]}...")
+                    print(f"   🔄 Updated: {scholarship.name[:50]}...")
                 else:
                     # Create new
                     scholarship_data["created_at"] = datetime.utcnow().isoformat()
                     self.db.collection("scholarships").document(doc_id).set(scholarship_data)
                     saved += 1
-                    print(f"   ✅ Saved new: {scholarship['name'][:50]}...")
+                    print(f"   ✅ Saved new: {scholarship.name[:50]}...")
                 
                 # Save eligibility rules separately
-                eligibility_conditions = scholarship.get("eligibility_conditions")
-                if eligibility_conditions:
-                    self._save_eligibility_rules(doc_id, eligibility_conditions)
+                if scholarship.conditions:
+                    self._save_eligibility_rules(scholarship)
                     
             except Exception as e:
                 errors += 1
-                print(f"   ❌ Error saving '{scholarship.get('name', 'Unknown')}': {e}")
+                print(f"   ❌ Error saving '{raw.get('name', 'Unknown')}': {e}")
         
         print(f"\n📊 Save completed: {saved} new, {updated} updated, {errors} errors")
         
+        reminders_updated = self._propagate_deadlines(deadline_changes) if deadline_changes else 0
+        
         return {
             "saved": saved,
             "updated": updated,
             "errors": errors,
-            "total": len(scholarships)
+            "total": len(scholarships),
+            "deadline_changes": len(deadline_changes),
+            "reminders_updated": reminders_updated
         }
     
-    def _generate_doc_id(self, name):
-        """Generate Firestore document ID from scholarship name"""
-        import re
-        
-        # Clean the name
-        doc_id = name.lower().strip()
-        
-        # Replace special characters
-        doc_id = re.sub(r'[^a-z0-9\s]', ' ', doc_id)
-        doc_id = re.sub(r'\s+', '_', doc_id)
+    def _save_to_sqlite(self, scholarships):
+        """Bulk-load into the local SQLite store: one transaction for the whole run"""
+        records = []
+        errors = 0
+        for raw in scholarships:
+            try:
+                records.append(normalize(raw))
+            except Exception as e:
+                errors += 1
+                print(f"   ❌ Error normalizing '{raw.get('name', 'Unknown')}': {e}")
         
-        # Limit length
-        if len(doc_id) > 100:
-            doc_id = doc_id[:100]
+        print(f"\n💾 Saving {len(records)} scholarships to SQLite ({self.sqlite_path})...")
+        result = self.store.scholarships.save_many(records)
+        deadline_changes = result["deadline_changes"]
+        reminders_updated = self.store.reminders.update_deadlines(deadline_changes) if deadline_changes else 0
+        print(f"\n📊 Save completed: {result['saved']} new, {result['updated']} updated, {errors} errors")
         
-        return doc_id
+        return {
+            "saved": result["saved"],
+            "updated": result["updated"],
+            "errors": errors,
+            "total": len(scholarships),
+            "deadline_changes": len(deadline_changes),
+            "reminders_updated": reminders_updated
+        }
     
-    def _save_eligibility_rules(self, scholarship_id, conditions):
+    def _save_eligibility_rules(self, scholarship):
         """Save eligibility rules for a scholarship"""
         try:
-            rule_id = f"{scholarship_id}_rules"
-            rule_data = {
-                "scholarshipId": scholarship_id,
-                "conditions": conditions,
-                "updated_at": datetime.utcnow().isoformat()
-            }
+            rule_id = f"{scholarship.id}_rules"
+            rule_data = rules_to_firestore(scholarship)
             
             self.db.collection("eligibility_rules").document(rule_id).set(rule_data, merge=True)
-            print(f"   📝 Saved eligibility rules for {scholarship_id}")
+            print(f"   📝 Saved eligibility rules for {scholarship.id}")
         except Exception as e:
-            print(f"   ⚠️  Error saving eligibility rules: {e}")
\ No newline at end of file
+            print(f"   ⚠️  Error saving eligibility rules: {e}")
+    
+    def _propagate_deadlines(self, deadline_changes):
+        """
+        Copy changed deadlines onto the reminders that denormalize them
+        (utils.normalizer.reminder_deadline_updates, shared with the SQLite store).
+        """
+        now_iso = datetime.utcnow().isoformat()
+        batch = self.db.batch()
+        pending = 0
+        total = 0
+        ids = list(deadline_changes)
+        
+        try:
+            for i in range(0, len(ids), IN_QUERY_LIMIT):
+                chunk = ids[i:i + IN_QUERY_LIMIT]
+                query = self.db.collection("reminders") \
+                    .where("scholarshipId", "in", chunk) \
+                    .select(["scholarshipId", "status"])
+                
+                for doc in query.stream():
+                    data = doc.to_dict()
+                    updates = reminder_deadline_updates(deadline_changes[data.get("scholarshipId")], data.get("status"), now_iso)
+                    batch.update(doc.reference, updates)
+                    pending += 1
+                    total += 1
+                    if pending >= WRITE_BATCH_SIZE:
+                        batch.commit()
+                        batch = self.db.batch()
+                        pending = 0
+            
+            if pending > 0:
+                batch.commit()
+            print(f"   📅 Propagated {len(deadline_changes)} deadline changes to {total} reminders")
+        except Exception as e:
+            print(f"   ⚠️  Error propagating deadline changes: {e}")
+        
+        return total
@@ -0,0 +1,123 @@
+"""
+Targeted HTML parsing for scraper pages.
+
+Only the parts we use (scholarship cards on listing pages, the eligibility
+block on detail pages) are parsed. The fast path uses lxml with precompiled
+XPath; if lxml is not installed we fall back to BeautifulSoup restricted by a
+SoupStrainer so the rest of the document is never turned into a tree.
+"""
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+try:
+    from lxml import etree, html as lxml_html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# Class-name prefixes used by the Buddy4Study listing/detail markup
+CARD_CLASS = "Listing_categoriesBox"
+NAME_CLASS = "Listing_scholarshipName"
+PROVIDER_CLASS = "Listing_scholarshipProvider"
+AWARD_CLASS = "Listing_awardCont"
+DEADLINE_CLASS = "Listing_calendarDate"
+ELIGIBILITY_CLASS = "ScholarshipDetails_eligibility"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _clean(text):
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def _has_class(prefix):
+    return f"contains(concat(' ', normalize-space(@class)), ' {prefix}')"
+
+
+if HAS_LXML:
+    _CARDS = etree.XPath(f"//a[{_has_class(CARD_CLASS)}]")
+    _NAME = etree.XPath(f".//*[{_has_class(NAME_CLASS)}][1]")
+    _PROVIDER = etree.XPath(f".//*[{_has_class(PROVIDER_CLASS)}][1]")
+    _AWARD = etree.XPath(f".//*[{_has_class(AWARD_CLASS)}][1]")
+    _DEADLINE = etree.XPath(f".//*[{_has_class(DEADLINE_CLASS)}][1]")
+    _ELIGIBILITY = etree.XPath(f"//*[{_has_class(ELIGIBILITY_CLASS)}]")
+
+
+def _text(nodes):
+    """Text of the first matched node, with child text joined by spaces like get_text(' ')"""
+    return " ".join(nodes[0].itertext()) if nodes else ""
+
+
+def _card_from_values(name, href, provider, award, deadline, base_url):
+    if href and href.startswith("/"):
+        href = base_url + href
+    return {
+        "name": _clean(name),
+        "provider": _clean(provider),
+        "amount": _clean(award),
+        "deadline": _clean(deadline),
+        "source_url": href or "",
+    }
+
+
+def parse_listing(page_html, base_url=""):
+    """Extract scholarship cards from a listing page -> list of dicts"""
+    if HAS_LXML:
+        doc = lxml_html.fromstring(page_html)
+        cards = []
+        for node in _CARDS(doc):
+            card = _card_from_values(
+                _text(_NAME(node)), node.get("href"), _text(_PROVIDER(node)),
+                _text(_AWARD(node)), _text(_DEADLINE(node)), base_url
+            )
+            if card["name"]:
+                cards.append(card)
+        return cards
+    return _parse_listing_soup(page_html, base_url)
+
+
+def parse_eligibility(page_html):
+    """Extract the eligibility block text from a detail page ('' if missing)"""
+    if HAS_LXML:
+        doc = lxml_html.fromstring(page_html)
+        blocks = _ELIGIBILITY(doc)
+        return _clean(" ".join(" ".join(block.itertext()) for block in blocks))
+    return _parse_eligibility_soup(page_html)
+
+
+def _soup(page_html, strainer):
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(page_html, "html.parser", parse_only=strainer)
+
+
+def _class_starts(prefix):
+    return lambda value: bool(value) and any(c.startswith(prefix) for c in value.split())
+
+
+def _parse_listing_soup(page_html, base_url=""):
+    from bs4 import SoupStrainer
+
+    soup = _soup(page_html, SoupStrainer("a", class_=_class_starts(CARD_CLASS)))
+    cards = []
+    for node in soup.find_all("a"):
+        def text_of(prefix):
+            el = node.find(class_=_class_starts(prefix))
+            return el.get_text(" ") if el else ""
+
+        card = _card_from_values(
+            text_of(NAME_CLASS), node.get("href"), text_of(PROVIDER_CLASS),
+            text_of(AWARD_CLASS), text_of(DEADLINE_CLASS), base_url
+        )
+        if card["name"]:
+            cards.append(card)
+    return cards
+
+
+def _parse_eligibility_soup(page_html):
+    from bs4 import SoupStrainer
+
+    soup = _soup(page_html, SoupStrainer(class_=_class_starts(ELIGIBILITY_CLASS)))
+    return _clean(soup.get_text(" "))
@@ -0,0 +1,125 @@
+"""
+Internal scheduler for the long-running scraper daemon (main.py --daemon)
+"""
+import heapq
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".daemon_state.json")
+
+
+class SourceSchedule:
+    """Interval + jitter for one registered source"""
+
+    def __init__(self, name, run, interval, jitter=0):
+        self.name = name
+        self.run = run
+        self.interval = int(os.getenv(f"SCRAPER_INTERVAL_{name.upper()}", interval))
+        self.jitter = int(os.getenv(f"SCRAPER_JITTER_{name.upper()}", jitter))
+
+    def next_delay(self):
+        """Seconds until the next run, spread by +/- jitter so sources don't fire together"""
+        if self.jitter <= 0:
+            return self.interval
+        return max(60, self.interval + random.uniform(-self.jitter, self.jitter))
+
+
+class DaemonState:
+    """Last run per source, persisted so a restart doesn't re-run sources that just ran"""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("SCRAPER_STATE_FILE", DEFAULT_STATE_FILE)
+        self.data = {}
+        try:
+            with open(self.path) as f:
+                self.data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️  Could not read daemon state {self.path}: {e}")
+
+    def last_run(self, name):
+        value = self.data.get(name, {}).get("last_success")
+        return datetime.fromisoformat(value) if value else None
+
+    def record(self, name, started_at, result):
+        entry = self.data.setdefault(name, {})
+        entry["last_attempt"] = started_at.isoformat()
+        entry["last_status"] = result.get("status", "unknown")
+        entry["last_count"] = result.get("count", 0)
+        if result.get("status") == "success":
+            entry["last_success"] = started_at.isoformat()
+        self._save()
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not write daemon state {self.path}: {e}")
+
+
+class Scheduler:
+    """
+    Runs each SourceSchedule on its own interval in a single thread.
+    Sources run one at a time so they share warm resources without locking.
+    """
+
+    def __init__(self, schedules, state=None):
+        self.schedules = schedules
+        self.state = state or DaemonState()
+        self._stop = threading.Event()
+        self._queue = []
+
+    def stop(self, *_):
+        logger.info("🛑 Stop requested, finishing current source...")
+        self._stop.set()
+
+    def run_forever(self):
+        now = time.time()
+        for schedule in self.schedules:
+            last = self.state.last_run(schedule.name)
+            # Sources that ran recently (before a restart) wait out the rest of their interval
+            delay = 0
+            if last:
+                elapsed = (datetime.utcnow() - last).total_seconds()
+                delay = max(0, schedule.interval - elapsed)
+            heapq.heappush(self._queue, (now + delay, schedule.name, schedule))
+
+        logger.info(f"🕒 Daemon started with {len(self.schedules)} sources")
+        while not self._stop.is_set() and self._queue:
+            run_at, name, schedule = heapq.heappop(self._queue)
+            wait = run_at - time.time()
+            if wait > 0 and self._stop.wait(wait):
+                break
+
+            self._run_once(schedule)
+
+            delay = schedule.next_delay()
+            heapq.heappush(self._queue, (time.time() + delay, name, schedule))
+            logger.info(f"⏭️  Next '{name}' run in {delay / 60:.0f} min")
+
+        logger.info("👋 Daemon stopped")
+
+    def _run_once(self, schedule):
+        started_at = datetime.utcnow()
+        logger.info(f"▶️  Running '{schedule.name}'")
+
+        try:
+            result = schedule.run()
+        except Exception as e:
+            logger.error(f"❌ Source '{schedule.name}' failed: {e}", exc_info=True)
+            result = {"status": "error", "error": str(e), "count": 0}
+
+        self.state.record(schedule.name, started_at, result)
+        logger.info(f"✅ '{schedule.name}' finished with status={result.get('status')} count={result.get('count', 0)}")
+        return result